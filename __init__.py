@@ -1,23 +1,39 @@
-from .nodes.m2m_translator import M2MTranslator
+from .nodes.m2m_translator import M2MTranslator, start_background_warmup
+from .nodes.m2m_routes import register_routes
+from .nodes.m2m_translator_status import M2MTranslatorStatus
 from .nodes.pixel_limit_resizer import PixelLimitResizer
+from .nodes.pixel_limit_resizer_list import PixelLimitResizerList
 from .nodes.wan_video_optimal_resizer import WanVideoOptimalResizer
+from .nodes.wan_video_optimal_resizer_list import WanVideoOptimalResizerList
 from .nodes.wan_video_resolution_finder import WanVideoResolutionFinder
 from .nodes.aspect_ratio_resolution_finder import AspectRatioResolutionFinder
 
 NODE_CLASS_MAPPINGS = {
     "M2MTranslator": M2MTranslator,
+    "M2MTranslatorStatus": M2MTranslatorStatus,
     "PixelLimitResizer": PixelLimitResizer,
+    "PixelLimitResizerList": PixelLimitResizerList,
     "WanVideoOptimalResizer": WanVideoOptimalResizer,
+    "WanVideoOptimalResizerList": WanVideoOptimalResizerList,
     "WanVideoResolutionFinder": WanVideoResolutionFinder,
     "AspectRatioResolutionFinder": AspectRatioResolutionFinder,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "M2MTranslator": "M2MTranslator",
+    "M2MTranslatorStatus": "M2MTranslatorStatus",
     "PixelLimitResizer": "PixelLimitResizer",
+    "PixelLimitResizerList": "PixelLimitResizerList",
     "WanVideoOptimalResizer": "WanVideoOptimalResizer",
+    "WanVideoOptimalResizerList": "WanVideoOptimalResizerList",
     "WanVideoResolutionFinder": "WanVideoResolutionFinder",
     "AspectRatioResolutionFinder": "AspectRatioResolutionFinder",
 }
 
+# Opt-in background loading of the models listed in KEIT_M2M_WARMUP
+start_background_warmup()
+
+# Unload and memory endpoints for operators (only when running inside the ComfyUI server)
+register_routes()
+
 __all__ = ["NODE_CLASS_MAPPINGS", "NODE_DISPLAY_NAME_MAPPINGS"]
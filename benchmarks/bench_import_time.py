@@ -0,0 +1,111 @@
+"""
+Measure the import-time cost of registering keitNodes and guard against regressions
+
+Run from the repository root with ComfyUI on PYTHONPATH:
+    PYTHONPATH=/path/to/ComfyUI python -m benchmarks.bench_import_time --max-ms 200
+
+The package is imported the way ComfyUI loads custom nodes, after the modules ComfyUI has
+already imported itself (torch, comfy.utils, folder_paths), using `python -X importtime`.
+Exits with status 1 if a heavy dependency is imported at registration time or the
+cumulative import time exceeds --max-ms.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Dependencies that must only be imported when a node actually needs them
+LAZY_MODULES: list[str] = [
+    "transformers",
+    "langid",
+    "huggingface_hub",
+    "safetensors",
+    "tokenizers",
+]
+
+MARKER = "--- keit-nodes import ---"
+
+IMPORT_SCRIPT = """
+import importlib.util
+import sys
+import torch
+import comfy.utils
+import folder_paths
+
+sys.stderr.write("{marker}\\n")
+sys.stderr.flush()
+spec = importlib.util.spec_from_file_location(
+    "keit_nodes", {init_path!r}, submodule_search_locations=[{root!r}]
+)
+module = importlib.util.module_from_spec(spec)
+sys.modules["keit_nodes"] = module
+spec.loader.exec_module(module)
+"""
+
+
+def measure_imports(root: str) -> list[tuple[str, int, int]]:
+    """Return (module, self_us, cumulative_us) for every module imported by the package"""
+    script = IMPORT_SCRIPT.format(
+        marker=MARKER, init_path=os.path.join(root, "__init__.py"), root=root
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    lines = completed.stderr.splitlines()
+    if MARKER not in lines:
+        raise RuntimeError("Import marker not found in -X importtime output")
+
+    entries: list[tuple[str, int, int]] = []
+    for line in lines[lines.index(MARKER) + 1 :]:
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        # Drop the single separator space; what remains is two spaces per nesting level
+        entries.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=None,
+        help="Fail if the package import takes longer than this",
+    )
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    entries = measure_imports(root)
+
+    # Top-level modules have no leading indentation in the tree
+    top_level_us = sum(cumulative for name, _, cumulative in entries if name == name.lstrip())
+    print(f"Package import time: {top_level_us / 1000:.1f} ms ({len(entries)} modules)")
+    print(f"{'cumulative [ms]':>16}{'self [ms]':>11}  module")
+    for name, self_us, cumulative_us in sorted(entries, key=lambda e: -e[2])[: args.top]:
+        print(f"{cumulative_us / 1000:>16.1f}{self_us / 1000:>11.1f}  {name.strip()}")
+
+    failures: list[str] = []
+    imported = {name.strip() for name, _, _ in entries}
+    for module in LAZY_MODULES:
+        if module in imported:
+            failures.append(f"{module} is imported at registration time")
+    if args.max_ms is not None and top_level_us / 1000 > args.max_ms:
+        failures.append(
+            f"import took {top_level_us / 1000:.1f} ms (limit {args.max_ms:.1f} ms)"
+        )
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
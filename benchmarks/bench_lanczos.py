@@ -0,0 +1,81 @@
+"""
+Compare the vectorized Lanczos resize against comfy's per-frame PIL path
+
+Run from the repository root with ComfyUI on PYTHONPATH:
+    PYTHONPATH=/path/to/ComfyUI python -m benchmarks.bench_lanczos --frames 81
+"""
+
+import argparse
+import time
+import torch
+from comfy.utils import common_upscale
+from nodes.resample import lanczos_resize
+
+# (input width, input height, output width, output height)
+CASES: list[tuple[int, int, int, int]] = [
+    (1280, 720, 832, 480),  # 720p -> WanVideo 480p (downscale)
+    (1920, 1080, 1024, 576),  # 1080p -> pixel limit default (downscale)
+    (640, 360, 1280, 720),  # upscale
+    (1000, 1000, 624, 624),  # square, non-integer scale
+]
+
+
+def synthetic_frames(frames: int, width: int, height: int) -> torch.Tensor:
+    """Smooth gradients plus noise and hard edges, in [0, 1] with shape [B, H, W, C]"""
+    generator = torch.Generator().manual_seed(0)
+    y = torch.linspace(0, 1, height)[:, None, None]
+    x = torch.linspace(0, 1, width)[None, :, None]
+    phase = torch.linspace(0, 1, 3)[None, None, :]
+    base = 0.5 + 0.5 * torch.sin(12 * x + 7 * y + 6.28 * phase)
+    edges = ((x * 16).floor() + (y * 9).floor()) % 2
+    image = 0.6 * base + 0.3 * edges
+    noise = torch.rand((frames, height, width, 3), generator=generator) * 0.1
+    return (image[None] + noise).clamp(0, 1)
+
+
+def time_call(function, repeats: int) -> float:
+    """Best wall time of several runs"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=81)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'case':<24}{'PIL [s]':>10}{'torch [s]':>11}{'speedup':>9}"
+        f"{'max diff':>12}{'mean diff':>13}"
+    )
+    for in_width, in_height, out_width, out_height in CASES:
+        samples = synthetic_frames(args.frames, in_width, in_height).movedim(-1, 1)
+
+        reference = common_upscale(samples, out_width, out_height, "lanczos", "disabled")
+        result = lanczos_resize(samples, out_width, out_height)
+        difference = (reference - result).abs()
+
+        pil_seconds = time_call(
+            lambda: common_upscale(samples, out_width, out_height, "lanczos", "disabled"),
+            args.repeats,
+        )
+        torch_seconds = time_call(
+            lambda: lanczos_resize(samples, out_width, out_height), args.repeats
+        )
+
+        case = f"{in_width}x{in_height}->{out_width}x{out_height}"
+        print(
+            f"{case:<24}{pil_seconds:>10.3f}{torch_seconds:>11.3f}"
+            f"{pil_seconds / torch_seconds:>8.1f}x"
+            f"{difference.max().item() * 255:>8.2f}/255"
+            f"{difference.mean().item() * 255:>8.3f}/255"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Compare the M2MTranslator inference backends on CPU: tokens/sec and parity with eager mode
+
+Run from the repository root with ComfyUI on PYTHONPATH:
+    PYTHONPATH=/path/to/ComfyUI python -m benchmarks.bench_m2m_compile --model-size 418M
+
+The first call of the compiled backend includes compilation (or loading the kernels from
+the TorchInductor cache) and is reported separately. Exits with status 1 if the
+compiled outputs agree with eager mode on fewer than --min-parity of the corpus, or if the
+compiled backend fell back to eager mode.
+"""
+
+import argparse
+import json
+import sys
+import time
+from benchmarks.bench_m2m_precision import CORPUS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model-size", default="418M", choices=["418M", "1.2B"])
+    parser.add_argument(
+        "--decoding-policy", default="greedy", choices=["beam", "greedy", "adaptive"]
+    )
+    parser.add_argument("--num-beams", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0, help="torch threads (0: default)")
+    parser.add_argument("--min-parity", type=float, default=1.0)
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    import torch
+    from nodes.decoding_policy import DecodingPolicy
+    from nodes.m2m_translator import M2MTranslator
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    translator = M2MTranslator()
+    entry = translator.load_model(args.model_size, "cpu", "fp32")
+    tokenizer = entry.tokenizer
+
+    # Translate every corpus entry into English, grouped by source language
+    groups: dict[str, list[str]] = {}
+    for source_language, text in CORPUS:
+        groups.setdefault(source_language, []).append(text)
+
+    def translate_corpus(policy: DecodingPolicy) -> list[str]:
+        outputs: list[str] = []
+        for source_language, texts in groups.items():
+            outputs += translator.generate_translations(
+                entry, texts, source_language, "en", args.num_beams, args.batch_size, policy
+            )
+        return outputs
+
+    results: dict[str, dict] = {}
+    for backend in ["eager", "compiled"]:
+        policy = DecodingPolicy(args.decoding_policy, args.num_beams, backend=backend)
+        start = time.perf_counter()
+        outputs = translate_corpus(policy)
+        first_call_seconds = time.perf_counter() - start
+
+        timings: list[float] = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            translate_corpus(policy)
+            timings.append(time.perf_counter() - start)
+
+        # Generated tokens of one pass, </s> included
+        tokens = sum(len(tokenizer.tokenize(output)) + 1 for output in outputs)
+        best = min(timings)
+        results[backend] = {
+            "first_call_seconds": first_call_seconds,
+            "best_seconds": best,
+            "mean_seconds": sum(timings) / len(timings),
+            "tokens": tokens,
+            "tokens_per_second": tokens / best,
+            "fallback": policy.backend_fallback,
+            "outputs": outputs,
+        }
+
+    eager = results["eager"]
+    compiled = results["compiled"]
+    matches = sum(a == b for a, b in zip(compiled["outputs"], eager["outputs"]))
+    parity = matches / len(eager["outputs"])
+    compiled["parity"] = parity
+
+    print(f"{'backend':<10}{'first [s]':>11}{'best [s]':>10}{'tokens/s':>10}{'speedup':>9}")
+    for backend, result in results.items():
+        print(
+            f"{backend:<10}{result['first_call_seconds']:>11.2f}{result['best_seconds']:>10.3f}"
+            f"{result['tokens_per_second']:>10.1f}"
+            f"{eager['best_seconds'] / result['best_seconds']:>8.2f}x"
+        )
+    print(f"parity: {matches}/{len(eager['outputs'])} identical outputs")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    failures: list[str] = []
+    if compiled["fallback"]:
+        failures.append("the compiled backend fell back to eager mode")
+    if parity < args.min_parity:
+        failures.append(f"parity {parity:.2f} is below --min-parity {args.min_parity:.2f}")
+    if failures:
+        print("FAILED: " + "; ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Compare M2MTranslator decoding policies: latency against agreement with 5-beam search
+
+Run from the repository root with ComfyUI on PYTHONPATH:
+    PYTHONPATH=/path/to/ComfyUI python -m benchmarks.bench_m2m_decoding --model-size 418M
+
+The fixed corpus mixes short tags with full sentences. There are no reference translations,
+so quality is reported as agreement with the 5-beam output (exact match and chrF).
+"""
+
+import argparse
+import json
+import time
+from collections import Counter
+from benchmarks.bench_m2m_precision import CORPUS
+
+# Short tags, where beam search costs the most relative to its benefit
+TAGS: list[tuple[str, str]] = [
+    ("ja", "夕焼け"),
+    ("ja", "赤い傘"),
+    ("zh", "雪山"),
+    ("ko", "고양이"),
+    ("fr", "chat noir"),
+    ("de", "roter Apfel"),
+    ("es", "flor amarilla"),
+    ("ru", "зимний лес"),
+]
+
+# name: (decoding_policy, num_beams, beam_length_threshold, max_new_tokens_ratio)
+CONFIGS: dict[str, tuple[str, int, int, float]] = {
+    "beam5": ("beam", 5, 16, 0.0),
+    "greedy": ("greedy", 5, 16, 0.0),
+    "adaptive": ("adaptive", 5, 16, 0.0),
+    "adaptive+bound": ("adaptive", 5, 16, 2.0),
+}
+
+
+def chrf(hypothesis: str, reference: str, max_order: int = 6, beta: float = 2.0) -> float:
+    """Character n-gram F-score (chrF, whitespace removed) in [0, 100]"""
+    hypothesis = hypothesis.replace(" ", "")
+    reference = reference.replace(" ", "")
+    precisions: list[float] = []
+    recalls: list[float] = []
+    for order in range(1, max_order + 1):
+        hypothesis_ngrams = Counter(
+            hypothesis[i : i + order] for i in range(len(hypothesis) - order + 1)
+        )
+        reference_ngrams = Counter(
+            reference[i : i + order] for i in range(len(reference) - order + 1)
+        )
+        if not hypothesis_ngrams or not reference_ngrams:
+            continue
+        overlap = sum((hypothesis_ngrams & reference_ngrams).values())
+        precisions.append(overlap / sum(hypothesis_ngrams.values()))
+        recalls.append(overlap / sum(reference_ngrams.values()))
+
+    if not precisions:
+        return 100.0 if hypothesis == reference else 0.0
+    precision = sum(precisions) / len(precisions)
+    recall = sum(recalls) / len(recalls)
+    if precision + recall == 0:
+        return 0.0
+    return 100 * (1 + beta**2) * precision * recall / (beta**2 * precision + recall)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model-size", default="418M", choices=["418M", "1.2B"])
+    parser.add_argument("--device", default="cpu", choices=["cpu", "cuda"])
+    parser.add_argument("--configs", nargs="+", choices=list(CONFIGS), default=list(CONFIGS))
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    from nodes.m2m_translator import M2MTranslator
+
+    translator = M2MTranslator()
+    translator.load_model(args.model_size, args.device)
+    corpus = TAGS + CORPUS
+
+    results: dict[str, dict] = {}
+    for name in ["beam5"] + [name for name in args.configs if name != "beam5"]:
+        policy, num_beams, threshold, ratio = CONFIGS[name]
+        latencies: list[float] = []
+        outputs: list[str] = []
+        strategies: Counter = Counter()
+        for source_language, text in corpus:
+            start = time.perf_counter()
+            translated_text, _, _, decode_info, _ = translator.translate(
+                text,
+                source_language,
+                "en",
+                args.model_size,
+                args.device,
+                num_beams,
+                use_cache=False,
+                decoding_policy=policy,
+                beam_length_threshold=threshold,
+                max_new_tokens_ratio=ratio,
+            )
+            latencies.append(time.perf_counter() - start)
+            outputs.append(translated_text)
+            strategies.update(json.loads(decode_info)["strategies"])
+
+        latencies.sort()
+        results[name] = {
+            "mean_latency_seconds": sum(latencies) / len(latencies),
+            "p90_latency_seconds": latencies[round(0.9 * (len(latencies) - 1))],
+            "total_seconds": sum(latencies),
+            "strategies": dict(strategies),
+            "outputs": outputs,
+        }
+
+    reference = results["beam5"]["outputs"]
+    print(
+        f"{'config':<16}{'mean [s]':>10}{'p90 [s]':>10}{'total [s]':>11}"
+        f"{'speedup':>9}{'exact match':>13}{'chrF':>7}  strategies"
+    )
+    for name, result in results.items():
+        matches = sum(a == b for a, b in zip(result["outputs"], reference))
+        score = sum(chrf(a, b) for a, b in zip(result["outputs"], reference)) / len(reference)
+        result["exact_match"] = matches / len(reference)
+        result["chrf_vs_beam5"] = score
+        print(
+            f"{name:<16}{result['mean_latency_seconds']:>10.3f}"
+            f"{result['p90_latency_seconds']:>10.3f}{result['total_seconds']:>11.2f}"
+            f"{results['beam5']['total_seconds'] / result['total_seconds']:>8.2f}x"
+            f"{f'{matches}/{len(reference)}':>13}{score:>7.1f}  {result['strategies']}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
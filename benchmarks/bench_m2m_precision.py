@@ -0,0 +1,133 @@
+"""
+Compare M2MTranslator precisions on CPU: latency, peak RSS and agreement with fp32
+
+Run from the repository root with ComfyUI on PYTHONPATH:
+    PYTHONPATH=/path/to/ComfyUI python -m benchmarks.bench_m2m_precision --model-size 418M
+
+Each precision runs in its own subprocess so the peak RSS of one does not leak into another.
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+# Fixed multilingual corpus (source language, text)
+CORPUS: list[tuple[str, str]] = [
+    ("ja", "赤い髪の女の子がカメラに向かって真っ直ぐ歩いている"),
+    ("ja", "夕焼けの海辺で、白い犬が波と遊んでいる"),
+    ("ja", "雨の夜の東京の街並み、ネオンが濡れた路面に反射している"),
+    ("ja", "古い木造の図書館で、少年が分厚い本を読んでいる"),
+    ("zh", "一位穿着红色连衣裙的女人站在樱花树下"),
+    ("zh", "雪山脚下有一座安静的小村庄"),
+    ("ko", "고양이가 창가에서 햇볕을 쬐며 잠을 자고 있다"),
+    ("ko", "우주 비행사가 달 표면을 천천히 걷고 있다"),
+    ("fr", "Un vieil homme joue du violon dans une rue pavée"),
+    ("fr", "Une forêt brumeuse au lever du soleil, avec des rayons de lumière"),
+    ("de", "Ein kleines Boot treibt auf einem ruhigen Bergsee"),
+    ("de", "Eine futuristische Stadt mit fliegenden Autos bei Nacht"),
+    ("es", "Una niña corre por un campo de girasoles"),
+    ("es", "Un dragón dorado vuela sobre un castillo antiguo"),
+    ("ru", "Кошка сидит на подоконнике и смотрит на снег"),
+    ("ru", "Поезд мчится через бескрайнюю степь на закате"),
+]
+
+PRECISIONS: list[str] = ["fp32", "bf16", "dynamic-int8"]
+
+
+def run_single(model_size: str, precision: str, num_beams: int) -> dict:
+    """Translate the corpus with one precision and report timings and outputs"""
+    from nodes.m2m_translator import M2MTranslator
+
+    translator = M2MTranslator()
+
+    start = time.perf_counter()
+    translator.load_model(model_size, "cpu", precision)
+    load_seconds = time.perf_counter() - start
+
+    latencies: list[float] = []
+    outputs: list[str] = []
+    for source_language, text in CORPUS:
+        start = time.perf_counter()
+        translated_text, _, _, _, _ = translator.translate(
+            text,
+            source_language,
+            "en",
+            model_size,
+            "cpu",
+            num_beams,
+            use_cache=False,
+            precision=precision,
+        )
+        latencies.append(time.perf_counter() - start)
+        outputs.append(translated_text)
+
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+    return {
+        "precision": precision,
+        "load_seconds": load_seconds,
+        "mean_latency_seconds": sum(latencies) / len(latencies),
+        "total_seconds": sum(latencies),
+        "peak_rss_mb": rss_mb,
+        "outputs": outputs,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model-size", default="418M", choices=["418M", "1.2B"])
+    parser.add_argument("--num-beams", type=int, default=5)
+    parser.add_argument("--precisions", nargs="+", default=PRECISIONS)
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_single(args.model_size, args.single, args.num_beams)))
+        return
+
+    results: dict[str, dict] = {}
+    for precision in args.precisions:
+        completed = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.bench_m2m_precision",
+                "--model-size",
+                args.model_size,
+                "--num-beams",
+                str(args.num_beams),
+                "--single",
+                precision,
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        results[precision] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    reference = results.get("fp32")
+    print(
+        f"{'precision':<14}{'load [s]':>10}{'mean [s]':>10}{'total [s]':>11}"
+        f"{'RSS [MB]':>10}{'exact match':>13}"
+    )
+    for precision, result in results.items():
+        exact_match = "-"
+        if reference is not None:
+            matches = sum(
+                a == b for a, b in zip(result["outputs"], reference["outputs"])
+            )
+            exact_match = f"{matches}/{len(CORPUS)}"
+        print(
+            f"{precision:<14}{result['load_seconds']:>10.2f}"
+            f"{result['mean_latency_seconds']:>10.3f}{result['total_seconds']:>11.2f}"
+            f"{result['peak_rss_mb']:>10.0f}{exact_match:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
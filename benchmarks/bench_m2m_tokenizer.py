@@ -0,0 +1,126 @@
+"""
+Break M2MTranslator latency down into tokenize, generate and decode for each tokenizer path
+
+Run from the repository root with ComfyUI on PYTHONPATH:
+    PYTHONPATH=/path/to/ComfyUI python -m benchmarks.bench_m2m_tokenizer --model-size 418M
+
+Tokenizers compared on the same loaded model:
+    slow: the SentencePiece M2M100Tokenizer
+    fast: the converted Rust tokenizer, with the encode memo cleared before every pass
+    fast+memo: the converted Rust tokenizer with a warm encode memo (re-queued prompts)
+Stage times come from the stage_duration_seconds histograms the translator records.
+"""
+
+import argparse
+import json
+import time
+from benchmarks.bench_m2m_decoding import TAGS
+from benchmarks.bench_m2m_precision import CORPUS
+
+STAGES: list[str] = ["tokenize", "generate", "decode"]
+
+
+def stage_seconds(snapshot: dict) -> dict[str, float]:
+    """Total seconds per translator stage in a metrics snapshot"""
+    histograms = snapshot["histograms"]
+    return {
+        stage: histograms.get(
+            f'stage_duration_seconds{{node="M2MTranslator",stage="{stage}"}}', {}
+        ).get("sum", 0.0)
+        for stage in STAGES
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model-size", default="418M", choices=["418M", "1.2B"])
+    parser.add_argument("--device", default="cpu", choices=["cpu", "cuda"])
+    parser.add_argument("--num-beams", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    from nodes.decoding_policy import DecodingPolicy
+    from nodes.m2m_fast_tokenizer import M2MTokenizer
+    from nodes.m2m_translator import M2MTranslator
+    from nodes.model_pool import PooledModel
+    from nodes.telemetry import metrics
+
+    translator = M2MTranslator()
+    entry = translator.load_model(args.model_size, args.device)
+    if not isinstance(entry.tokenizer, M2MTokenizer) or not entry.tokenizer.is_fast:
+        parser.error("The fast tokenizer is not available for this model (see the log)")
+    slow_tokenizer = entry.tokenizer.slow_tokenizer
+    fast_tokenizer = entry.tokenizer.fast_tokenizer
+
+    # Short prompts, where tokenization is the largest share of the latency
+    groups: dict[str, list[str]] = {}
+    for source_language, text in TAGS + CORPUS:
+        groups.setdefault(source_language, []).append(text)
+    text_count = sum(len(texts) for texts in groups.values())
+
+    variants = {
+        "slow": slow_tokenizer,
+        "fast": M2MTokenizer(slow_tokenizer, fast_tokenizer),
+        "fast+memo": M2MTokenizer(slow_tokenizer, fast_tokenizer),
+    }
+
+    results: dict[str, dict] = {}
+    for name, tokenizer in variants.items():
+        variant_entry = PooledModel(entry.key, entry.model, tokenizer, entry.device)
+
+        def translate_corpus() -> list[str]:
+            outputs: list[str] = []
+            for source_language, texts in groups.items():
+                outputs += translator.generate_translations(
+                    variant_entry,
+                    texts,
+                    source_language,
+                    "en",
+                    args.num_beams,
+                    policy=DecodingPolicy("beam", args.num_beams),
+                )
+            return outputs
+
+        # Warm-up pass, which also fills the memo of fast+memo
+        outputs = translate_corpus()
+        metrics.reset()
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            if name == "fast":
+                tokenizer.clear()
+            translate_corpus()
+        wall = time.perf_counter() - start
+
+        stages = stage_seconds(metrics.snapshot())
+        results[name] = {
+            "wall_ms_per_text": wall * 1000 / (args.repeats * text_count),
+            **{
+                f"{stage}_ms_per_text": seconds * 1000 / (args.repeats * text_count)
+                for stage, seconds in stages.items()
+            },
+            "tokenize_decode_share": (stages["tokenize"] + stages["decode"]) / wall,
+            "outputs": outputs,
+        }
+
+    reference = results["slow"]["outputs"]
+    print(
+        f"{'tokenizer':<11}{'wall':>9}{'tokenize':>10}{'generate':>10}{'decode':>9}"
+        f"{'tok+dec share':>15}{'same output':>13}   (ms per text)"
+    )
+    for name, result in results.items():
+        matches = sum(a == b for a, b in zip(result["outputs"], reference))
+        result["same_output"] = matches / len(reference)
+        print(
+            f"{name:<11}{result['wall_ms_per_text']:>9.2f}{result['tokenize_ms_per_text']:>10.3f}"
+            f"{result['generate_ms_per_text']:>10.2f}{result['decode_ms_per_text']:>9.3f}"
+            f"{result['tokenize_decode_share']:>14.1%}{f'{matches}/{len(reference)}':>13}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Check the bounded pixel limit solver against the original full scan, case by case
+
+Run from the repository root (no ComfyUI needed):
+    python -m benchmarks.bench_pixel_limit_solver
+    python -m benchmarks.bench_pixel_limit_solver --random 200000 --batch 1000000
+
+Every (width, height, max_pixels, alignment) combination of the grid, plus --random cases,
+must give bit-identical (width, height, pixels) from find_pixel_limit_resolution, the
+vectorized find_pixel_limit_resolutions (when torch is installed) and the original loop.
+The random cases mostly have a pixel limit of their own, so the vectorized solver is also
+run on --batch random sizes (1..4096, extreme aspect ratios included) sharing one limit and
+compared against the scalar solver. Exits with status 1 on the first mismatches.
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from typing import Tuple
+from nodes.resolution import ALIGNMENTS, find_pixel_limit_resolution
+
+# Pixel limits of the grid: the widget bounds, common video sizes and a few odd values
+MAX_PIXELS: list[int] = [
+    256,
+    4095,
+    65536,
+    230400,
+    409600,
+    589824,
+    589825,
+    921600,
+    2073600,
+    4194304,
+]
+
+
+def reference_resolution(
+    original_width: int, original_height: int, max_pixels: int, alignment: int = 16
+) -> Tuple[int, int, int]:
+    """The original PixelLimitResizer scan over every aligned height (16 -> alignment)"""
+    original_aspect = original_width / original_height
+    max_height_theoretical = math.sqrt(max_pixels / original_aspect)
+    max_height_aligned = int(max_height_theoretical // alignment) * alignment
+
+    best_width = 0
+    best_height = 0
+    best_pixels = 0
+    for height in range(max_height_aligned, alignment - 1, -alignment):
+        width_exact = original_aspect * height
+        width_down = int(width_exact // alignment) * alignment
+        width_up = width_down + alignment
+        for width in [width_down, width_up]:
+            if width > 0 and (width * height) <= max_pixels:
+                pixels = width * height
+                if pixels > best_pixels:
+                    best_pixels = pixels
+                    best_width = width
+                    best_height = height
+
+    if best_width == 0 or best_height == 0:
+        best_width = alignment
+        best_height = alignment
+        best_pixels = best_width * best_height
+    return best_width, best_height, best_pixels
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-size", type=int, default=2048, help="Largest grid side")
+    parser.add_argument("--step", type=int, default=97, help="Grid step (odd sizes included)")
+    parser.add_argument("--random", type=int, default=20000, help="Extra random cases")
+    parser.add_argument(
+        "--batch", type=int, default=300000, help="Random sizes for the single-limit batch"
+    )
+    parser.add_argument("--batch-max-pixels", type=int, default=589824)
+    parser.add_argument("--batch-alignment", type=int, default=16, choices=ALIGNMENTS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sides = list(range(1, args.max_size + 1, args.step))
+    cases: list[tuple[int, int, int, int]] = [
+        (width, height, max_pixels, alignment)
+        for width in sides
+        for height in sides
+        for max_pixels in MAX_PIXELS
+        for alignment in ALIGNMENTS
+    ]
+    generator = random.Random(args.seed)
+    cases += [
+        (
+            generator.randint(16, 4096),
+            generator.randint(16, 4096),
+            generator.randint(16 * 16, 2048 * 2048),
+            generator.choice(ALIGNMENTS),
+        )
+        for _ in range(args.random)
+    ]
+
+    start = time.perf_counter()
+    expected = [reference_resolution(*case) for case in cases]
+    reference_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [find_pixel_limit_resolution(*case) for case in cases]
+    solver_seconds = time.perf_counter() - start
+
+    mismatches = [
+        (case, want, got) for case, want, got in zip(cases, expected, actual) if want != got
+    ]
+
+    vectorized = "skipped (torch not installed)"
+    try:
+        import torch
+        from nodes.resolution import find_pixel_limit_resolutions
+    except ImportError:
+        torch = None
+    if torch is not None:
+        # The vectorized solver takes one pixel limit and alignment per call
+        groups: dict[tuple[int, int], list[int]] = {}
+        for index, (_, _, max_pixels, alignment) in enumerate(cases):
+            groups.setdefault((max_pixels, alignment), []).append(index)
+
+        start = time.perf_counter()
+        for (max_pixels, alignment), group in groups.items():
+            sizes = torch.tensor([cases[index][:2] for index in group])
+            results = find_pixel_limit_resolutions(sizes, max_pixels, alignment)
+            for index, row in zip(group, results.tolist()):
+                if tuple(row) != expected[index]:
+                    mismatches.append((cases[index], expected[index], tuple(row)))
+        vectorized = f"{time.perf_counter() - start:.2f}s"
+
+        # One large batch sharing a limit, the way dataset planning calls the solver
+        batch_sizes = [
+            (generator.randint(1, 4096), generator.randint(1, 4096)) for _ in range(args.batch)
+        ]
+        batch_sizes += [(1, 4095), (4095, 1), (1, 1), (4096, 4096)]
+        max_pixels, alignment = args.batch_max_pixels, args.batch_alignment
+
+        start = time.perf_counter()
+        batch_expected = [
+            find_pixel_limit_resolution(width, height, max_pixels, alignment)
+            for width, height in batch_sizes
+        ]
+        scalar_seconds = time.perf_counter() - start
+
+        sizes = torch.tensor(batch_sizes)
+        start = time.perf_counter()
+        results = find_pixel_limit_resolutions(sizes, max_pixels, alignment)
+        batch_seconds = time.perf_counter() - start
+
+        for (width, height), want, row in zip(batch_sizes, batch_expected, results.tolist()):
+            if tuple(row) != want:
+                mismatches.append(((width, height, max_pixels, alignment), want, tuple(row)))
+        vectorized += (
+            f"; batch of {len(batch_sizes):,} at {max_pixels}/{alignment}: "
+            f"scalar {scalar_seconds:.2f}s, vectorized {batch_seconds:.2f}s"
+        )
+
+    print(f"cases: {len(cases):,}")
+    print(f"original scan: {reference_seconds:.2f}s, bounded search: {solver_seconds:.2f}s")
+    print(f"vectorized: {vectorized}")
+    if mismatches:
+        for case, want, got in mismatches[:10]:
+            print(f"MISMATCH {case}: expected {want}, got {got}", file=sys.stderr)
+        print(f"FAILED: {len(mismatches)} mismatch(es)", file=sys.stderr)
+        sys.exit(1)
+    print("all results identical")
+
+
+if __name__ == "__main__":
+    main()
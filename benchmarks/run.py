@@ -0,0 +1,434 @@
+"""
+Benchmark every keitNodes node on CPU over a synthetic matrix and compare with a baseline
+
+Run from the repository root with ComfyUI on PYTHONPATH:
+    PYTHONPATH=/path/to/ComfyUI python -m benchmarks.run --output results.json
+    PYTHONPATH=/path/to/ComfyUI python -m benchmarks.run --save-baseline baseline.json
+    PYTHONPATH=/path/to/ComfyUI python -m benchmarks.run --baseline baseline.json
+
+No network access is needed: images are synthetic and M2MTranslator runs a tiny randomly
+initialized M2M100 with a SentencePiece tokenizer trained on the spot (requires the
+sentencepiece package). Each suite runs in its own subprocess so its peak RSS is its own.
+Baselines are machine specific; save one on the machine that will run the comparison.
+Exits with status 1 if a case is slower than the baseline by more than --tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+SUITES: list[str] = [
+    "pixel_limit_resizer",
+    "wan_video_optimal_resizer",
+    "resolution_finders",
+    "m2m_translator",
+]
+
+# (width, height) of the synthetic input frames
+RESOLUTIONS: list[tuple[int, int]] = [(1280, 720), (1920, 1080), (720, 1280)]
+BATCH_SIZES: list[int] = [1, 16]
+UPSCALE_METHODS: list[str] = ["bilinear", "bicubic", "lanczos"]
+
+# Words per segment, 16 segments per case
+TEXT_LENGTHS: dict[str, int] = {"short": 8, "medium": 32, "long": 96}
+SEGMENTS_PER_CASE = 16
+
+# Target languages of the multi-target (fan-out) cases
+FAN_OUT_TARGETS: list[str] = ["fr", "de", "es", "it", "ja", "ko", "zh", "ru"]
+
+# Tiny M2M100 so the translator is benchmarked without downloading a checkpoint
+TINY_M2M_CONFIG: dict[str, Any] = {
+    "d_model": 64,
+    "encoder_layers": 2,
+    "decoder_layers": 2,
+    "encoder_attention_heads": 4,
+    "decoder_attention_heads": 4,
+    "encoder_ffn_dim": 128,
+    "decoder_ffn_dim": 128,
+    "max_position_embeddings": 256,
+    "max_length": 48,
+}
+TINY_SPM_VOCAB_SIZE = 400
+
+# Lines for the language detection cases (langid needs no network either)
+DETECTION_LINES: list[str] = [
+    "赤い髪の女の子がカメラに向かって歩いている",
+    "A red-haired girl walks straight towards the camera",
+    "Un vieil homme joue du violon dans une rue pavée",
+    "Ein kleines Boot treibt auf einem ruhigen Bergsee",
+    "고양이가 창가에서 햇볕을 쬐며 잠을 자고 있다",
+    "Кошка сидит на подоконнике и смотрит на снег",
+    "Una niña corre por un campo de girasoles",
+    "一位穿着红色连衣裙的女人站在樱花树下",
+]
+
+SEED = 0
+
+
+def synthetic_image(batch_size: int, width: int, height: int):
+    """Deterministic IMAGE batch [B, H, W, C] in [0, 1]"""
+    import torch
+
+    generator = torch.Generator().manual_seed(SEED)
+    return torch.rand((batch_size, height, width, 3), generator=generator)
+
+
+def synthetic_words(count: int, rng: random.Random) -> list[str]:
+    """Pseudo-words drawn from a fixed syllable set"""
+    syllables = ["ka", "to", "ri", "mu", "sen", "lo", "va", "ne", "shi", "dor", "pa", "qui"]
+    return [
+        "".join(rng.choice(syllables) for _ in range(rng.randint(1, 3)))
+        for _ in range(count)
+    ]
+
+
+def synthetic_segments(words_per_segment: int) -> list[str]:
+    rng = random.Random(SEED)
+    return [
+        " ".join(synthetic_words(words_per_segment, rng))
+        for _ in range(SEGMENTS_PER_CASE)
+    ]
+
+
+def measure(function: Callable[[], Any], items: int, repeats: int) -> dict[str, float]:
+    """Latency percentiles over several runs (after one warm-up run) and items per second"""
+    function()
+    latencies: list[float] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+
+    def percentile(fraction: float) -> float:
+        position = min(len(latencies) - 1, round(fraction * (len(latencies) - 1)))
+        return latencies[position]
+
+    mean = sum(latencies) / len(latencies)
+    return {
+        "items": items,
+        "repeats": repeats,
+        "mean_seconds": mean,
+        "p50_seconds": percentile(0.50),
+        "p90_seconds": percentile(0.90),
+        "p99_seconds": percentile(0.99),
+        "throughput_per_second": items / percentile(0.50),
+    }
+
+
+def bench_pixel_limit_resizer(repeats: int) -> dict[str, dict]:
+    from nodes.pixel_limit_resizer import PixelLimitResizer
+
+    node = PixelLimitResizer()
+    cases: dict[str, dict] = {}
+    for width, height in RESOLUTIONS:
+        for batch_size in BATCH_SIZES:
+            image = synthetic_image(batch_size, width, height)
+            for method in UPSCALE_METHODS:
+                cases[f"{method}/b{batch_size}/{width}x{height}"] = measure(
+                    lambda: node.resize_with_pixel_limit(image, method),
+                    batch_size,
+                    repeats,
+                )
+    return cases
+
+
+def bench_wan_video_optimal_resizer(repeats: int) -> dict[str, dict]:
+    from nodes.wan_video_optimal_resizer import WanVideoOptimalResizer
+
+    node = WanVideoOptimalResizer()
+    cases: dict[str, dict] = {}
+    for width, height in RESOLUTIONS:
+        for batch_size in BATCH_SIZES:
+            image = synthetic_image(batch_size, width, height)
+            for method in UPSCALE_METHODS:
+                for fit_mode in ["stretch", "cover"]:
+                    cases[f"{method}/{fit_mode}/b{batch_size}/{width}x{height}"] = measure(
+                        lambda: node.resize_to_optimal(image, "480p", method, 0, fit_mode),
+                        batch_size,
+                        repeats,
+                    )
+    return cases
+
+
+def bench_resolution_finders(repeats: int) -> dict[str, dict]:
+    from nodes.aspect_ratio_resolution_finder import AspectRatioResolutionFinder
+    from nodes.pixel_limit_resizer import PixelLimitResizer
+    from nodes.wan_video_resolution_finder import WanVideoResolutionFinder
+
+    # The finders only read the shape, so one frame per resolution is enough
+    images = [synthetic_image(1, width, height) for width, height in RESOLUTIONS]
+    sizes = [(width, height) for width, height in RESOLUTIONS] * 100
+    wan_finder = WanVideoResolutionFinder()
+    aspect_finder = AspectRatioResolutionFinder()
+    pixel_limit = PixelLimitResizer()
+
+    def run_wan_finder() -> None:
+        for image in images:
+            wan_finder.find_optimal_resolution(image, "720p")
+
+    def run_aspect_finder() -> None:
+        for image in images:
+            aspect_finder.calculate_resolution(image, "720p")
+
+    def run_pixel_limit_solver() -> None:
+        for width, height in sizes:
+            pixel_limit.find_optimal_resolution(width, height, 589824)
+
+    return {
+        "wan_video_resolution_finder": measure(run_wan_finder, len(images), repeats),
+        "aspect_ratio_resolution_finder": measure(run_aspect_finder, len(images), repeats),
+        "pixel_limit_solver": measure(run_pixel_limit_solver, len(sizes), repeats),
+    }
+
+
+def build_tiny_m2m(directory: str):
+    """Random tiny M2M100 and an M2M100Tokenizer backed by a freshly trained SentencePiece model"""
+    import sentencepiece
+    import torch
+    from transformers import M2M100Config, M2M100ForConditionalGeneration, M2M100Tokenizer
+
+    rng = random.Random(SEED)
+    corpus_path = os.path.join(directory, "corpus.txt")
+    with open(corpus_path, "w", encoding="utf-8") as f:
+        for _ in range(2000):
+            f.write(" ".join(synthetic_words(12, rng)) + "\n")
+
+    model_prefix = os.path.join(directory, "spm")
+    sentencepiece.SentencePieceTrainer.train(
+        input=corpus_path,
+        model_prefix=model_prefix,
+        vocab_size=TINY_SPM_VOCAB_SIZE,
+        model_type="unigram",
+        character_coverage=1.0,
+        num_threads=1,
+        minloglevel=2,
+    )
+
+    # The M2M100 vocabulary maps the special tokens first, then every SentencePiece piece
+    processor = sentencepiece.SentencePieceProcessor(model_file=model_prefix + ".model")
+    vocab: dict[str, int] = {}
+    for token in ["<s>", "<pad>", "</s>", "<unk>"]:
+        vocab[token] = len(vocab)
+    for piece_id in range(processor.get_piece_size()):
+        vocab.setdefault(processor.id_to_piece(piece_id), len(vocab))
+    vocab_path = os.path.join(directory, "vocab.json")
+    with open(vocab_path, "w", encoding="utf-8") as f:
+        json.dump(vocab, f)
+
+    tokenizer = M2M100Tokenizer(vocab_path, model_prefix + ".model")
+
+    torch.manual_seed(SEED)
+    config = M2M100Config(
+        vocab_size=len(tokenizer),
+        pad_token_id=tokenizer.pad_token_id,
+        bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+        decoder_start_token_id=tokenizer.eos_token_id,
+        **TINY_M2M_CONFIG,
+    )
+    model = M2M100ForConditionalGeneration(config).eval()
+    return model, tokenizer
+
+
+def bench_m2m_translator(repeats: int) -> dict[str, dict]:
+    from nodes.decoding_policy import DecodingPolicy
+    from nodes.m2m_translator import M2MTranslator
+    from nodes.model_pool import PooledModel
+
+    cases: dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        model, tokenizer = build_tiny_m2m(directory)
+        entry = PooledModel(("tiny", "cpu", "fp32"), model, tokenizer, "cpu")
+        translator = M2MTranslator()
+
+        for length, words in TEXT_LENGTHS.items():
+            segments = synthetic_segments(words)
+            for num_beams in [1, 4]:
+                for batch_size in [1, 8]:
+                    cases[f"{length}/beams{num_beams}/batch{batch_size}"] = measure(
+                        lambda: translator.generate_translations(
+                            entry, segments, "en", "fr", num_beams, batch_size
+                        ),
+                        len(segments),
+                        repeats,
+                    )
+
+        # Several targets: one generate() per target against one encoder pass shared by all
+        segments = synthetic_segments(TEXT_LENGTHS["medium"])
+        translations = len(segments) * len(FAN_OUT_TARGETS)
+        cases["fan_out/per_target"] = measure(
+            lambda: [
+                translator.generate_translations(entry, segments, "en", language, 1, 8)
+                for language in FAN_OUT_TARGETS
+            ],
+            translations,
+            repeats,
+        )
+        cases["fan_out/shared_encoder"] = measure(
+            lambda: translator.generate_fan_out(
+                entry,
+                segments,
+                "en",
+                [FAN_OUT_TARGETS] * len(segments),
+                8 * len(FAN_OUT_TARGETS),
+                DecodingPolicy("greedy"),
+            ),
+            translations,
+            repeats,
+        )
+
+    # Detection latency on its own: cold scores every line, warm is served from the memo
+    lines = DETECTION_LINES * 4
+    detector = M2MTranslator._language_detector
+
+    def detect_cold() -> None:
+        detector.clear()
+        translator.detect_languages(lines)
+
+    cases["detect/cold"] = measure(detect_cold, len(lines), repeats)
+    cases["detect/warm"] = measure(
+        lambda: translator.detect_languages(lines), len(lines), repeats
+    )
+    return cases
+
+
+def run_suite(suite: str, repeats: int) -> dict[str, Any]:
+    """Run one suite in this process and report its cases and the process peak RSS"""
+    cases = globals()[f"bench_{suite}"](repeats)
+
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+    return {"peak_rss_mb": rss_mb, "cases": cases}
+
+
+def environment_info(threads: int) -> dict[str, Any]:
+    import torch
+
+    return {
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "torch_threads": threads or torch.get_num_threads(),
+    }
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Cases whose median latency grew by more than the tolerance"""
+    regressions: list[str] = []
+    for suite, suite_result in results["suites"].items():
+        baseline_cases = baseline.get("suites", {}).get(suite, {}).get("cases", {})
+        for case, result in suite_result["cases"].items():
+            reference = baseline_cases.get(case)
+            if reference is None:
+                continue
+            ratio = result["p50_seconds"] / reference["p50_seconds"]
+            if ratio > 1 + tolerance:
+                regressions.append(
+                    f"{suite}/{case}: p50 {result['p50_seconds'] * 1000:.2f} ms "
+                    f"vs {reference['p50_seconds'] * 1000:.2f} ms (+{(ratio - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=SUITES)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--threads", type=int, default=0, help="torch CPU threads (0: torch default)"
+    )
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Compare against a saved results file")
+    parser.add_argument("--save-baseline", help="Save the results as the new baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="Allowed relative p50 slowdown before a case counts as a regression",
+    )
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        import torch
+
+        if args.threads:
+            torch.set_num_threads(args.threads)
+        print(json.dumps(run_suite(args.single, args.repeats)))
+        return
+
+    # Keep transformers and huggingface_hub from reaching the network, and the node logs quiet
+    environment = dict(
+        os.environ,
+        HF_HUB_OFFLINE="1",
+        TRANSFORMERS_OFFLINE="1",
+        KEIT_NODES_LOG_LEVEL="WARNING",
+    )
+    results: dict[str, Any] = {
+        "environment": environment_info(args.threads),
+        "repeats": args.repeats,
+        "suites": {},
+    }
+    for suite in args.suites:
+        completed = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.run",
+                "--single",
+                suite,
+                "--repeats",
+                str(args.repeats),
+                "--threads",
+                str(args.threads),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=environment,
+        )
+        results["suites"][suite] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    print(f"{'case':<52}{'p50 [ms]':>10}{'p90 [ms]':>10}{'items/s':>11}")
+    for suite, suite_result in results["suites"].items():
+        print(f"{suite} (peak RSS {suite_result['peak_rss_mb']:.0f} MB)")
+        for case, result in suite_result["cases"].items():
+            print(
+                f"  {case:<50}{result['p50_seconds'] * 1000:>10.2f}"
+                f"{result['p90_seconds'] * 1000:>10.2f}"
+                f"{result['throughput_per_second']:>11.1f}"
+            )
+
+    for path in [args.output, args.save_baseline]:
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
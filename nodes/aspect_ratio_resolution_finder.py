@@ -1,4 +1,5 @@
 from typing import Tuple
+from .telemetry import logger, timed
 
 # 高さプリセットの定義
 HEIGHT_PRESETS = {
@@ -79,24 +80,22 @@ class AspectRatioResolutionFinder:
         target_height = HEIGHT_PRESETS[height_preset]
 
         # アスペクト比を維持した幅を計算
-        target_width, target_height = self.calculate_resolution_for_height(
-            original_width, original_height, target_height
-        )
+        with timed("AspectRatioResolutionFinder", "solve"):
+            target_width, target_height = self.calculate_resolution_for_height(
+                original_width, original_height, target_height
+            )
 
         # 計算後のアスペクト比
         target_aspect_ratio = self.calculate_aspect_ratio(target_width, target_height)
 
         # デバッグ情報の出力
-        print(f"Aspect Ratio Resolution Finder:")
-        print(
-            f"  Original: {original_width}x{original_height} (aspect: {original_aspect_ratio:.4f})"
-        )
-        print(
-            f"  Target: {target_width}x{target_height} (aspect: {target_aspect_ratio:.4f})"
+        logger.info(
+            f"Aspect Ratio Resolution Finder: {original_width}x{original_height} → "
+            f"{target_width}x{target_height} (height preset: {height_preset})"
         )
-        print(f"  Height Preset: {height_preset}")
-        print(
-            f"  Aspect ratio difference: {abs(original_aspect_ratio - target_aspect_ratio):.6f}"
+        logger.debug(
+            f"  Original aspect: {original_aspect_ratio:.4f}, target aspect: {target_aspect_ratio:.4f}, "
+            f"difference: {abs(original_aspect_ratio - target_aspect_ratio):.6f}"
         )
 
         return (target_width, target_height)
@@ -0,0 +1,84 @@
+import math
+from collections import Counter
+from typing import Any
+
+# beam: num_beams for every input (previous behaviour)
+# greedy: a single beam for every input
+# adaptive: greedy below beam_length_threshold input tokens, num_beams above
+DECODING_POLICIES = ["beam", "greedy", "adaptive"]
+
+# eager: plain PyTorch generate()
+# compiled: encoder and decoder compiled with torch.compile, eager again if compilation fails
+INFERENCE_BACKENDS = ["eager", "compiled"]
+
+# Lower bound of the input-derived max_new_tokens, so very short inputs can still finish
+MIN_NEW_TOKENS = 8
+
+
+class DecodingPolicy:
+    """
+    How generate() is called for each input, and a record of what was chosen
+    One instance is created per node call, so the record describes that call only.
+    """
+
+    def __init__(
+        self,
+        policy: str = "beam",
+        num_beams: int = 5,
+        beam_length_threshold: int = 16,
+        max_new_tokens_ratio: float = 0.0,
+        backend: str = "eager",
+    ):
+        if policy not in DECODING_POLICIES:
+            raise ValueError(f"Unknown decoding policy: {policy}")
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Unknown inference backend: {backend}")
+        self.policy: str = policy
+        self.num_beams: int = num_beams
+        self.beam_length_threshold: int = beam_length_threshold
+        self.max_new_tokens_ratio: float = max_new_tokens_ratio
+        self.backend: str = backend
+        # Set when the compiled backend was requested but eager mode did the work
+        self.backend_fallback: bool = False
+        self.strategies: Counter = Counter()
+        self.generate_seconds: float = 0.0
+
+    def num_beams_for(self, input_length: int) -> int:
+        """Beam width for an input of input_length tokens"""
+        if self.policy == "greedy":
+            return 1
+        if self.policy == "adaptive" and input_length < self.beam_length_threshold:
+            return 1
+        return self.num_beams
+
+    def max_new_tokens_for(self, input_length: int) -> int | None:
+        """Generation bound derived from the input length (None: the model's own limit)"""
+        if self.max_new_tokens_ratio <= 0:
+            return None
+        return max(MIN_NEW_TOKENS, math.ceil(input_length * self.max_new_tokens_ratio))
+
+    def cache_variant(self) -> str:
+        """Everything that changes the output, in the num_beams slot of the cache key"""
+        if self.policy == "beam" and self.max_new_tokens_ratio <= 0:
+            # Same key as before decoding policies existed, so old cache entries stay valid
+            return str(self.num_beams)
+        return (
+            f"{self.policy}:{self.num_beams}:{self.beam_length_threshold}:"
+            f"{self.max_new_tokens_ratio}"
+        )
+
+    def record(self, num_beams: int, count: int, seconds: float) -> None:
+        self.strategies["greedy" if num_beams == 1 else f"beam{num_beams}"] += count
+        self.generate_seconds += seconds
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "policy": self.policy,
+            "num_beams": self.num_beams,
+            "beam_length_threshold": self.beam_length_threshold,
+            "max_new_tokens_ratio": self.max_new_tokens_ratio,
+            "backend": self.backend,
+            "backend_fallback": self.backend_fallback,
+            "strategies": dict(self.strategies),
+            "generate_seconds": round(self.generate_seconds, 4),
+        }
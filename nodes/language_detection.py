@@ -0,0 +1,80 @@
+import threading
+from collections import OrderedDict
+from typing import Any
+from .telemetry import count
+
+# Default number of memoized detection results
+DEFAULT_MAX_CACHE_ENTRIES = 4096
+
+
+class LanguageDetector:
+    """
+    langid.py restricted to a candidate language set, with memoized and batched detection
+    Languages the caller cannot use are never predicted, and a smaller class set makes each
+    prediction cheaper. Uncached texts are scored together with one matrix product.
+    """
+
+    def __init__(
+        self,
+        candidates: list[str],
+        max_cache_entries: int = DEFAULT_MAX_CACHE_ENTRIES,
+    ):
+        self.candidates: list[str] = list(candidates)
+        self.max_cache_entries: int = max_cache_entries
+        self._identifier: Any = None
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+    def _get_identifier(self) -> Any:
+        """Dedicated identifier (langid is imported on first use), the global one is untouched"""
+        with self._lock:
+            if self._identifier is None:
+                from langid.langid import LanguageIdentifier, model
+
+                # Unnormalized scores, the same confidence values as langid.classify
+                identifier = LanguageIdentifier.from_modelstring(model, norm_probs=False)
+                supported = set(identifier.nb_classes)
+                identifier.set_languages(
+                    [language for language in self.candidates if language in supported]
+                )
+                self._identifier = identifier
+            return self._identifier
+
+    def detect_many(self, texts: list[str]) -> list[tuple[str, float]]:
+        """(language, confidence) for every text, in order"""
+        results: dict[str, tuple[str, float]] = {}
+        unique_texts = list(dict.fromkeys(texts))
+        with self._lock:
+            for text in unique_texts:
+                if text in self._cache:
+                    self._cache.move_to_end(text)
+                    results[text] = self._cache[text]
+
+        pending = [text for text in unique_texts if text not in results]
+        count("language_detection_cache_hits_total", len(unique_texts) - len(pending))
+        count("language_detection_cache_misses_total", len(pending))
+
+        if pending:
+            import numpy as np
+
+            identifier = self._get_identifier()
+            features = np.vstack([identifier.instance2fv(text) for text in pending])
+            scores = np.dot(features, identifier.nb_ptc) + identifier.nb_pc
+            best = scores.argmax(axis=1)
+
+            with self._lock:
+                for text, index, row in zip(pending, best, scores):
+                    result = (str(identifier.nb_classes[index]), float(row[index]))
+                    results[text] = result
+                    self._cache[text] = result
+                while len(self._cache) > self.max_cache_entries:
+                    self._cache.popitem(last=False)
+
+        return [results[text] for text in texts]
+
+    def detect(self, text: str) -> tuple[str, float]:
+        return self.detect_many([text])[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
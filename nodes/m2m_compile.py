@@ -0,0 +1,54 @@
+import copy
+import threading
+from typing import Any
+import torch
+from .model_pool import PooledModel
+from .telemetry import count, logger
+
+# TorchInductor caches its compiled kernels in its own default directory (or wherever the
+# user points TORCHINDUCTOR_CACHE_DIR); the environment is process-wide and shared with every
+# other torch.compile user, so it is left alone here.
+
+_compile_lock = threading.Lock()
+
+
+def build_compiled_model(model: torch.nn.Module) -> torch.nn.Module:
+    """
+    Shallow copy of an M2M-100 model whose encoder and decoder run through torch.compile
+    The copy shares every parameter with the eager model, so it costs no extra weight memory,
+    and the eager model stays untouched as the fallback. dynamic=True avoids recompiling for
+    each batch size and sequence length.
+    """
+    compiled = copy.copy(model)
+    compiled._modules = dict(model._modules)
+    inner = copy.copy(model.model)
+    inner._modules = dict(model.model._modules)
+    inner._modules["encoder"] = torch.compile(model.model.encoder, dynamic=True)
+    inner._modules["decoder"] = torch.compile(model.model.decoder, dynamic=True)
+    compiled._modules["model"] = inner
+    return compiled
+
+
+def get_compiled_model(entry: PooledModel) -> torch.nn.Module | None:
+    """Compiled variant of a pooled model, built on first use (None once compilation failed)"""
+    with _compile_lock:
+        if entry.compile_failed:
+            return None
+        if entry.compiled_model is None:
+            if not hasattr(torch, "compile"):
+                disable_compiled_model(entry, "torch.compile requires PyTorch 2.0 or later")
+                return None
+            entry.compiled_model = build_compiled_model(entry.model)
+            logger.info(f"Compiling M2M-100 {entry.key[0]} on first use")
+        return entry.compiled_model
+
+
+def disable_compiled_model(entry: PooledModel, error: Any) -> None:
+    """Fall back to eager mode for this model for the rest of its life in the pool"""
+    logger.warning(
+        f"Compiled inference is not available for M2M-100 {entry.key[0]} "
+        f"({entry.key[1]}, {entry.key[2]}), using eager mode ({error})"
+    )
+    count("compiled_fallbacks_total", model=entry.key[0])
+    entry.compiled_model = None
+    entry.compile_failed = True
@@ -0,0 +1,134 @@
+import os
+import time
+import torch
+from safetensors import safe_open
+from safetensors.torch import save_file
+from transformers import GenerationConfig, M2M100Config, M2M100ForConditionalGeneration
+from .telemetry import logger, metrics
+
+SAFETENSORS_NAME = "model.safetensors"
+PYTORCH_WEIGHTS_NAME = "pytorch_model.bin"
+
+# Parameter kept when several checkpoint entries share the same storage
+SHARED_EMBEDDING_NAME = "model.shared.weight"
+
+
+def ensure_safetensors(local_model_path: str) -> tuple[str, float]:
+    """
+    Return the safetensors weights of a snapshot, converting pytorch_model.bin once if needed
+
+    Returns:
+        tuple: (safetensors_path, conversion_seconds)
+    """
+    safetensors_path = os.path.join(local_model_path, SAFETENSORS_NAME)
+    if os.path.exists(safetensors_path):
+        return safetensors_path, 0.0
+
+    pytorch_path = os.path.join(local_model_path, PYTORCH_WEIGHTS_NAME)
+    if not os.path.exists(pytorch_path):
+        raise FileNotFoundError(f"No model weights found in {local_model_path}")
+
+    logger.info(f"Converting {pytorch_path} to safetensors (one-time)...")
+    start = time.perf_counter()
+    state_dict: dict[str, torch.Tensor] = torch.load(
+        pytorch_path, map_location="cpu", mmap=True, weights_only=True
+    )
+
+    # safetensors refuses shared storage, keep one entry per storage (tie_weights restores the rest)
+    groups: dict[int, list[str]] = {}
+    for name, tensor in state_dict.items():
+        groups.setdefault(tensor.untyped_storage().data_ptr(), []).append(name)
+    unique: dict[str, torch.Tensor] = {}
+    for names in groups.values():
+        name = SHARED_EMBEDDING_NAME if SHARED_EMBEDDING_NAME in names else names[0]
+        unique[name] = state_dict[name].contiguous()
+
+    # Write to a temporary file first so an interrupted conversion is never picked up
+    temporary_path = safetensors_path + ".tmp"
+    save_file(unique, temporary_path, metadata={"format": "pt"})
+    os.replace(temporary_path, safetensors_path)
+    return safetensors_path, time.perf_counter() - start
+
+
+def _rebuild_sinusoidal_buffers(model: torch.nn.Module) -> None:
+    """Recreate non-persistent positional tables that stay on the meta device after loading"""
+    for module in model.modules():
+        weights = module._buffers.get("weights")
+        if weights is None or not weights.is_meta or not hasattr(module, "make_weights"):
+            continue
+        num_embeddings = weights.size(0)
+        del module.weights
+        module.make_weights(num_embeddings, module.embedding_dim, module.padding_idx)
+
+
+def load_model_fast(
+    local_model_path: str, device: str, dtype: torch.dtype
+) -> M2M100ForConditionalGeneration:
+    """
+    Load M2M-100 without materializing the weights twice
+    The model skeleton is created on the meta device, tensors are read one by one from the
+    memory-mapped safetensors file and streamed to the target device and dtype.
+    """
+    timings: dict[str, float] = {
+        "convert": 0.0,
+        "init": 0.0,
+        "io": 0.0,
+        "transfer": 0.0,
+        "deserialize": 0.0,
+    }
+
+    weights_path, timings["convert"] = ensure_safetensors(local_model_path)
+
+    start = time.perf_counter()
+    config = M2M100Config.from_pretrained(local_model_path)
+    with torch.device("meta"):
+        model = M2M100ForConditionalGeneration(config)
+    timings["init"] = time.perf_counter() - start
+
+    state_dict: dict[str, torch.Tensor] = {}
+    with safe_open(weights_path, framework="pt", device="cpu") as weights:
+        for name in weights.keys():
+            start = time.perf_counter()
+            tensor = weights.get_tensor(name)
+            timings["io"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            if tensor.is_floating_point():
+                tensor = tensor.to(device=device, dtype=dtype)
+            else:
+                tensor = tensor.to(device=device)
+            state_dict[name] = tensor
+            timings["transfer"] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.load_state_dict(state_dict, strict=False, assign=True)
+    del state_dict
+    model.tie_weights()
+    _rebuild_sinusoidal_buffers(model)
+
+    missing = [
+        name
+        for name, tensor in list(model.named_parameters()) + list(model.named_buffers())
+        if tensor.is_meta
+    ]
+    if missing:
+        raise RuntimeError(f"Tensors missing from checkpoint: {', '.join(missing[:5])}")
+
+    model.to(device=device, dtype=dtype)
+    timings["deserialize"] = time.perf_counter() - start
+
+    try:
+        model.generation_config = GenerationConfig.from_pretrained(local_model_path)
+    except OSError:
+        model.generation_config = GenerationConfig.from_model_config(config)
+    model.eval()
+
+    for phase, seconds in timings.items():
+        metrics.observe(
+            "stage_duration_seconds", seconds, node="M2MTranslator", stage=f"load_{phase}"
+        )
+    logger.info(
+        "Fast load timings: "
+        + ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in timings.items())
+    )
+    return model
@@ -0,0 +1,252 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from tokenizers import (
+    AddedToken,
+    Regex,
+    Tokenizer,
+    decoders,
+    models,
+    normalizers,
+    pre_tokenizers,
+)
+from .telemetry import count, logger
+
+# Converted tokenizer, written next to the model snapshot
+FAST_TOKENIZER_NAME = "keit_fast_tokenizer.json"
+
+# Set to 0 to always encode and decode with the slow (SentencePiece) tokenizer
+FAST_TOKENIZER_ENV_VAR = "KEIT_M2M_FAST_TOKENIZER"
+
+# Default number of memoized encodings
+DEFAULT_MAX_ENCODE_CACHE_ENTRIES = 8192
+
+# Texts the converted tokenizer must encode and decode exactly like the slow one
+PARITY_SAMPLES: list[str] = [
+    "Hello, world! How are you today?",
+    "A red-haired girl walks straight towards the camera.",
+    "  Leading and trailing spaces,   and  repeated   ones.  ",
+    "Numbers 1234, 3.14 and dates like 2024-05-01 (ISO).",
+    "赤い髪の女の子がカメラに向かって真っ直ぐ歩いている",
+    "一位穿着红色连衣裙的女人站在樱花树下。",
+    "고양이가 창가에서 햇볕을 쬐며 잠을 자고 있다",
+    "Un vieil homme joue du violon dans une rue pavée, l'été.",
+    "Ein kleines Boot treibt auf einem ruhigen Bergsee – „schön“.",
+    "Кошка сидит на подоконнике и смотрит на снег",
+    "القطة تجلس على حافة النافذة",
+    "बिल्ली खिड़की पर बैठी है।",
+    "ＦＵＬＬＷＩＤＴＨ ｔｅｘｔ ①②③ and emoji 🐱",
+    "masterpiece, best quality, 1girl, solo, looking at viewer",
+]
+
+
+def build_fast_tokenizer(slow_tokenizer: Any) -> Tokenizer:
+    """
+    Build a tokenizers (Rust) Unigram tokenizer from an M2M100Tokenizer
+    The SentencePiece scores drive the segmentation and vocab.json provides the ids, so pieces
+    map to the same ids as in the slow tokenizer. Special and language tokens keep their ids.
+    """
+    from transformers.convert_slow_tokenizer import import_protobuf
+
+    model_pb2 = import_protobuf()
+    proto = model_pb2.ModelProto()
+    with open(slow_tokenizer.spm_file, "rb") as f:
+        proto.ParseFromString(f.read())
+
+    scores = {piece.piece: piece.score for piece in proto.pieces}
+    lowest = min(scores.values(), default=0.0) - 10.0
+    # vocab.json ids are contiguous from 0, the Unigram ids are positions in this list
+    encoder: dict[str, int] = slow_tokenizer.encoder
+    vocab = [
+        (token, scores.get(token, lowest))
+        for token, _ in sorted(encoder.items(), key=lambda item: item[1])
+    ]
+    tokenizer = Tokenizer(models.Unigram(vocab, unk_id=encoder[slow_tokenizer.unk_token]))
+
+    normalizer_spec = proto.normalizer_spec
+    steps: list[Any] = []
+    if normalizer_spec.precompiled_charsmap:
+        steps.append(normalizers.Precompiled(normalizer_spec.precompiled_charsmap))
+    if normalizer_spec.remove_extra_whitespaces:
+        steps += [normalizers.Strip(), normalizers.Replace(Regex(" {2,}"), " ")]
+    tokenizer.normalizer = normalizers.Sequence(steps)
+    prepend_scheme = "always" if normalizer_spec.add_dummy_prefix else "never"
+    tokenizer.pre_tokenizer = pre_tokenizers.Metaspace(
+        replacement="▁", prepend_scheme=prepend_scheme
+    )
+    tokenizer.decoder = decoders.Metaspace(replacement="▁", prepend_scheme=prepend_scheme)
+
+    # Language tokens follow the vocabulary in id order, exactly as in the slow tokenizer
+    special_tokens = sorted(
+        (slow_tokenizer.convert_tokens_to_ids(token), token)
+        for token in slow_tokenizer.all_special_tokens
+    )
+    tokenizer.add_special_tokens(
+        [AddedToken(token, special=True, normalized=False) for _, token in special_tokens]
+    )
+    for token_id, token in special_tokens:
+        if tokenizer.token_to_id(token) != token_id:
+            raise ValueError(f"Special token {token} got id {tokenizer.token_to_id(token)}")
+    return tokenizer
+
+
+def check_parity(slow_tokenizer: Any, fast_tokenizer: Tokenizer) -> str | None:
+    """First difference between the slow and the converted tokenizer on PARITY_SAMPLES"""
+    expected = slow_tokenizer(PARITY_SAMPLES, add_special_tokens=False)["input_ids"]
+    encodings = fast_tokenizer.encode_batch(PARITY_SAMPLES, add_special_tokens=False)
+    for text, ids, encoding in zip(PARITY_SAMPLES, expected, encodings):
+        if encoding.ids != ids:
+            return f"encoding of {text!r}"
+
+    language_id = slow_tokenizer.get_lang_id("en")
+    sequences = [[language_id] + ids + [slow_tokenizer.eos_token_id] for ids in expected]
+    decoded = fast_tokenizer.decode_batch(sequences, skip_special_tokens=True)
+    for text, sequence, fast_text in zip(PARITY_SAMPLES, sequences, decoded):
+        slow_text = slow_tokenizer.decode(sequence, skip_special_tokens=True)
+        if slow_tokenizer.clean_up_tokenization_spaces:
+            fast_text = slow_tokenizer.clean_up_tokenization(fast_text)
+        if fast_text != slow_text:
+            return f"decoding of {text!r}"
+    return None
+
+
+def load_fast_tokenizer(slow_tokenizer: Any, local_model_path: str) -> Tokenizer | None:
+    """
+    Converted tokenizer of a snapshot, converting and checking it once (None: use the slow one)
+    """
+    path = os.path.join(local_model_path, FAST_TOKENIZER_NAME)
+    if os.path.exists(path):
+        try:
+            return Tokenizer.from_file(path)
+        except Exception as e:
+            logger.warning(f"Discarding fast tokenizer cache {path} ({e})")
+
+    start = time.perf_counter()
+    try:
+        fast_tokenizer = build_fast_tokenizer(slow_tokenizer)
+        difference = check_parity(slow_tokenizer, fast_tokenizer)
+    except Exception as e:
+        logger.warning(f"Fast tokenizer conversion failed, using the slow tokenizer ({e})")
+        return None
+    if difference is not None:
+        logger.warning(
+            f"Fast tokenizer differs from the slow one ({difference}), using the slow tokenizer"
+        )
+        return None
+
+    # Write to a temporary file first so an interrupted save is never picked up
+    temporary_path = path + ".tmp"
+    try:
+        fast_tokenizer.save(temporary_path)
+        os.replace(temporary_path, path)
+    except OSError as e:
+        logger.warning(f"Could not save the fast tokenizer to {path} ({e})")
+    logger.info(
+        f"Converted the fast tokenizer in {time.perf_counter() - start:.2f}s, saved to {path}"
+    )
+    return fast_tokenizer
+
+
+class M2MTokenizer:
+    """
+    Front end of an M2M100Tokenizer: the Rust tokenizer for encoding and decoding when a
+    converted one is available, and a memo of encoded texts
+    Everything else (pad, get_lang_id, special token ids, ...) comes from the slow tokenizer.
+    The memo makes re-queued prompts skip tokenization entirely.
+    """
+
+    def __init__(
+        self,
+        slow_tokenizer: Any,
+        fast_tokenizer: Tokenizer | None = None,
+        max_cache_entries: int = DEFAULT_MAX_ENCODE_CACHE_ENTRIES,
+    ):
+        self.slow_tokenizer: Any = slow_tokenizer
+        self.fast_tokenizer: Tokenizer | None = fast_tokenizer
+        self.max_cache_entries: int = max_cache_entries
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[str, list[int]] = OrderedDict()
+
+    @property
+    def is_fast(self) -> bool:
+        return self.fast_tokenizer is not None
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not defined here
+        if name == "slow_tokenizer":
+            raise AttributeError(name)
+        return getattr(self.slow_tokenizer, name)
+
+    def __call__(self, texts: list[str], add_special_tokens: bool = False) -> dict[str, Any]:
+        """{"input_ids": ...} without special tokens (the caller adds the language and </s>)"""
+        if add_special_tokens:
+            return self.slow_tokenizer(texts, add_special_tokens=True)
+        return {"input_ids": self.encode_many(texts)}
+
+    def encode_many(self, texts: list[str]) -> list[list[int]]:
+        results: dict[str, list[int]] = {}
+        unique_texts = list(dict.fromkeys(texts))
+        with self._lock:
+            for text in unique_texts:
+                if text in self._cache:
+                    self._cache.move_to_end(text)
+                    results[text] = self._cache[text]
+
+        pending = [text for text in unique_texts if text not in results]
+        count("tokenizer_cache_hits_total", len(unique_texts) - len(pending))
+        count("tokenizer_cache_misses_total", len(pending))
+        if pending:
+            if self.fast_tokenizer is not None:
+                encoded = [
+                    encoding.ids
+                    for encoding in self.fast_tokenizer.encode_batch(
+                        pending, add_special_tokens=False
+                    )
+                ]
+            else:
+                encoded = self.slow_tokenizer(pending, add_special_tokens=False)["input_ids"]
+            with self._lock:
+                for text, ids in zip(pending, encoded):
+                    results[text] = ids
+                    self._cache[text] = ids
+                while len(self._cache) > self.max_cache_entries:
+                    self._cache.popitem(last=False)
+
+        # Copies, so callers can extend the ids without touching the memo
+        return [list(results[text]) for text in texts]
+
+    def tokenize(self, text: str) -> list[str]:
+        if self.fast_tokenizer is not None:
+            return self.fast_tokenizer.encode(text, add_special_tokens=False).tokens
+        return self.slow_tokenizer.tokenize(text)
+
+    def batch_decode(self, sequences: Any, skip_special_tokens: bool = True) -> list[str]:
+        if self.fast_tokenizer is None:
+            return self.slow_tokenizer.batch_decode(
+                sequences, skip_special_tokens=skip_special_tokens
+            )
+        if hasattr(sequences, "tolist"):
+            sequences = sequences.tolist()
+        decoded = self.fast_tokenizer.decode_batch(
+            sequences, skip_special_tokens=skip_special_tokens
+        )
+        if self.slow_tokenizer.clean_up_tokenization_spaces:
+            decoded = [self.slow_tokenizer.clean_up_tokenization(text) for text in decoded]
+        return decoded
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+def load_m2m_tokenizer(local_model_path: str) -> M2MTokenizer:
+    """M2M100 tokenizer of a snapshot behind the M2MTokenizer front end"""
+    from transformers import M2M100Tokenizer
+
+    slow_tokenizer = M2M100Tokenizer.from_pretrained(local_model_path)
+    fast_tokenizer = None
+    if os.environ.get(FAST_TOKENIZER_ENV_VAR, "1") != "0":
+        fast_tokenizer = load_fast_tokenizer(slow_tokenizer, local_model_path)
+    return M2MTokenizer(slow_tokenizer, fast_tokenizer)
@@ -0,0 +1,41 @@
+import sys
+from .m2m_translator import M2MTranslator
+from .telemetry import logger
+
+
+def register_routes() -> bool:
+    """
+    Add the M2M-100 unload and memory endpoints to the ComfyUI server
+    POST /keit_nodes/m2m/unload takes optional "model_size", "device" and "precision" fields
+    (every model when the body is empty); GET /keit_nodes/m2m/memory reports resident memory.
+    Skipped when the ComfyUI server is not available (benchmarks, scripts).
+    """
+    # Only look the server up: importing it outside ComfyUI would start pulling in the app
+    server = sys.modules.get("server")
+    prompt_server = getattr(getattr(server, "PromptServer", None), "instance", None)
+    if prompt_server is None:
+        return False
+
+    from aiohttp import web
+
+    routes = prompt_server.routes
+
+    @routes.post("/keit_nodes/m2m/unload")
+    async def unload(request):
+        try:
+            fields = await request.json() if request.can_read_body else {}
+        except ValueError:
+            return web.json_response({"error": "Invalid JSON body"}, status=400)
+        unloaded = M2MTranslator.unload(
+            fields.get("model_size"), fields.get("device"), fields.get("precision")
+        )
+        return web.json_response(
+            {"unloaded": unloaded, "memory": M2MTranslator.resident_memory()}
+        )
+
+    @routes.get("/keit_nodes/m2m/memory")
+    async def memory(request):
+        return web.json_response(M2MTranslator.resident_memory())
+
+    logger.debug("Registered /keit_nodes/m2m/unload and /keit_nodes/m2m/memory")
+    return True
@@ -1,22 +1,155 @@
-from typing import Any
+from collections import Counter
+from contextlib import contextmanager
+import hashlib
+import json
+import pickle
+import shutil
+import threading
+import time
+from typing import Any, Callable, Iterator
 import torch
-from transformers import M2M100ForConditionalGeneration, M2M100Tokenizer
-import langid
 import os
 import folder_paths
-from huggingface_hub import snapshot_download
+from .translation_cache import TranslationCache
+from .language_detection import LanguageDetector
+from .model_pool import ModelPool, PooledModel
+from .decoding_policy import DECODING_POLICIES, INFERENCE_BACKENDS, DecodingPolicy
+from .m2m_compile import disable_compiled_model, get_compiled_model
+from .m2m_worker import EXECUTION_MODES, worker_client
+from .sentence_splitter import plan_chunks, reassemble
+from .telemetry import count, logger, timed
+
+# transformers, tokenizers, langid, huggingface_hub and safetensors are imported on first use,
+# so registering this node does not slow down ComfyUI startup
 
 MODEL_CONFIGS = {
     "418M": {
         "model_name": "facebook/m2m100_418M",
         "cache_dir": "m2m100_418M",
+        "parameters": 418_000_000,
     },
     "1.2B": {
         "model_name": "facebook/m2m100_1.2B",
         "cache_dir": "m2m100_1.2B",
+        "parameters": 1_200_000_000,
     },
 }
 
+# VRAM requested from ComfyUI before a CUDA load, as a multiple of the weight size
+# (room for activations, beams and the key/value cache)
+LOAD_MEMORY_HEADROOM = 1.5
+
+PRECISIONS = ["auto", "fp32", "bf16", "dynamic-int8"]
+
+LOAD_MODES = ["standard", "fast"]
+
+PRECISION_DTYPES = {
+    "fp32": torch.float32,
+    "fp16": torch.float16,
+    "bf16": torch.bfloat16,
+    "dynamic-int8": torch.float32,  # Linear layers are quantized after loading
+}
+
+# Snapshot files identifying the weights the int8 cache was built from (the first weights
+# file present counts, so the one-time safetensors conversion does not invalidate the cache)
+SNAPSHOT_CONFIG_NAME = "config.json"
+SNAPSHOT_WEIGHTS_NAMES = ["pytorch_model.bin", "model.safetensors"]
+QUANTIZED_WEIGHTS_NAME = "quantized_state_dict.pt"
+
+# Languages offered by the node, supported by M2M-100 (selected major ones)
+LANGUAGES = [
+    "ja",  # Japanese
+    "en",  # English
+    "zh",  # Chinese
+    "ko",  # Korean
+    "fr",  # French
+    "de",  # German
+    "es",  # Spanish
+    "ru",  # Russian
+    "ar",  # Arabic
+    "hi",  # Hindi
+    "pt",  # Portuguese
+    "it",  # Italian
+    "tr",  # Turkish
+    "th",  # Thai
+    "vi",  # Vietnamese
+    "pl",  # Polish
+    "nl",  # Dutch
+    "sv",  # Swedish
+    "da",  # Danish
+    "no",  # Norwegian
+    "fi",  # Finnish
+    "cs",  # Czech
+    "hu",  # Hungarian
+    "ro",  # Romanian
+    "bg",  # Bulgarian
+    "hr",  # Croatian
+    "sk",  # Slovak
+    "sl",  # Slovenian
+    "et",  # Estonian
+    "lv",  # Latvian
+    "lt",  # Lithuanian
+    "uk",  # Ukrainian
+    "be",  # Belarusian
+    "mk",  # Macedonian
+    "sq",  # Albanian
+    "sr",  # Serbian
+    "bs",  # Bosnian
+    "is",  # Icelandic
+    "ga",  # Irish
+    "cy",  # Welsh
+    "ca",  # Catalan
+    "fa",  # Persian
+    "ur",  # Urdu
+    "bn",  # Bengali
+    "ta",  # Tamil
+    "te",  # Telugu
+    "kn",  # Kannada
+    "ml",  # Malayalam
+    "gu",  # Gujarati
+    "pa",  # Punjabi
+    "mr",  # Marathi
+    "ne",  # Nepali
+    "si",  # Sinhala
+    "my",  # Burmese
+    "km",  # Khmer
+    "lo",  # Lao
+    "ka",  # Georgian
+    "hy",  # Armenian
+    "az",  # Azerbaijani
+    "kk",  # Kazakh
+    "uz",  # Uzbek
+    "mn",  # Mongolian
+    "he",  # Hebrew
+    "yi",  # Yiddish
+    "sw",  # Swahili
+    "zu",  # Zulu
+    "xh",  # Xhosa
+    "af",  # Afrikaans
+    "am",  # Amharic
+    "ha",  # Hausa
+    "ig",  # Igbo
+    "yo",  # Yoruba
+    "so",  # Somali
+    "mg",  # Malagasy
+    "id",  # Indonesian
+    "ms",  # Malay
+    "tl",  # Tagalog
+    "jv",  # Javanese
+    "su",  # Sundanese
+    "ceb",  # Cebuano
+]
+
+# Upper bound of generate() calls running at the same time across all threads and nodes
+MAX_CONCURRENT_INFERENCE_ENV_VAR = "KEIT_M2M_MAX_CONCURRENT_INFERENCE"
+DEFAULT_MAX_CONCURRENT_INFERENCE = int(
+    os.environ.get(MAX_CONCURRENT_INFERENCE_ENV_VAR, "1")
+)
+
+# Models to load in the background at startup, e.g. "418M:cpu,1.2B:cuda:auto:fast"
+# Each entry is model_size[:device[:precision[:load_mode]]]
+WARMUP_ENV_VAR = "KEIT_M2M_WARMUP"
+
 
 class M2MTranslator:
     """
@@ -24,118 +157,167 @@ class M2MTranslator:
     """
 
     # Class variables to hold models (shared across multiple nodes)
-    _model: M2M100ForConditionalGeneration | None = None
-    _tokenizer: Any | None = None
-    _current_model_name: str | None = None
+    _model_pool: ModelPool = ModelPool()
+    _translation_cache: TranslationCache | None = None
+    # One lock per model (single flight): concurrent callers wait for an in-progress load of
+    # the same model, while different models load in parallel
+    _load_locks: dict[Any, threading.Lock] = {}
+    _load_locks_guard: threading.Lock = threading.Lock()
+    _load_states: dict[tuple[str, str, str], str] = {}
+    _inference_slots: threading.BoundedSemaphore = threading.BoundedSemaphore(
+        max(1, DEFAULT_MAX_CONCURRENT_INFERENCE)
+    )
+    # Tokenizers for planning sentence chunks, loaded without the model weights
+    _tokenizers: dict[str, Any] = {}
+    # auto_detect only chooses among the languages the node offers
+    _language_detector: LanguageDetector = LanguageDetector(LANGUAGES)
 
     def __init__(self):
         self.base_cache_dir = os.path.join(folder_paths.models_dir, "keit-nodes")
+        with self.load_lock("translation_cache"):
+            if M2MTranslator._translation_cache is None:
+                M2MTranslator._translation_cache = TranslationCache(
+                    os.path.join(self.base_cache_dir, "translation_cache.sqlite3")
+                )
 
     @classmethod
-    def INPUT_TYPES(cls):
-        # List of languages supported by M2M-100 (selected major ones)
-        languages = [
-            "auto_detect",
-            "ja",  # Japanese
-            "en",  # English
-            "zh",  # Chinese
-            "ko",  # Korean
-            "fr",  # French
-            "de",  # German
-            "es",  # Spanish
-            "ru",  # Russian
-            "ar",  # Arabic
-            "hi",  # Hindi
-            "pt",  # Portuguese
-            "it",  # Italian
-            "tr",  # Turkish
-            "th",  # Thai
-            "vi",  # Vietnamese
-            "pl",  # Polish
-            "nl",  # Dutch
-            "sv",  # Swedish
-            "da",  # Danish
-            "no",  # Norwegian
-            "fi",  # Finnish
-            "cs",  # Czech
-            "hu",  # Hungarian
-            "ro",  # Romanian
-            "bg",  # Bulgarian
-            "hr",  # Croatian
-            "sk",  # Slovak
-            "sl",  # Slovenian
-            "et",  # Estonian
-            "lv",  # Latvian
-            "lt",  # Lithuanian
-            "uk",  # Ukrainian
-            "be",  # Belarusian
-            "mk",  # Macedonian
-            "sq",  # Albanian
-            "sr",  # Serbian
-            "bs",  # Bosnian
-            "is",  # Icelandic
-            "ga",  # Irish
-            "cy",  # Welsh
-            "ca",  # Catalan
-            "fa",  # Persian
-            "ur",  # Urdu
-            "bn",  # Bengali
-            "ta",  # Tamil
-            "te",  # Telugu
-            "kn",  # Kannada
-            "ml",  # Malayalam
-            "gu",  # Gujarati
-            "pa",  # Punjabi
-            "mr",  # Marathi
-            "ne",  # Nepali
-            "si",  # Sinhala
-            "my",  # Burmese
-            "km",  # Khmer
-            "lo",  # Lao
-            "ka",  # Georgian
-            "hy",  # Armenian
-            "az",  # Azerbaijani
-            "kk",  # Kazakh
-            "uz",  # Uzbek
-            "mn",  # Mongolian
-            "he",  # Hebrew
-            "yi",  # Yiddish
-            "sw",  # Swahili
-            "zu",  # Zulu
-            "xh",  # Xhosa
-            "af",  # Afrikaans
-            "am",  # Amharic
-            "ha",  # Hausa
-            "ig",  # Igbo
-            "yo",  # Yoruba
-            "so",  # Somali
-            "mg",  # Malagasy
-            "id",  # Indonesian
-            "ms",  # Malay
-            "tl",  # Tagalog
-            "jv",  # Javanese
-            "su",  # Sundanese
-            "ceb",  # Cebuano
-        ]
+    def load_lock(cls, key) -> threading.Lock:
+        """Lock serializing the loading of one resource (model, tokenizer, cache)"""
+        with cls._load_locks_guard:
+            lock = cls._load_locks.get(key)
+            if lock is None:
+                lock = cls._load_locks[key] = threading.Lock()
+            return lock
 
+    @classmethod
+    def INPUT_TYPES(cls):
         return {
             "required": {
                 "text": ("STRING", {"multiline": True, "default": "こんにちは、世界"}),
-                "source_language": (languages, {"default": "auto_detect"}),
-                "target_language": (
-                    languages[1:],
-                    {"default": "en"},  # exclude auto_detect
+                "source_language": (
+                    ["auto_detect"] + LANGUAGES,
+                    {"default": "auto_detect"},
                 ),
+                "target_language": (LANGUAGES, {"default": "en"}),
                 "model_size": (["418M", "1.2B"], {"default": "418M"}),
                 "device": (["auto", "cpu", "cuda"], {"default": "auto"}),
             },
             "optional": {
                 "num_beams": ("INT", {"default": 5, "min": 1, "max": 10, "step": 1}),
+                "batch_mode": (
+                    "BOOLEAN",
+                    {
+                        "default": False,
+                        "tooltip": "Translate each line separately in padded mini-batches and join the results in the original order",
+                    },
+                ),
+                "batch_size": (
+                    "INT",
+                    {
+                        "default": 8,
+                        "min": 1,
+                        "max": 128,
+                        "step": 1,
+                        "tooltip": "Number of lines passed to a single generate() call in batch mode",
+                    },
+                ),
+                "use_cache": (
+                    "BOOLEAN",
+                    {
+                        "default": True,
+                        "tooltip": "Reuse previous translations of the same text, stored in memory and on disk",
+                    },
+                ),
+                "precision": (
+                    PRECISIONS,
+                    {
+                        "default": "auto",
+                        "tooltip": "auto: fp16 on CUDA, fp32 on CPU. dynamic-int8 quantizes the Linear layers for CPU inference",
+                    },
+                ),
+                "load_mode": (
+                    LOAD_MODES,
+                    {
+                        "default": "standard",
+                        "tooltip": "fast: memory-map safetensors weights onto a meta-device model and stream them to the device",
+                    },
+                ),
+                "split_sentences": (
+                    "BOOLEAN",
+                    {
+                        "default": False,
+                        "tooltip": "Split long text into sentences, translate them in token-budgeted chunks as a batch and rejoin them with the original whitespace and line breaks, instead of truncating at the model's maximum length",
+                    },
+                ),
+                "max_chunk_tokens": (
+                    "INT",
+                    {
+                        "default": 200,
+                        "min": 16,
+                        "max": 1000,
+                        "step": 1,
+                        "tooltip": "Token budget of one chunk when split_sentences is enabled",
+                    },
+                ),
+                "decoding_policy": (
+                    DECODING_POLICIES,
+                    {
+                        "default": "beam",
+                        "tooltip": "beam: num_beams for every input. greedy: one beam (fastest). adaptive: greedy for inputs shorter than beam_length_threshold tokens, num_beams for longer ones",
+                    },
+                ),
+                "beam_length_threshold": (
+                    "INT",
+                    {
+                        "default": 16,
+                        "min": 1,
+                        "max": 1024,
+                        "step": 1,
+                        "tooltip": "Input length in tokens from which adaptive decoding uses beam search",
+                    },
+                ),
+                "max_new_tokens_ratio": (
+                    "FLOAT",
+                    {
+                        "default": 0.0,
+                        "min": 0.0,
+                        "max": 8.0,
+                        "step": 0.1,
+                        "tooltip": "Limit generated tokens to this multiple of the input length (at least 8). 0: the model's own limit",
+                    },
+                ),
+                "execution_mode": (
+                    EXECUTION_MODES,
+                    {
+                        "default": "in_process",
+                        "tooltip": "worker: run the model in a separate local process that batches requests from concurrent executions, so a crash or out-of-memory error there does not take ComfyUI down",
+                    },
+                ),
+                "target_languages": (
+                    "STRING",
+                    {
+                        "default": "",
+                        "tooltip": "Additional target languages separated by commas (e.g. fr,de,ko). The source is encoded once and all targets are decoded as one batch; the translations output maps each language, target_language included, to its translation",
+                    },
+                ),
+                "inference_backend": (
+                    INFERENCE_BACKENDS,
+                    {
+                        "default": "eager",
+                        "tooltip": "compiled: run the encoder and decoder through torch.compile (compiled once per model, kernels cached by TorchInductor), falling back to eager mode if compilation fails",
+                    },
+                ),
             },
         }
 
-    RETURN_TYPES = ("STRING", "STRING", "FLOAT")
-    RETURN_NAMES = ("translated_text", "detected_language", "confidence")
+    RETURN_TYPES = ("STRING", "STRING", "FLOAT", "STRING", "STRING")
+    RETURN_NAMES = (
+        "translated_text",
+        "detected_language",
+        "confidence",
+        "decode_info",
+        "translations",
+    )
 
     FUNCTION = "translate"
     CATEGORY = "keitNodes"
@@ -148,73 +330,970 @@ class M2MTranslator:
             MODEL_CONFIGS[model_size]["cache_dir"],
         )
 
-        # Check if the model is already downloaded
-        if os.path.exists(cache_path) and os.listdir(cache_path):
-            print(f"Model {model_size} already exists at {cache_path}")
+        # Loads of the same size on different devices share one download, and nobody sees
+        # a partially downloaded directory
+        with self.load_lock(("download", model_size)):
+            # Check if the model is already downloaded
+            if os.path.exists(cache_path) and os.listdir(cache_path):
+                logger.debug(f"Model {model_size} already exists at {cache_path}")
+                return cache_path
+
+            from huggingface_hub import snapshot_download
+
+            # Download the model
+            logger.info(f"Downloading M2M-100 {model_size} model to {cache_path}...")
+            downloaded_path = snapshot_download(
+                repo_id=model_name,
+                local_dir=cache_path,
+                local_dir_use_symlinks=False,  # Copy actual files without using symbolic links
+            )
+            logger.info(f"Model downloaded to {downloaded_path}")
             return cache_path
 
-        # Download the model
-        print(f"Downloading M2M-100 {model_size} model to {cache_path}...")
-        downloaded_path = snapshot_download(
-            repo_id=model_name,
-            local_dir=cache_path,
-            local_dir_use_symlinks=False,  # Copy actual files without using symbolic links
+    def resolve_device(self, device) -> str:
+        """Determine the device actually used for inference"""
+        if device == "auto":
+            return "cuda" if torch.cuda.is_available() else "cpu"
+        if device == "cuda" and not torch.cuda.is_available():
+            logger.warning("CUDA is not available, falling back to CPU")
+            return "cpu"
+        return device
+
+    def resolve_precision(self, actual_device, precision) -> str:
+        """Determine the precision actually used on the given device"""
+        if precision == "auto":
+            return "fp16" if actual_device == "cuda" else "fp32"
+        if precision == "dynamic-int8" and actual_device != "cpu":
+            logger.warning("dynamic-int8 is only supported on CPU, using fp16")
+            return "fp16"
+        return precision
+
+    def load_pretrained(
+        self, local_model_path, actual_device, dtype, load_mode="standard"
+    ) -> torch.nn.Module:
+        """Load the snapshot weights on the device with the given dtype"""
+        from transformers import M2M100ForConditionalGeneration
+
+        if load_mode == "fast":
+            from .m2m_fast_loader import load_model_fast
+
+            try:
+                return load_model_fast(local_model_path, actual_device, dtype)
+            except (RuntimeError, OSError) as e:
+                logger.warning(f"Fast loading failed, using standard loading ({e})")
+
+        if actual_device == "cuda":
+            return M2M100ForConditionalGeneration.from_pretrained(
+                local_model_path,  # specify local path
+                torch_dtype=dtype,
+                device_map="auto",
+            ).cuda()
+
+        return M2M100ForConditionalGeneration.from_pretrained(
+            local_model_path,  # specify local path
+            torch_dtype=dtype,
         )
-        print(f"Model downloaded to {downloaded_path}")
-        return cache_path
 
-    def load_model(self, model_size, device) -> None:
-        """Lazy load the model (first time only)"""
-        model_name = MODEL_CONFIGS[model_size]["model_name"]
+    def load_quantized_model(
+        self, model_size, local_model_path, load_mode="standard"
+    ) -> torch.nn.Module:
+        """
+        Load the dynamic int8 model, reusing the quantized weights cached on disk
+        The cache holds a plain state dict (loaded with weights_only=True) in a directory named
+        after the snapshot and the torch version, so a new snapshot or torch rebuilds it.
+        """
+        quantized_root = os.path.join(
+            self.base_cache_dir, f"{MODEL_CONFIGS[model_size]['cache_dir']}-int8"
+        )
+        cache_name = f"{snapshot_fingerprint(local_model_path)}-torch{torch.__version__}"
+        quantized_path = os.path.join(quantized_root, cache_name, QUANTIZED_WEIGHTS_NAME)
 
-        # Determine device
-        if device == "auto":
-            actual_device = "cuda" if torch.cuda.is_available() else "cpu"
-        elif device == "cuda":
-            if not torch.cuda.is_available():
-                print("Warning: CUDA is not available, falling back to CPU")
-                actual_device = "cpu"
-            else:
-                actual_device = "cuda"
-        else:
-            actual_device = "cpu"
+        if os.path.exists(quantized_path):
+            from transformers import M2M100Config, M2M100ForConditionalGeneration
+            from transformers.modeling_utils import no_init_weights
 
-        # Do nothing if the model and device combination is already loaded
-        model_key = f"{model_name}_{actual_device}"
-        if self._model is not None and self._current_model_name == model_key:
-            return
+            # Build an empty skeleton with the same quantized structure, then load the weights
+            config = M2M100Config.from_pretrained(local_model_path)
+            with no_init_weights():
+                model = M2M100ForConditionalGeneration(config)
+            with torch.no_grad():
+                for parameter in model.parameters():
+                    parameter.zero_()
+            model = torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            try:
+                model.load_state_dict(
+                    torch.load(quantized_path, map_location="cpu", weights_only=True)
+                )
+                model.eval()
+                logger.info(f"Loaded quantized weights from {quantized_path}")
+                return model
+            except (RuntimeError, OSError, pickle.UnpicklingError) as e:
+                logger.warning(f"Discarding quantized weights cache ({e})")
+
+        model = self.load_pretrained(local_model_path, "cpu", torch.float32, load_mode)
+        model = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        model.eval()
+
+        # Caches of other snapshots or torch versions (and the old unversioned file) are stale
+        if os.path.isdir(quantized_root):
+            for name in os.listdir(quantized_root):
+                if name != cache_name:
+                    stale_path = os.path.join(quantized_root, name)
+                    if os.path.isdir(stale_path):
+                        shutil.rmtree(stale_path, ignore_errors=True)
+                    else:
+                        os.remove(stale_path)
+
+        # Write to a temporary file first so an interrupted save is never picked up
+        os.makedirs(os.path.dirname(quantized_path), exist_ok=True)
+        temporary_path = quantized_path + ".tmp"
+        torch.save(model.state_dict(), temporary_path)
+        os.replace(temporary_path, quantized_path)
+        logger.info(f"Saved quantized weights to {quantized_path}")
+        return model
+
+    def load_model(
+        self, model_size, device, precision="auto", load_mode="standard", pin=False
+    ) -> PooledModel:
+        """
+        Lazy load the model (first time only) and return the pooled entry
+        With pin, the entry is pinned in the same step, so no other thread can evict it before
+        the caller uses it; the caller must unpin it (see use_model).
+        """
+        actual_device = self.resolve_device(device)
+        actual_precision = self.resolve_precision(actual_device, precision)
+
+        # Reuse the pooled model for this size, device and precision combination
+        model_key = (model_size, actual_device, actual_precision)
+        entry = self._model_pool.get(model_key, pin)
+        if entry is not None:
+            return entry
+
+        with self.load_lock(model_key):
+            # Another caller may have finished loading while we were waiting
+            entry = self._model_pool.get(model_key, pin)
+            if entry is not None:
+                return entry
+
+            M2MTranslator._load_states[model_key] = "loading"
+            try:
+                with timed("M2MTranslator", "load"):
+                    entry = self.load_model_entry(
+                        model_size, actual_device, actual_precision, load_mode, pin
+                    )
+            except Exception:
+                M2MTranslator._load_states[model_key] = "failed"
+                count("model_loads_total", model=model_size, result="failed")
+                raise
+            M2MTranslator._load_states[model_key] = "ready"
+            count("model_loads_total", model=model_size, result="ready")
+            return entry
+
+    def load_model_entry(
+        self, model_size, actual_device, actual_precision, load_mode="standard", pin=False
+    ) -> PooledModel:
+        """Load the model and tokenizer and add them to the pool"""
+        model_key = (model_size, actual_device, actual_precision)
 
         # Download the model in advance
         local_model_path = self.ensure_model_downloaded(model_size)
 
         # Model loading process
-        print(
-            f"Loading M2M-100 {model_size} model from {local_model_path} on {actual_device}..."
+        logger.info(
+            f"Loading M2M-100 {model_size} model from {local_model_path} on {actual_device} ({actual_precision})..."
         )
 
         if actual_device == "cuda":
-            self._model = M2M100ForConditionalGeneration.from_pretrained(
-                local_model_path,  # specify local path
-                torch_dtype=torch.float16,
-                device_map="auto",
-            ).cuda()
+            self.request_device_memory(model_size, actual_precision)
+
+        if actual_precision == "dynamic-int8":
+            model = self.load_quantized_model(model_size, local_model_path, load_mode)
         else:
-            self._model = M2M100ForConditionalGeneration.from_pretrained(
-                local_model_path,  # specify local path
-                torch_dtype=torch.float32,
+            model = self.load_pretrained(
+                local_model_path,
+                actual_device,
+                PRECISION_DTYPES[actual_precision],
+                load_mode,
             )
 
-        self._tokenizer = M2M100Tokenizer.from_pretrained(
-            local_model_path,  # specify local path
+        from .m2m_fast_tokenizer import load_m2m_tokenizer
+
+        tokenizer = load_m2m_tokenizer(local_model_path)
+        entry = PooledModel(model_key, model, tokenizer, actual_device)
+        self._model_pool.put(entry, pin)
+        self._model_pool.start_idle_unloader()
+        logger.info(f"Model loaded successfully on {actual_device}!")
+        return entry
+
+    @contextmanager
+    def use_model(
+        self, model_size, device, precision="auto", load_mode="standard"
+    ) -> Iterator[PooledModel]:
+        """Pooled entry pinned for the duration of the block (no eviction or idle unload)"""
+        entry = self.load_model(model_size, device, precision, load_mode, pin=True)
+        try:
+            yield entry
+        finally:
+            self._model_pool.unpin(entry)
+
+    def request_device_memory(self, model_size, actual_precision) -> None:
+        """Ask ComfyUI's memory manager to offload its models until this one fits on the GPU"""
+        try:
+            import comfy.model_management as model_management
+        except ImportError:
+            return
+
+        bytes_per_parameter = torch.finfo(PRECISION_DTYPES[actual_precision]).bits // 8
+        required = int(
+            MODEL_CONFIGS[model_size]["parameters"] * bytes_per_parameter * LOAD_MEMORY_HEADROOM
         )
-        self._current_model_name = model_key
-        self.current_device = actual_device
-        print(f"Model loaded successfully on {actual_device}!")
+        try:
+            with timed("M2MTranslator", "free_memory"):
+                model_management.free_memory(required, model_management.get_torch_device())
+        except Exception as e:
+            logger.warning(f"Could not free GPU memory through ComfyUI ({e})")
+            return
+        logger.debug(f"Requested {required / (1024 * 1024):.0f} MB of GPU memory from ComfyUI")
+
+    @classmethod
+    def unload(cls, model_size=None, device=None, precision=None) -> list[str]:
+        """
+        Unload the pooled models matching the given fields (every model by default)
+        device and precision are the resolved values (e.g. cuda, fp16). Unloading everything
+        also drops the planning tokenizers and stops the translation worker. A model in use
+        by a running translation is released when that translation finishes.
+        """
+        keys = [
+            key
+            for key in cls._model_pool.keys()
+            if (model_size is None or key[0] == model_size)
+            and (device is None or key[1] == device)
+            and (precision is None or key[2] == precision)
+        ]
+        for key in keys:
+            cls._model_pool.evict(key, "unload")
+        if model_size is None and device is None and precision is None:
+            cls._tokenizers.clear()
+            worker_client.stop()
+        logger.info(f"Unloaded {len(keys)} M2M-100 model(s)")
+        return [":".join(key) for key in keys]
+
+    @classmethod
+    def resident_memory(cls) -> dict[str, Any]:
+        """Memory held by the translator and its process, in MB"""
+        megabyte = 1024 * 1024
+        memory: dict[str, Any] = {
+            "models": len(cls._model_pool.keys()),
+            "pool_mb": cls._model_pool.total_bytes() / megabyte,
+            "worker_running": worker_client.is_running(),
+        }
+        try:
+            import psutil
+
+            memory["process_rss_mb"] = psutil.Process().memory_info().rss / megabyte
+        except ImportError:
+            pass
+        if torch.cuda.is_available():
+            memory["cuda_allocated_mb"] = torch.cuda.memory_allocated() / megabyte
+            memory["cuda_reserved_mb"] = torch.cuda.memory_reserved() / megabyte
+        return memory
+
+    @classmethod
+    def get_load_states(cls) -> dict[str, str]:
+        """Load state of every model requested so far (loading / ready / failed / evicted)"""
+        pooled_keys = cls._model_pool.keys()
+        states: dict[str, str] = {}
+        for model_key, state in list(cls._load_states.items()):
+            if model_key in pooled_keys:
+                state = "ready"
+            elif state == "ready":
+                state = "evicted"
+            states[":".join(model_key)] = state
+        return states
+
+    def warmup(self, model_size, device, precision="auto", load_mode="standard") -> None:
+        """Load a model and run one short generation to warm the kernels"""
+        with self.use_model(model_size, device, precision, load_mode) as entry:
+            self.generate_translations(entry, ["Hello"], "en", "fr", num_beams=1)
+        logger.info(f"Warm-up finished for M2M-100 {model_size} on {entry.device}")
 
     def detect_language(self, text) -> tuple[str, float]:
         """Automatically detect language"""
-        lang_code, confidence = langid.classify(text)
-        return lang_code, confidence
+        return self.detect_languages([text])[0]
+
+    def detect_languages(self, texts: list[str]) -> list[tuple[str, float]]:
+        """Detect the language of several texts at once (memoized)"""
+        with timed("M2MTranslator", "detect"):
+            return self._language_detector.detect_many(texts)
+
+    def encode(
+        self, tokenizer, texts: list[str], source_language: str
+    ) -> tuple[list[list[int]], int]:
+        """
+        Token ids in the M2M-100 source format: [source language id] + tokens + [</s>]
+        The special tokens are added here instead of through tokenizer.src_lang, so a tokenizer
+        shared by concurrent calls is never mutated.
+
+        Returns:
+            tuple: (input_ids, number of texts truncated at the model's maximum length)
+        """
+        language_id: int = tokenizer.get_lang_id(source_language)
+        eos_id: int = tokenizer.eos_token_id
+        limit = tokenizer.model_max_length - 2
+        input_ids: list[list[int]] = []
+        truncated = 0
+        for ids in tokenizer(texts, add_special_tokens=False)["input_ids"]:
+            if len(ids) > limit:
+                ids = ids[:limit]
+                truncated += 1
+            input_ids.append([language_id] + ids + [eos_id])
+        return input_ids, truncated
+
+    def generate_translations(
+        self,
+        entry: PooledModel,
+        texts: list[str],
+        source_language: str,
+        target_language: str,
+        num_beams: int = 5,
+        batch_size: int = 8,
+        policy: DecodingPolicy | None = None,
+    ) -> list[str]:
+        """Translate texts of a single source language in padded mini-batches"""
+        policy = policy or DecodingPolicy("beam", num_beams)
+        model = entry.model
+        tokenizer = entry.tokenizer
+        with timed("M2MTranslator", "tokenize"):
+            input_ids, truncated = self.encode(tokenizer, texts, source_language)
+            forced_bos_token_id: int = tokenizer.get_lang_id(target_language)
+
+        if truncated:
+            logger.warning(
+                f"{truncated} text(s) truncated at {tokenizer.model_max_length} tokens, "
+                "enable split_sentences to translate them in full"
+            )
+
+        results: list[str] = [""] * len(texts)
+
+        # Inputs sharing a beam width form the length-sorted mini-batches
+        for beams, run in self.split_beam_runs(input_ids, policy):
+            for start in range(0, len(run), batch_size):
+                batch_indices = run[start : start + batch_size]
+                inputs = tokenizer.pad(
+                    {"input_ids": [input_ids[i] for i in batch_indices]},
+                    return_tensors="pt",
+                ).to(entry.device)
+
+                generate_options: dict[str, Any] = {"num_beams": beams}
+                if beams > 1:
+                    generate_options["early_stopping"] = True
+                max_new_tokens = policy.max_new_tokens_for(
+                    max(len(input_ids[i]) for i in batch_indices)
+                )
+                if max_new_tokens is not None:
+                    generate_options["max_new_tokens"] = max_new_tokens
+
+                with timed("M2MTranslator", "inference_wait"):
+                    self._inference_slots.acquire()
+                try:
+                    started = time.perf_counter()
+                    with timed("M2MTranslator", "generate"), torch.no_grad():
+                        generated_tokens = self.run_on_backend(
+                            entry,
+                            model,
+                            policy,
+                            lambda backend_model: backend_model.generate(
+                                **inputs,
+                                forced_bos_token_id=forced_bos_token_id,
+                                use_cache=True,
+                                **generate_options,
+                            ),
+                        )
+                    seconds = time.perf_counter() - started
+                finally:
+                    self._inference_slots.release()
+                policy.record(beams, len(batch_indices), seconds)
+
+                with timed("M2MTranslator", "decode"):
+                    decoded = tokenizer.batch_decode(
+                        generated_tokens, skip_special_tokens=True
+                    )
+                for index, translated_text in zip(batch_indices, decoded):
+                    results[index] = translated_text
+
+        return results
+
+    def run_on_backend(
+        self,
+        entry: PooledModel,
+        model: torch.nn.Module,
+        policy: DecodingPolicy,
+        function: Callable[[torch.nn.Module], Any],
+    ) -> Any:
+        """
+        Call function with the model of the policy's backend
+        The compiled model is built on first use; if compiling or running it fails, the entry
+        falls back to eager mode for good and the call is repeated on the eager model.
+        """
+        if policy.backend == "compiled":
+            compiled_model = get_compiled_model(entry)
+            if compiled_model is not None:
+                try:
+                    return function(compiled_model)
+                except torch.cuda.OutOfMemoryError:
+                    # Not a compilation problem, eager mode would run out of memory as well
+                    raise
+                except Exception as e:
+                    disable_compiled_model(entry, e)
+            policy.backend_fallback = True
+        return function(model)
+
+    def split_beam_runs(
+        self, input_ids: list[list[int]], policy: DecodingPolicy
+    ) -> list[tuple[int, list[int]]]:
+        """
+        Length-sorted input indices split into runs sharing a beam width
+        Sorting keeps the padding of each mini-batch small; adaptive decoding splits the
+        order into one greedy run followed by one beam run.
+        """
+        order: list[int] = sorted(range(len(input_ids)), key=lambda i: len(input_ids[i]))
+        runs: list[tuple[int, list[int]]] = []
+        for index in order:
+            beams = policy.num_beams_for(len(input_ids[index]))
+            if runs and runs[-1][0] == beams:
+                runs[-1][1].append(index)
+            else:
+                runs.append((beams, [index]))
+        return runs
+
+    def generate_fan_out(
+        self,
+        entry: PooledModel,
+        texts: list[str],
+        source_language: str,
+        target_languages: list[list[str]],
+        batch_size: int = 8,
+        policy: DecodingPolicy | None = None,
+    ) -> list[dict[str, str]]:
+        """
+        Translate each text into its own list of target languages with one encoder pass
+        The encoder states of a text are shared by one decoder row per target, started with
+        [</s>, target language id], so all targets are decoded as one batch. batch_size bounds
+        the decoder rows of a mini-batch.
+        """
+        from transformers.modeling_outputs import BaseModelOutput
+
+        policy = policy or DecodingPolicy()
+        model = entry.model
+        tokenizer = entry.tokenizer
+        with timed("M2MTranslator", "tokenize"):
+            input_ids, truncated = self.encode(tokenizer, texts, source_language)
+        if truncated:
+            logger.warning(
+                f"{truncated} text(s) truncated at {tokenizer.model_max_length} tokens, "
+                "enable split_sentences to translate them in full"
+            )
+
+        decoder_start_token_id: int = model.config.decoder_start_token_id
+        results: list[dict[str, str]] = [{} for _ in texts]
+
+        for beams, run in self.split_beam_runs(input_ids, policy):
+            start = 0
+            while start < len(run):
+                # Pack texts until their decoder rows fill batch_size (at least one text)
+                batch_indices = [run[start]]
+                rows = len(target_languages[run[start]])
+                start += 1
+                while (
+                    start < len(run)
+                    and rows + len(target_languages[run[start]]) <= batch_size
+                ):
+                    rows += len(target_languages[run[start]])
+                    batch_indices.append(run[start])
+                    start += 1
+
+                inputs = tokenizer.pad(
+                    {"input_ids": [input_ids[i] for i in batch_indices]},
+                    return_tensors="pt",
+                ).to(entry.device)
+                # (text index, target language) of every decoder row, and the encoder row it reads
+                row_targets = [
+                    (index, language)
+                    for index in batch_indices
+                    for language in target_languages[index]
+                ]
+                row_sources = torch.tensor(
+                    [
+                        position
+                        for position, index in enumerate(batch_indices)
+                        for _ in target_languages[index]
+                    ],
+                    device=entry.device,
+                )
+                decoder_input_ids = torch.tensor(
+                    [
+                        [decoder_start_token_id, tokenizer.get_lang_id(language)]
+                        for _, language in row_targets
+                    ],
+                    device=entry.device,
+                )
+
+                generate_options: dict[str, Any] = {"num_beams": beams}
+                if beams > 1:
+                    generate_options["early_stopping"] = True
+                max_new_tokens = policy.max_new_tokens_for(
+                    max(len(input_ids[i]) for i in batch_indices)
+                )
+                if max_new_tokens is not None:
+                    # The language token is part of the prompt here instead of being generated
+                    generate_options["max_new_tokens"] = max(1, max_new_tokens - 1)
+
+                with timed("M2MTranslator", "inference_wait"):
+                    self._inference_slots.acquire()
+                try:
+                    started = time.perf_counter()
+                    with timed("M2MTranslator", "encode"), torch.no_grad():
+                        hidden_states = self.run_on_backend(
+                            entry,
+                            model,
+                            policy,
+                            lambda backend_model: backend_model.get_encoder()(
+                                input_ids=inputs["input_ids"],
+                                attention_mask=inputs["attention_mask"],
+                                return_dict=True,
+                            ).last_hidden_state,
+                        )
+                    with timed("M2MTranslator", "generate"), torch.no_grad():
+                        generated_tokens = self.run_on_backend(
+                            entry,
+                            model,
+                            policy,
+                            lambda backend_model: backend_model.generate(
+                                encoder_outputs=BaseModelOutput(
+                                    last_hidden_state=hidden_states.index_select(
+                                        0, row_sources
+                                    )
+                                ),
+                                attention_mask=inputs["attention_mask"].index_select(
+                                    0, row_sources
+                                ),
+                                decoder_input_ids=decoder_input_ids,
+                                use_cache=True,
+                                **generate_options,
+                            ),
+                        )
+                    seconds = time.perf_counter() - started
+                finally:
+                    self._inference_slots.release()
+                policy.record(beams, len(row_targets), seconds)
+
+                with timed("M2MTranslator", "decode"):
+                    decoded = tokenizer.batch_decode(
+                        generated_tokens, skip_special_tokens=True
+                    )
+                for (index, language), translated_text in zip(row_targets, decoded):
+                    results[index][language] = translated_text
+
+        return results
+
+    def translate_segments(
+        self,
+        texts: list[str],
+        source_language: str,
+        target_language: str,
+        model_size: str,
+        device: str,
+        num_beams: int = 5,
+        batch_size: int = 8,
+        use_cache: bool = True,
+        precision: str = "auto",
+        load_mode: str = "standard",
+        policy: DecodingPolicy | None = None,
+        execution_mode: str = "in_process",
+    ) -> list[str]:
+        """Translate texts of a single source language, serving repeated texts from the cache"""
+        policy = policy or DecodingPolicy("beam", num_beams)
+        cache = self._translation_cache if use_cache else None
+        actual_precision = self.resolve_precision(
+            self.resolve_device(device), precision
+        )
+        keys: dict[str, str] = {}
+        results: dict[str, str] = {}
+
+        # Look up each distinct text once
+        unique_texts: list[str] = list(dict.fromkeys(texts))
+        if cache is not None:
+            keys = {
+                text: TranslationCache.make_key(
+                    model_size,
+                    actual_precision,
+                    source_language,
+                    target_language,
+                    policy.cache_variant(),
+                    text,
+                )
+                for text in unique_texts
+            }
+            cached = cache.get_many(list(keys.values()))
+            results = {text: cached[key] for text, key in keys.items() if key in cached}
+
+        pending: list[str] = [text for text in unique_texts if text not in results]
+        if pending:
+            if execution_mode == "worker":
+                translated = worker_client.translate(
+                    pending,
+                    source_language,
+                    target_language,
+                    model_size,
+                    device,
+                    precision,
+                    load_mode,
+                    batch_size,
+                    policy,
+                )
+            else:
+                with self.use_model(model_size, device, precision, load_mode) as entry:
+                    translated = self.generate_translations(
+                        entry,
+                        pending,
+                        source_language,
+                        target_language,
+                        num_beams,
+                        batch_size,
+                        policy,
+                    )
+            results.update(zip(pending, translated))
+            if cache is not None:
+                cache.put_many({keys[text]: results[text] for text in pending})
+
+        policy.strategies["cached"] += len(unique_texts) - len(pending)
+        count("segments_translated_total", len(pending), model=model_size)
+        if cache is not None:
+            count("translation_cache_hits_total", len(unique_texts) - len(pending))
+            count("translation_cache_misses_total", len(pending))
+            stats = cache.stats()
+            logger.debug(
+                f"Translation cache: {len(unique_texts) - len(pending)}/{len(unique_texts)} hit "
+                f"(total hits: {stats['memory_hits'] + stats['disk_hits']}, misses: {stats['misses']})"
+            )
+
+        return [results[text] for text in texts]
+
+    def translate_segments_fan_out(
+        self,
+        texts: list[str],
+        source_language: str,
+        target_languages: list[str],
+        model_size: str,
+        device: str,
+        num_beams: int = 5,
+        batch_size: int = 8,
+        use_cache: bool = True,
+        precision: str = "auto",
+        load_mode: str = "standard",
+        policy: DecodingPolicy | None = None,
+        execution_mode: str = "in_process",
+    ) -> dict[str, list[str]]:
+        """Translate texts of a single source language into several target languages at once"""
+        if len(target_languages) == 1 or execution_mode == "worker":
+            # The worker serves one language pair per request
+            return {
+                target_language: self.translate_segments(
+                    texts,
+                    source_language,
+                    target_language,
+                    model_size,
+                    device,
+                    num_beams,
+                    batch_size,
+                    use_cache,
+                    precision,
+                    load_mode,
+                    policy,
+                    execution_mode,
+                )
+                for target_language in target_languages
+            }
+
+        policy = policy or DecodingPolicy("beam", num_beams)
+        cache = self._translation_cache if use_cache else None
+        actual_precision = self.resolve_precision(
+            self.resolve_device(device), precision
+        )
+        keys: dict[tuple[str, str], str] = {}
+        results: dict[str, dict[str, str]] = {language: {} for language in target_languages}
+
+        # Look up each distinct (target, text) pair once
+        unique_texts: list[str] = list(dict.fromkeys(texts))
+        if cache is not None:
+            keys = {
+                (language, text): TranslationCache.make_key(
+                    model_size,
+                    actual_precision,
+                    source_language,
+                    language,
+                    policy.cache_variant(),
+                    text,
+                )
+                for language in target_languages
+                for text in unique_texts
+            }
+            cached = cache.get_many(list(keys.values()))
+            for (language, text), key in keys.items():
+                if key in cached:
+                    results[language][text] = cached[key]
+
+        # Only the missing targets of each text are decoded
+        missing: list[list[str]] = [
+            [language for language in target_languages if text not in results[language]]
+            for text in unique_texts
+        ]
+        pending: list[int] = [index for index, languages in enumerate(missing) if languages]
+        if pending:
+            with self.use_model(model_size, device, precision, load_mode) as entry:
+                translated = self.generate_fan_out(
+                    entry,
+                    [unique_texts[i] for i in pending],
+                    source_language,
+                    [missing[i] for i in pending],
+                    batch_size,
+                    policy,
+                )
+            new_entries: dict[str, str] = {}
+            for index, translations in zip(pending, translated):
+                text = unique_texts[index]
+                for language, translated_text in translations.items():
+                    results[language][text] = translated_text
+                    if cache is not None:
+                        new_entries[keys[(language, text)]] = translated_text
+            if new_entries:
+                cache.put_many(new_entries)
+
+        pair_count = len(unique_texts) * len(target_languages)
+        pending_count = sum(len(languages) for languages in missing)
+        policy.strategies["cached"] += pair_count - pending_count
+        count("segments_translated_total", pending_count, model=model_size)
+        if cache is not None:
+            count("translation_cache_hits_total", pair_count - pending_count)
+            count("translation_cache_misses_total", pending_count)
+        logger.debug(
+            f"Fan-out: {len(unique_texts)} text(s) into {len(target_languages)} language(s), "
+            f"{pending_count}/{pair_count} pair(s) decoded"
+        )
+
+        return {
+            language: [results[language][text] for text in texts]
+            for language in target_languages
+        }
+
+    def load_tokenizer(self, model_size) -> Any:
+        """Tokenizer of a model size, loaded without the model weights"""
+        tokenizer = M2MTranslator._tokenizers.get(model_size)
+        if tokenizer is not None:
+            return tokenizer
+
+        with self.load_lock(("tokenizer", model_size)):
+            tokenizer = M2MTranslator._tokenizers.get(model_size)
+            if tokenizer is None:
+                from .m2m_fast_tokenizer import load_m2m_tokenizer
+
+                tokenizer = load_m2m_tokenizer(self.ensure_model_downloaded(model_size))
+                M2MTranslator._tokenizers[model_size] = tokenizer
+            return tokenizer
+
+    def translate_long_segments(
+        self,
+        texts: list[str],
+        source_language: str,
+        target_languages: list[str],
+        model_size: str,
+        device: str,
+        num_beams: int = 5,
+        batch_size: int = 8,
+        use_cache: bool = True,
+        precision: str = "auto",
+        load_mode: str = "standard",
+        max_chunk_tokens: int = 200,
+        policy: DecodingPolicy | None = None,
+        execution_mode: str = "in_process",
+    ) -> dict[str, list[str]]:
+        """
+        Translate texts of a single source language sentence by sentence
+        Sentences are packed into chunks of at most max_chunk_tokens tokens, the chunks of all
+        texts are translated as one batch, and each text is rejoined with its original whitespace.
+        The texts are split once for all target languages.
+        """
+        tokenizer = self.load_tokenizer(model_size)
+
+        def count_tokens(text: str) -> int:
+            return len(tokenizer.tokenize(text))
+
+        # The language token and </s> are added to every chunk
+        with timed("M2MTranslator", "split"):
+            plans = [
+                plan_chunks(text, source_language, count_tokens, max_chunk_tokens - 2)
+                for text in texts
+            ]
+        chunk_texts = [chunk for _, chunks in plans for chunk, _ in chunks]
+        logger.debug(f"Split {len(texts)} text(s) into {len(chunk_texts)} chunk(s)")
+
+        results: dict[str, list[str]] = {}
+        for target_language, translated_chunks in self.translate_segments_fan_out(
+            chunk_texts,
+            source_language,
+            target_languages,
+            model_size,
+            device,
+            num_beams,
+            batch_size,
+            use_cache,
+            precision,
+            load_mode,
+            policy,
+            execution_mode,
+        ).items():
+            translated = iter(translated_chunks)
+            results[target_language] = [
+                reassemble(
+                    leading, chunks, [next(translated) for _ in chunks], target_language
+                )
+                for leading, chunks in plans
+            ]
+        return results
+
+    def translate_batch(
+        self,
+        text: str | list[str],
+        source_language: str,
+        target_languages: list[str],
+        model_size: str,
+        device: str,
+        num_beams: int = 5,
+        batch_size: int = 8,
+        use_cache: bool = True,
+        precision: str = "auto",
+        load_mode: str = "standard",
+        split_sentences: bool = False,
+        max_chunk_tokens: int = 200,
+        policy: DecodingPolicy | None = None,
+        execution_mode: str = "in_process",
+    ) -> tuple[dict[str, str], str, float]:
+        """
+        Translate line by line (or a list of strings), returning lines in the original order
+        Returns one joined text per target language.
+        """
+        segments: list[str] = (
+            list(text) if isinstance(text, (list, tuple)) else text.split("\n")
+        )
+        results: dict[str, list[str]] = {
+            target_language: list(segments) for target_language in target_languages
+        }
+        detected_languages: list[str] = []
+        confidences: list[float] = []
+        groups: dict[str, list[int]] = {}
+
+        # Detect every non-empty line in one batch, so mixed-language input is routed per line
+        indices = [
+            index
+            for index, segment in enumerate(segments)
+            if segment and segment.strip() != ""
+        ]
+        start = time.perf_counter()
+        if source_language == "auto_detect":
+            detections = self.detect_languages([segments[i] for i in indices])
+        else:
+            detections = [(source_language, 1.0)] * len(indices)
+        detection_seconds = time.perf_counter() - start
+
+        # Group non-empty segments by source language
+        for index, (segment_language, segment_confidence) in zip(indices, detections):
+            detected_languages.append(segment_language)
+            confidences.append(float(segment_confidence))
+            groups.setdefault(segment_language, []).append(index)
+
+        if not detected_languages:
+            return (
+                {
+                    target_language: "\n".join(lines)
+                    for target_language, lines in results.items()
+                },
+                source_language if source_language != "auto_detect" else "unknown",
+                1.0,
+            )
+
+        start = time.perf_counter()
+        translated_groups = 0
+        for segment_language, indices in groups.items():
+            # Lines already in a target language are kept as is for that target
+            group_targets = [
+                target_language
+                for target_language in target_languages
+                if target_language != segment_language
+            ]
+            if not group_targets:
+                continue
+            translated_groups += 1
+
+            group_texts = [segments[i] for i in indices]
+            if split_sentences:
+                translated = self.translate_long_segments(
+                    group_texts,
+                    segment_language,
+                    group_targets,
+                    model_size,
+                    device,
+                    num_beams,
+                    batch_size,
+                    use_cache,
+                    precision,
+                    load_mode,
+                    max_chunk_tokens,
+                    policy,
+                    execution_mode,
+                )
+            else:
+                translated = self.translate_segments_fan_out(
+                    group_texts,
+                    segment_language,
+                    group_targets,
+                    model_size,
+                    device,
+                    num_beams,
+                    batch_size,
+                    use_cache,
+                    precision,
+                    load_mode,
+                    policy,
+                    execution_mode,
+                )
+            for target_language, translated_texts in translated.items():
+                for index, translated_text in zip(indices, translated_texts):
+                    results[target_language][index] = translated_text
+
+        translation_seconds = time.perf_counter() - start
+
+        # Report the dominant language and the mean confidence of all lines
+        detected_language = Counter(detected_languages).most_common(1)[0][0]
+        confidence = sum(confidences) / len(confidences)
+        logger.info(
+            f"Batch translated {len(segments)} lines in {translated_groups} language group(s) "
+            f"into {len(target_languages)} language(s) "
+            f"(dominant: {detected_language}, detection {detection_seconds * 1000:.1f} ms, "
+            f"translation {translation_seconds * 1000:.1f} ms)"
+        )
+
+        return (
+            {
+                target_language: "\n".join(lines)
+                for target_language, lines in results.items()
+            },
+            detected_language,
+            float(confidence),
+        )
 
     def translate(
         self,
@@ -224,48 +1303,247 @@ class M2MTranslator:
         model_size,
         device,
         num_beams=5,
+        batch_mode=False,
+        batch_size=8,
+        use_cache=True,
+        precision="auto",
+        load_mode="standard",
+        split_sentences=False,
+        max_chunk_tokens=200,
+        decoding_policy="beam",
+        beam_length_threshold=16,
+        max_new_tokens_ratio=0.0,
+        execution_mode="in_process",
+        target_languages="",
+        inference_backend="eager",
     ):
         """Translation"""
+        policy = DecodingPolicy(
+            decoding_policy,
+            num_beams,
+            beam_length_threshold,
+            max_new_tokens_ratio,
+            inference_backend,
+        )
+        targets = parse_target_languages(target_language, target_languages)
+        start = time.perf_counter()
+        translations, detected_language, confidence = self.translate_text(
+            text,
+            source_language,
+            targets,
+            model_size,
+            device,
+            num_beams,
+            batch_mode,
+            batch_size,
+            use_cache,
+            precision,
+            load_mode,
+            split_sentences,
+            max_chunk_tokens,
+            policy,
+            execution_mode,
+        )
+
+        decode_info = policy.describe()
+        decode_info["wall_seconds"] = round(time.perf_counter() - start, 4)
+        logger.debug(f"Decoding: {decode_info}")
+        return (
+            translations[target_language],
+            detected_language,
+            confidence,
+            json.dumps(decode_info),
+            json.dumps(translations, ensure_ascii=False),
+        )
+
+    def translate_text(
+        self,
+        text,
+        source_language,
+        target_languages: list[str],
+        model_size,
+        device,
+        num_beams=5,
+        batch_mode=False,
+        batch_size=8,
+        use_cache=True,
+        precision="auto",
+        load_mode="standard",
+        split_sentences=False,
+        max_chunk_tokens=200,
+        policy: DecodingPolicy | None = None,
+        execution_mode: str = "in_process",
+    ) -> tuple[dict[str, str], str, float]:
+        """
+        Translate a text (or lines in batch mode) into each target language with the given
+        decoding policy
+        """
+        if batch_mode or isinstance(text, (list, tuple)):
+            return self.translate_batch(
+                text,
+                source_language,
+                target_languages,
+                model_size,
+                device,
+                num_beams,
+                batch_size,
+                use_cache,
+                precision,
+                load_mode,
+                split_sentences,
+                max_chunk_tokens,
+                policy,
+                execution_mode,
+            )
+
         # Return as is if text is empty
         if not text or text.strip() == "":
             return (
-                text,
+                {target_language: text for target_language in target_languages},
                 source_language if source_language != "auto_detect" else "unknown",
                 1.0,
             )
 
         # Automatic language detection
         if source_language == "auto_detect":
+            start = time.perf_counter()
             source_language, confidence = self.detect_language(text)
-            print(
-                f"Detected language: {source_language} (confidence: {confidence:.2f})"
+            logger.info(
+                f"Detected language: {source_language} (confidence: {confidence:.2f}, "
+                f"{(time.perf_counter() - start) * 1000:.1f} ms)"
             )
         else:
             confidence = 1.0
 
-        # Return as is if same language
-        if source_language == target_language:
-            return (text, source_language, confidence)
+        # Return as is for targets in the same language
+        translations: dict[str, str] = {
+            target_language: text
+            for target_language in target_languages
+            if target_language == source_language
+        }
+        pending_targets = [
+            target_language
+            for target_language in target_languages
+            if target_language != source_language
+        ]
 
         # Execute translation
-        self.load_model(model_size, device)
-        self._tokenizer.src_lang = source_language
-        inputs = self._tokenizer(
-            text,
-            return_tensors="pt",
-            padding=True,
-            truncation=True,
-        ).to(self.current_device)
-        with torch.no_grad():
-            generated_tokens = self._model.generate(
-                **inputs,
-                forced_bos_token_id=self._tokenizer.get_lang_id(target_language),
-                num_beams=num_beams,
-                early_stopping=True,
-                use_cache=True,
+        if split_sentences and pending_targets:
+            translated = self.translate_long_segments(
+                [text],
+                source_language,
+                pending_targets,
+                model_size,
+                device,
+                num_beams,
+                batch_size,
+                use_cache,
+                precision,
+                load_mode,
+                max_chunk_tokens,
+                policy,
+                execution_mode,
+            )
+        elif pending_targets:
+            translated = self.translate_segments_fan_out(
+                [text],
+                source_language,
+                pending_targets,
+                model_size,
+                device,
+                num_beams,
+                batch_size,
+                use_cache,
+                precision,
+                load_mode,
+                policy,
+                execution_mode,
             )
-        translated_texts = self._tokenizer.batch_decode(
-            generated_tokens, skip_special_tokens=True
-        )[0]
+        else:
+            translated = {}
+        for target_language, translated_texts in translated.items():
+            translations[target_language] = translated_texts[0]
+
+        return (
+            {
+                target_language: translations[target_language]
+                for target_language in target_languages
+            },
+            source_language,
+            float(confidence),
+        )
+
+
+def parse_target_languages(target_language: str, value: str) -> list[str]:
+    """target_language followed by the comma-separated extra targets, without duplicates"""
+    targets = [target_language]
+    for item in value.replace(" ", ",").split(","):
+        item = item.strip()
+        if item == "":
+            continue
+        if item not in LANGUAGES:
+            raise ValueError(f"Unsupported target language: {item}")
+        if item not in targets:
+            targets.append(item)
+    return targets
+
+
+def snapshot_fingerprint(local_model_path: str) -> str:
+    """Short hash of the size and modification time of the snapshot's config and weights"""
+    names = [SNAPSHOT_CONFIG_NAME]
+    names += [
+        name
+        for name in SNAPSHOT_WEIGHTS_NAMES
+        if os.path.exists(os.path.join(local_model_path, name))
+    ][:1]
+    digest = hashlib.sha256()
+    for name in names:
+        stat = os.stat(os.path.join(local_model_path, name))
+        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def parse_warmup_specs(value: str) -> list[tuple[str, str, str, str]]:
+    """Parse "model_size[:device[:precision[:load_mode]]]" entries separated by commas"""
+    specs: list[tuple[str, str, str, str]] = []
+    for item in value.split(","):
+        if item.strip() == "":
+            continue
+
+        parts = [part.strip() for part in item.split(":")]
+        parts += ["auto", "auto", "standard"][len(parts) - 1 :]
+        model_size, device, precision, load_mode = parts[:4]
+        if (
+            model_size not in MODEL_CONFIGS
+            or device not in ["auto", "cpu", "cuda"]
+            or precision not in PRECISIONS
+            or load_mode not in LOAD_MODES
+        ):
+            logger.warning(f"Ignoring invalid {WARMUP_ENV_VAR} entry '{item}'")
+            continue
+        specs.append((model_size, device, precision, load_mode))
+    return specs
+
+
+def _run_warmup(specs: list[tuple[str, str, str, str]]) -> None:
+    translator = M2MTranslator()
+    for model_size, device, precision, load_mode in specs:
+        try:
+            translator.warmup(model_size, device, precision, load_mode)
+        except Exception as e:
+            # A failed warm-up must not take the server down, translate() retries the load
+            logger.warning(f"Warm-up failed for M2M-100 {model_size} ({e})")
+
+
+def start_background_warmup() -> threading.Thread | None:
+    """Start loading the models listed in KEIT_M2M_WARMUP on a daemon thread (opt-in)"""
+    specs = parse_warmup_specs(os.environ.get(WARMUP_ENV_VAR, ""))
+    if not specs:
+        return None
 
-        return (translated_texts, source_language, float(confidence))
+    thread = threading.Thread(
+        target=_run_warmup, args=(specs,), name="keit-m2m-warmup", daemon=True
+    )
+    thread.start()
+    logger.info(f"Warming up {len(specs)} M2M-100 model(s) in the background")
+    return thread
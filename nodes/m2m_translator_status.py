@@ -0,0 +1,54 @@
+import json
+from .m2m_translator import M2MTranslator, PRECISIONS
+from .telemetry import metrics
+
+
+class M2MTranslatorStatus:
+    """
+    Report the load state of the M2M-100 models
+    Lets workflows check whether a background warm-up has finished before translating
+    """
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "model_size": (["418M", "1.2B"], {"default": "418M"}),
+                "device": (["auto", "cpu", "cuda"], {"default": "auto"}),
+                "precision": (PRECISIONS, {"default": "auto"}),
+            },
+        }
+
+    RETURN_TYPES = ("BOOLEAN", "STRING", "STRING", "FLOAT")
+    RETURN_NAMES = ("ready", "state", "status_json", "resident_mb")
+
+    FUNCTION = "get_status"
+    CATEGORY = "keitNodes"
+
+    @classmethod
+    def IS_CHANGED(cls, **kwargs):
+        # The state changes outside the graph, so always re-evaluate
+        return float("nan")
+
+    def get_status(self, model_size, device, precision="auto"):
+        """Return the state of the requested model and of every known model"""
+        translator = M2MTranslator()
+        actual_device = translator.resolve_device(device)
+        actual_precision = translator.resolve_precision(actual_device, precision)
+
+        states = M2MTranslator.get_load_states()
+        state = states.get(
+            ":".join((model_size, actual_device, actual_precision)), "not_loaded"
+        )
+        memory = M2MTranslator.resident_memory()
+        status = {
+            "models": states,
+            "pool": M2MTranslator._model_pool.describe(),
+            "memory": memory,
+            "metrics": metrics.snapshot(),
+        }
+
+        return (state == "ready", state, json.dumps(status, indent=2), memory["pool_mb"])
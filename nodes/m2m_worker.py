@@ -0,0 +1,350 @@
+import atexit
+import os
+import queue
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any
+from .decoding_policy import DecodingPolicy
+from .telemetry import count, logger, timed
+
+# in_process: generate() runs in the ComfyUI process (previous behaviour)
+# worker: the model lives in a separate local process that batches concurrent requests
+EXECUTION_MODES = ["in_process", "worker"]
+
+# Requests arriving within this many milliseconds of each other share one generate() batch
+BATCH_WINDOW_ENV_VAR = "KEIT_M2M_WORKER_BATCH_WINDOW_MS"
+DEFAULT_BATCH_WINDOW_MS = 20
+
+# Upper bound of the texts collected into one coalesced batch
+MAX_COALESCED_TEXTS = 256
+
+# A request without an answer after this many seconds (including a first model download and
+# load) means the worker hangs: it is killed and started again on the next request (0 = never)
+REQUEST_TIMEOUT_ENV_VAR = "KEIT_M2M_WORKER_TIMEOUT_SECONDS"
+DEFAULT_REQUEST_TIMEOUT_SECONDS = 1800
+
+# How often a waiting request checks that the worker process is still alive
+POLL_INTERVAL_SECONDS = 1.0
+
+# The connection key is handed over in the environment, so it never shows up in the process list
+AUTHKEY_ENV_VAR = "KEIT_M2M_WORKER_AUTHKEY"
+
+# Entry script of the worker process
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "m2m_worker_main.py")
+
+
+class WorkerClient:
+    """
+    Starts the translation worker process on first use and submits requests to it
+    Each request opens its own connection, so several threads can wait on the worker at once.
+    A worker that died (e.g. out of memory) or stopped answering is started again on the next
+    request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._process: subprocess.Popen | None = None
+        self._address: tuple[str, int] | None = None
+        self._authkey: bytes = b""
+        self.request_timeout: float = float(
+            os.environ.get(REQUEST_TIMEOUT_ENV_VAR, str(DEFAULT_REQUEST_TIMEOUT_SECONDS))
+        )
+
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def _ensure_started(self) -> tuple[subprocess.Popen, tuple[str, int], bytes]:
+        with self._lock:
+            if self.is_running():
+                return self._process, self._address, self._authkey
+
+            import folder_paths
+
+            if self._process is not None:
+                logger.warning(
+                    f"Translation worker exited with code {self._process.returncode}, restarting"
+                )
+            authkey = secrets.token_bytes(32)
+            process = subprocess.Popen(
+                [
+                    sys.executable,
+                    WORKER_SCRIPT,
+                    "--comfy-root",
+                    os.path.dirname(os.path.abspath(folder_paths.__file__)),
+                    "--models-dir",
+                    folder_paths.models_dir,
+                ],
+                # The worker exits when this pipe closes, i.e. when ComfyUI goes away
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                env=dict(os.environ, **{AUTHKEY_ENV_VAR: authkey.hex()}),
+                text=True,
+            )
+            with timed("M2MTranslator", "worker_start"):
+                # The worker prints "READY <host> <port>" once it accepts connections
+                line = process.stdout.readline().split()
+            if len(line) != 3 or line[0] != "READY":
+                process.kill()
+                process.wait()
+                raise RuntimeError("Translation worker failed to start")
+
+            self._process = process
+            self._address = (line[1], int(line[2]))
+            self._authkey = authkey
+            logger.info(
+                f"Started translation worker (pid {process.pid}) on {line[1]}:{line[2]}"
+            )
+            return self._process, self._address, self._authkey
+
+    def _receive(self, connection: Connection, process: subprocess.Popen) -> Any:
+        """
+        Wait for the response, polling so a dead or hung worker cannot block the node forever
+        A worker that exited raises EOFError; one that exceeds request_timeout is killed.
+        """
+        started = time.monotonic()
+        while not connection.poll(POLL_INTERVAL_SECONDS):
+            if process.poll() is not None:
+                raise EOFError(f"worker exited with code {process.returncode}")
+            if 0 < self.request_timeout < time.monotonic() - started:
+                count("worker_requests_total", result="timeout")
+                self._kill(process)
+                raise RuntimeError(
+                    f"Translation worker did not answer within {self.request_timeout:.0f}s "
+                    f"({REQUEST_TIMEOUT_ENV_VAR}), it was stopped and is restarted on the "
+                    "next request"
+                )
+        return connection.recv()
+
+    def _kill(self, process: subprocess.Popen) -> None:
+        """Kill a hung worker, unless another request already replaced it"""
+        with self._lock:
+            if process is not self._process:
+                return
+            logger.warning(f"Killing unresponsive translation worker (pid {process.pid})")
+            process.kill()
+            process.wait()
+
+    def translate(
+        self,
+        texts: list[str],
+        source_language: str,
+        target_language: str,
+        model_size: str,
+        device: str,
+        precision: str,
+        load_mode: str,
+        batch_size: int,
+        policy: DecodingPolicy,
+    ) -> list[str]:
+        """Translate texts of a single source language in the worker process"""
+        process, address, authkey = self._ensure_started()
+        request = {
+            "texts": texts,
+            "source_language": source_language,
+            "target_language": target_language,
+            "model_size": model_size,
+            "device": device,
+            "precision": precision,
+            "load_mode": load_mode,
+            "batch_size": batch_size,
+            "policy": (
+                policy.policy,
+                policy.num_beams,
+                policy.beam_length_threshold,
+                policy.max_new_tokens_ratio,
+                policy.backend,
+            ),
+        }
+        try:
+            with timed("M2MTranslator", "worker"):
+                with Client(address, authkey=authkey) as connection:
+                    connection.send(request)
+                    response = self._receive(connection, process)
+        except (EOFError, OSError) as e:
+            count("worker_requests_total", result="lost")
+            raise RuntimeError(
+                f"Translation worker stopped while translating ({e}), "
+                "it is restarted on the next request"
+            ) from e
+
+        if "error" in response:
+            count("worker_requests_total", result="failed")
+            raise RuntimeError(f"Translation worker failed: {response['error']}")
+
+        count("worker_requests_total", result="ok")
+        info = response["decode_info"]
+        # Strategy counts cover the whole coalesced batch, not only this request's texts
+        policy.strategies.update(info["strategies"])
+        policy.generate_seconds += info["generate_seconds"]
+        policy.backend_fallback = policy.backend_fallback or info["backend_fallback"]
+        logger.debug(
+            f"Translation worker served {len(texts)} text(s) in a batch of "
+            f"{info['coalesced_requests']} request(s)"
+        )
+        return response["results"]
+
+    def stop(self) -> None:
+        with self._lock:
+            if self.is_running():
+                self._process.terminate()
+                try:
+                    self._process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    self._process.kill()
+            self._process = None
+
+
+# Shared by every M2MTranslator in the ComfyUI process
+worker_client = WorkerClient()
+atexit.register(worker_client.stop)
+
+
+# (request, response holder, completion event)
+PendingRequest = tuple[dict[str, Any], dict[str, Any], threading.Event]
+
+
+class WorkerServer:
+    """
+    Worker side: queues incoming requests and coalesces compatible ones into one batch
+    Requests are compatible when they share the model, the language pair, the decoding
+    policy and the batch size.
+    """
+
+    def __init__(self, translator: Any, window_seconds: float):
+        self.translator: Any = translator
+        self.window_seconds: float = window_seconds
+        self.requests: queue.Queue[PendingRequest] = queue.Queue()
+
+    def handle_connection(self, connection: Connection) -> None:
+        try:
+            with connection:
+                request = connection.recv()
+                response: dict[str, Any] = {}
+                done = threading.Event()
+                self.requests.put((request, response, done))
+                done.wait()
+                connection.send(response)
+        except (EOFError, OSError):
+            # The node gave up on this request, nothing to answer
+            pass
+
+    def collect(self) -> list[PendingRequest]:
+        """Block for one request, then gather the ones arriving within the window"""
+        batch = [self.requests.get()]
+        text_count = len(batch[0][0]["texts"])
+        deadline = time.monotonic() + self.window_seconds
+        while text_count < MAX_COALESCED_TEXTS:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            text_count += len(item[0]["texts"])
+        return batch
+
+    def run(self) -> None:
+        while True:
+            groups: dict[tuple, list[PendingRequest]] = {}
+            for item in self.collect():
+                request = item[0]
+                key = (
+                    request["model_size"],
+                    request["device"],
+                    request["precision"],
+                    request["load_mode"],
+                    request["source_language"],
+                    request["target_language"],
+                    request["batch_size"],
+                    tuple(request["policy"]),
+                )
+                groups.setdefault(key, []).append(item)
+            for items in groups.values():
+                self.translate_group(items)
+
+    def translate_group(self, items: list[PendingRequest]) -> None:
+        request = items[0][0]
+        try:
+            policy = DecodingPolicy(*request["policy"])
+            unique_texts = list(
+                dict.fromkeys(text for item in items for text in item[0]["texts"])
+            )
+            with self.translator.use_model(
+                request["model_size"],
+                request["device"],
+                request["precision"],
+                request["load_mode"],
+            ) as entry:
+                translated = dict(
+                    zip(
+                        unique_texts,
+                        self.translator.generate_translations(
+                            entry,
+                            unique_texts,
+                            request["source_language"],
+                            request["target_language"],
+                            policy.num_beams,
+                            request["batch_size"],
+                            policy,
+                        ),
+                    )
+                )
+            decode_info = policy.describe()
+            decode_info["coalesced_requests"] = len(items)
+            for item_request, response, _ in items:
+                response["results"] = [translated[text] for text in item_request["texts"]]
+                response["decode_info"] = decode_info
+            logger.info(
+                f"Translated {len(unique_texts)} text(s) from {len(items)} request(s) "
+                f"({request['source_language']} -> {request['target_language']})"
+            )
+        except Exception as e:
+            # A failed load or generation is reported to its callers, the worker keeps serving
+            logger.exception("Translation batch failed")
+            for _, response, _ in items:
+                response["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            for _, _, done in items:
+                done.set()
+
+
+def _exit_with_parent() -> None:
+    """Exit once stdin reaches EOF, which happens when the ComfyUI process is gone"""
+    sys.stdin.read()
+    os._exit(0)
+
+
+def serve() -> None:
+    """Worker process main loop"""
+    from .m2m_translator import M2MTranslator
+
+    authkey = bytes.fromhex(os.environ.pop(AUTHKEY_ENV_VAR))
+    window_ms = int(os.environ.get(BATCH_WINDOW_ENV_VAR, str(DEFAULT_BATCH_WINDOW_MS)))
+    server = WorkerServer(M2MTranslator(), window_ms / 1000)
+    listener = Listener(("127.0.0.1", 0), authkey=authkey)
+
+    threading.Thread(target=_exit_with_parent, name="keit-m2m-parent", daemon=True).start()
+    threading.Thread(target=server.run, name="keit-m2m-batcher", daemon=True).start()
+
+    host, port = listener.address
+    print(f"READY {host} {port}", flush=True)
+    # Anything printed later (e.g. by transformers) goes to stderr, nobody reads the pipe anymore
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    logger.info(f"Translation worker ready (batch window {window_ms} ms)")
+
+    while True:
+        try:
+            connection = listener.accept()
+        except (AuthenticationError, OSError) as e:
+            logger.warning(f"Rejected translation worker connection ({e})")
+            continue
+        threading.Thread(
+            target=server.handle_connection, args=(connection,), daemon=True
+        ).start()
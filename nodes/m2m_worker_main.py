@@ -0,0 +1,40 @@
+"""
+Entry point of the M2M-100 translation worker process (started by m2m_worker.WorkerClient)
+Runs as a plain script, so it imports this package under a fixed name before serving.
+"""
+
+import argparse
+import importlib
+import logging
+import os
+import sys
+import types
+
+PACKAGE_NAME = "keit_nodes_worker"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="M2M-100 translation worker")
+    parser.add_argument("--comfy-root", required=True, help="ComfyUI directory")
+    parser.add_argument("--models-dir", required=True, help="ComfyUI models directory")
+    args = parser.parse_args()
+
+    # sys.path[0] is this directory, whose modules must not shadow top-level ones
+    sys.path[0] = args.comfy_root
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # Register the package without running its __init__, which registers nodes and warms up models
+    package = types.ModuleType(PACKAGE_NAME)
+    package.__path__ = [package_root]
+    sys.modules[PACKAGE_NAME] = package
+
+    logging.basicConfig(format="[keitNodes worker] %(levelname)s: %(message)s")
+
+    import folder_paths
+
+    folder_paths.models_dir = args.models_dir
+    worker = importlib.import_module(f"{PACKAGE_NAME}.nodes.m2m_worker")
+    worker.serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any
+import torch
+from .telemetry import count, logger
+
+# Pool bounds, configurable through environment variables (0 = no memory budget)
+DEFAULT_MAX_MODELS = int(os.environ.get("KEIT_M2M_POOL_MAX_MODELS", "2"))
+DEFAULT_MAX_MEMORY_MB = int(os.environ.get("KEIT_M2M_POOL_MAX_MEMORY_MB", "0"))
+
+# Models unused for this many seconds are unloaded in the background (0 = never)
+DEFAULT_IDLE_UNLOAD_SECONDS = float(os.environ.get("KEIT_M2M_IDLE_UNLOAD_SECONDS", "0"))
+
+# (model_size, device, dtype)
+ModelKey = tuple[str, str, str]
+
+
+def estimate_model_bytes(model: torch.nn.Module) -> int:
+    """
+    Memory held by the parameters, buffers and packed weights of a model
+    Dynamically quantized Linear layers keep their int8 weights in packed params, which are
+    neither parameters nor buffers and only show up in the state dict.
+    """
+    tensors: list[Any] = list(model.parameters()) + list(model.buffers())
+    for value in model.state_dict(keep_vars=True).values():
+        tensors += value if isinstance(value, (tuple, list)) else [value]
+
+    # keep_vars returns the parameter objects themselves, so tied weights are counted once
+    seen: set[int] = set()
+    total = 0
+    for tensor in tensors:
+        if not isinstance(tensor, torch.Tensor) or id(tensor) in seen:
+            continue
+        seen.add(id(tensor))
+        total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class PooledModel:
+    """
+    A loaded model together with its tokenizer and placement
+    """
+
+    def __init__(self, key: ModelKey, model: Any, tokenizer: Any, device: str):
+        self.key: ModelKey = key
+        self.model: Any = model
+        self.tokenizer: Any = tokenizer
+        self.device: str = device
+        self.memory_bytes: int = estimate_model_bytes(model)
+        self.loaded_at: float = time.time()
+        self.last_used: float = self.loaded_at
+        # torch.compile variant sharing the weights, built on first use of the compiled backend
+        self.compiled_model: Any = None
+        self.compile_failed: bool = False
+        # Running translations holding the entry (guarded by the pool lock); a pinned entry is
+        # never released, an eviction meanwhile is carried out when the last one unpins it
+        self.users: int = 0
+        self.pending_release: str | None = None
+
+
+class ModelPool:
+    """
+    LRU pool of loaded models keyed by (model_size, device, dtype)
+    Keeps at most max_models entries and, if set, stays within max_memory_bytes.
+    The least recently used model is evicted first; the newest entry and entries pinned by
+    a running translation are never evicted to make room (the pool may exceed its bounds
+    until they are unpinned).
+    """
+
+    def __init__(
+        self,
+        max_models: int = DEFAULT_MAX_MODELS,
+        max_memory_bytes: int = DEFAULT_MAX_MEMORY_MB * 1024 * 1024,
+        idle_unload_seconds: float = DEFAULT_IDLE_UNLOAD_SECONDS,
+    ):
+        self.max_models: int = max(1, max_models)
+        self.max_memory_bytes: int = max_memory_bytes
+        self.idle_unload_seconds: float = idle_unload_seconds
+        self.eviction_log: deque[dict[str, Any]] = deque(maxlen=100)
+        self._entries: OrderedDict[ModelKey, PooledModel] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        self._idle_thread: threading.Thread | None = None
+
+    def get(self, key: ModelKey, pin: bool = False) -> PooledModel | None:
+        """Return a loaded model and mark it as most recently used (pinned if pin is set)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            entry.last_used = time.time()
+            if pin:
+                entry.users += 1
+            return entry
+
+    def put(self, entry: PooledModel, pin: bool = False) -> list[ModelKey]:
+        """Add a loaded model, evicting least recently used ones beyond the bounds"""
+        with self._lock:
+            if pin:
+                entry.users += 1
+            self._entries[entry.key] = entry
+            self._entries.move_to_end(entry.key)
+            evicted: list[PooledModel] = []
+            # Oldest first, never the newest entry or a pinned one
+            for key, oldest in list(self._entries.items())[:-1]:
+                if not self._over_budget():
+                    break
+                if oldest.users > 0:
+                    continue
+                del self._entries[key]
+                evicted.append(oldest)
+
+        for oldest in evicted:
+            self._release(oldest, "pool limit")
+        return [oldest.key for oldest in evicted]
+
+    def unpin(self, entry: PooledModel) -> None:
+        """End one use of a pinned entry, releasing it if it was evicted in the meantime"""
+        with self._lock:
+            entry.users -= 1
+            entry.last_used = time.time()
+            reason = entry.pending_release if entry.users == 0 else None
+            if reason is not None:
+                entry.pending_release = None
+        if reason is not None:
+            self._release(entry, reason)
+
+    def evict(self, key: ModelKey, reason: str = "explicit") -> bool:
+        """Remove a single model from the pool (released once no translation uses it)"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            release_now = entry is not None and self._release_now(entry, reason)
+        if entry is None:
+            return False
+        if release_now:
+            self._release(entry, reason)
+        return True
+
+    def clear(self, reason: str = "explicit") -> list[ModelKey]:
+        """Remove every model from the pool (in-use ones are released when they finish)"""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            releasable = [entry for entry in entries if self._release_now(entry, reason)]
+        for entry in releasable:
+            self._release(entry, reason)
+        return [entry.key for entry in entries]
+
+    def evict_idle(self, max_idle_seconds: float) -> list[ModelKey]:
+        """Remove every model not used for more than max_idle_seconds (pinned ones are in use)"""
+        now = time.time()
+        with self._lock:
+            idle = [
+                entry
+                for entry in self._entries.values()
+                if entry.users == 0 and now - entry.last_used > max_idle_seconds
+            ]
+            for entry in idle:
+                del self._entries[entry.key]
+        for entry in idle:
+            self._release(entry, "idle")
+        return [entry.key for entry in idle]
+
+    def start_idle_unloader(self) -> threading.Thread | None:
+        """Start the background thread unloading idle models (once, if a timeout is set)"""
+        if self.idle_unload_seconds <= 0:
+            return None
+        with self._lock:
+            if self._idle_thread is not None:
+                return self._idle_thread
+            self._idle_thread = threading.Thread(
+                target=self._unload_idle_forever, name="keit-m2m-idle-unloader", daemon=True
+            )
+        self._idle_thread.start()
+        logger.info(
+            f"Unloading M2M-100 models after {self.idle_unload_seconds:.0f}s without use"
+        )
+        return self._idle_thread
+
+    def _unload_idle_forever(self) -> None:
+        # Checking a few times per timeout keeps the overshoot small without busy waiting
+        interval = min(max(self.idle_unload_seconds / 4, 1.0), 60.0)
+        while True:
+            time.sleep(interval)
+            self.evict_idle(self.idle_unload_seconds)
+
+    def keys(self) -> list[ModelKey]:
+        """Keys of the pooled models without touching their recency"""
+        with self._lock:
+            return list(self._entries.keys())
+
+    def total_bytes(self) -> int:
+        """Memory held by all pooled models"""
+        with self._lock:
+            return sum(entry.memory_bytes for entry in self._entries.values())
+
+    def describe(self) -> list[dict[str, Any]]:
+        """Snapshot of the pooled models, least recently used first"""
+        with self._lock:
+            return [
+                {
+                    "model_size": entry.key[0],
+                    "device": entry.key[1],
+                    "dtype": entry.key[2],
+                    "memory_mb": entry.memory_bytes / (1024 * 1024),
+                    "loaded_at": entry.loaded_at,
+                    "last_used": entry.last_used,
+                    "in_use": entry.users,
+                }
+                for entry in self._entries.values()
+            ]
+
+    def _over_budget(self) -> bool:
+        if len(self._entries) > self.max_models:
+            return True
+        if self.max_memory_bytes <= 0:
+            return False
+        total = sum(entry.memory_bytes for entry in self._entries.values())
+        return total > self.max_memory_bytes
+
+    def _release_now(self, entry: PooledModel, reason: str) -> bool:
+        """
+        Whether an entry just removed from the pool can be released right away
+        Called under the lock; a pinned entry is released by its last unpin instead.
+        """
+        if entry.users == 0:
+            return True
+        entry.pending_release = reason
+        logger.info(
+            f"M2M-100 {entry.key[0]} ({entry.key[1]}, {entry.key[2]}) is in use, "
+            f"releasing it when the running translation finishes"
+        )
+        return False
+
+    def _release(self, entry: PooledModel, reason: str) -> None:
+        """Drop the pool's references and free the memory right away"""
+        evicted_at = time.time()
+        self.eviction_log.append(
+            {
+                "model_size": entry.key[0],
+                "device": entry.key[1],
+                "dtype": entry.key[2],
+                "memory_mb": entry.memory_bytes / (1024 * 1024),
+                "reason": reason,
+                "evicted_at": evicted_at,
+            }
+        )
+        count("model_evictions_total", reason=reason)
+        logger.info(
+            f"Evicted M2M-100 {entry.key[0]} ({entry.key[1]}, {entry.key[2]}, "
+            f"{entry.memory_bytes / (1024 * 1024):.0f} MB, {reason}) at "
+            f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(evicted_at))}"
+        )
+
+        device = entry.device
+        # The compiled variant is dropped with the entry and collected like the eager model
+        entry.model = None
+        entry.tokenizer = None
+        entry.compiled_model = None
+        gc.collect()
+        if device == "cuda" and torch.cuda.is_available():
+            torch.cuda.empty_cache()
@@ -1,6 +1,7 @@
 from typing import Tuple
-import math
-from comfy.utils import common_upscale
+from .resolution import ALIGNMENTS, find_pixel_limit_resolution
+from .resample import estimate_resize_peak_bytes, resize_image_batch
+from .telemetry import count, logger, timed
 
 # Maximum pixel count limit
 DEFAULT_MAX_PIXELS = 589824  # Approximately equivalent to 1024x576 pixels
@@ -40,6 +41,23 @@ class PixelLimitResizer:
                         "tooltip": "Maximum pixel count limit (width × height). The image will be resized to stay within this limit while maintaining aspect ratio and 16-pixel alignment. Default: 589824 pixels (ex: 1024×576)",
                     },
                 ),
+                "chunk_size": (
+                    "INT",
+                    {
+                        "default": 0,
+                        "min": 0,
+                        "max": 4096,
+                        "step": 1,
+                        "tooltip": "Number of frames resized at once into a preallocated output to bound peak memory on long videos. 0: whole batch at once",
+                    },
+                ),
+                "alignment": (
+                    ALIGNMENTS,
+                    {
+                        "default": 16,
+                        "tooltip": "Width and height are multiples of this value (8/16/32/64)",
+                    },
+                ),
             },
         }
 
@@ -54,67 +72,30 @@ class PixelLimitResizer:
         return width / height
 
     def find_optimal_resolution(
-        self, original_width: int, original_height: int, max_pixels: int
+        self,
+        original_width: int,
+        original_height: int,
+        max_pixels: int,
+        alignment: int = 16,
     ) -> Tuple[int, int, int]:
         """
-        Find optimal resolution maintaining aspect ratio within pixel limit with 16-pixel multiples
+        Find optimal resolution maintaining aspect ratio within pixel limit with alignment multiples
         Optimized for 3D VAE spatiotemporal compression (spatial 8×8×temporal 4× = 256× compression)
 
         Returns:
             tuple: (optimal_width, optimal_height, actual_pixels)
         """
-        original_aspect = self.calculate_aspect_ratio(original_width, original_height)
-
-        # Calculate theoretical maximum height
-        # aspect_ratio * height * height <= max_pixels
-        # height <= sqrt(max_pixels / aspect_ratio)
-        max_height_theoretical = math.sqrt(max_pixels / original_aspect)
-
-        # Find maximum height that is a multiple of 16
-        max_height_16multiple = int(max_height_theoretical // 16) * 16
-
-        best_width = 0
-        best_height = 0
-        best_pixels = 0
-
-        # Search for optimal solution by decreasing height in multiples of 16
-        for height in range(
-            max_height_16multiple, 15, -16
-        ):  # Start from 16 and decrease in multiples of 16
-            # Calculate width from aspect ratio
-            width_exact = original_aspect * height
-
-            # Adjust to multiples of 16 (try both floor and ceil)
-            width_down = int(width_exact // 16) * 16
-            width_up = width_down + 16
-
-            # Check pixel count for both cases
-            for width in [width_down, width_up]:
-                if width > 0 and (width * height) <= max_pixels:
-                    pixels = width * height
-                    if pixels > best_pixels:
-                        best_pixels = pixels
-                        best_width = width
-                        best_height = height
-
-        # Safety fallback if no optimal solution found
-        if best_width == 0 or best_height == 0:
-            # Fallback to minimum size (16x16)
-            if original_aspect >= 1:  # Landscape or square
-                best_width = 16
-                best_height = 16
-            else:  # Portrait
-                best_width = 16
-                best_height = 16
-            best_pixels = best_width * best_height
-
-        return best_width, best_height, best_pixels
+        return find_pixel_limit_resolution(
+            original_width, original_height, max_pixels, alignment
+        )
 
     def resize_with_pixel_limit(
         self,
         image,
         upscale_method="lanczos",
         max_pixels=DEFAULT_MAX_PIXELS,
+        chunk_size=0,
+        alignment=16,
     ):
         """
         Resize within pixel limit while maintaining aspect ratio
@@ -128,24 +109,36 @@ class PixelLimitResizer:
         original_pixels = original_width * original_height
 
         # Find optimal resolution
-        target_width, target_height, target_pixels = self.find_optimal_resolution(
-            original_width, original_height, max_pixels
-        )
+        with timed("PixelLimitResizer", "solve"):
+            target_width, target_height, target_pixels = self.find_optimal_resolution(
+                original_width, original_height, max_pixels, alignment
+            )
 
-        # Check if resize is needed
+        # Check if resize is needed (the input is never modified, so no clone is needed)
         if original_width == target_width and original_height == target_height:
-            out_image = image.clone()
+            out_image = image
         else:
-            # Resize using common_upscale
-            # Adjust tensor dimensions: [B, H, W, C] -> [B, C, H, W]
-            out_image = image.clone()
-            out_image = common_upscale(
-                out_image.movedim(-1, 1),
-                target_width,
-                target_height,
-                upscale_method,
-                crop="disabled",
-            ).movedim(1, -1)
+            # Resize using upscale (vectorized Lanczos, otherwise common_upscale)
+            with timed("PixelLimitResizer", "resample"):
+                out_image = resize_image_batch(
+                    image, target_width, target_height, upscale_method, chunk_size
+                )
+            peak_bytes = estimate_resize_peak_bytes(
+                image.shape, target_width, target_height, image.element_size(), chunk_size
+            )
+            # The previous implementation also cloned the whole input before resizing
+            previous_peak_bytes = (
+                estimate_resize_peak_bytes(
+                    image.shape, target_width, target_height, image.element_size()
+                )
+                + image.numel() * image.element_size()
+            )
+            logger.debug(
+                f"Estimated peak memory: {peak_bytes / 2**20:,.0f} MB "
+                f"(whole batch with clone: {previous_peak_bytes / 2**20:,.0f} MB, "
+                f"-{(1 - peak_bytes / previous_peak_bytes) * 100:.0f}%)"
+            )
+        count("frames_total", B, node="PixelLimitResizer")
 
         # Calculate aspect ratios
         original_aspect = self.calculate_aspect_ratio(original_width, original_height)
@@ -156,14 +149,13 @@ class PixelLimitResizer:
             f"Original: {original_width}x{original_height} "
             f"({original_pixels:,} pixels, aspect: {original_aspect:.4f}) → "
             f"Target: {target_width}x{target_height} "
-            f"({target_pixels:,} pixels, aspect: {target_aspect:.4f}) [16×]"
+            f"({target_pixels:,} pixels, aspect: {target_aspect:.4f}) [{alignment}×]"
         )
 
-        print(f"Pixel limit resize (16×): {resize_info}")
-        print(f"Aspect ratio change: {abs(original_aspect - target_aspect):.6f}")
-        print(
-            f"Pixel efficiency: {target_pixels/max_pixels*100:.1f}% of limit ({max_pixels:,})"
+        logger.info(f"Pixel limit resize ({alignment}×): {resize_info}")
+        logger.debug(
+            f"Aspect ratio change: {abs(original_aspect - target_aspect):.6f}, "
+            f"pixel efficiency: {target_pixels/max_pixels*100:.1f}% of limit ({max_pixels:,})"
         )
-        print(f"3D VAE compatibility: ✓ (256× compression ready)")
 
         return (out_image, target_width, target_height, target_aspect, resize_info)
@@ -0,0 +1,87 @@
+from .pixel_limit_resizer import DEFAULT_MAX_PIXELS, PixelLimitResizer
+from .resample import resize_image_list
+from .telemetry import count, logger, timed
+
+
+class PixelLimitResizerList(PixelLimitResizer):
+    """
+    List-aware PixelLimitResizer for image lists with mixed sizes
+    The whole list arrives in one call: each distinct input size is solved once, inputs that
+    share a target resolution are resized as one batch, and outputs keep the list order.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+    INPUT_IS_LIST = True
+
+    RETURN_TYPES = ("IMAGE", "INT", "INT", "FLOAT", "STRING")
+    RETURN_NAMES = ("image", "width", "height", "aspect_ratio", "resize_info")
+    OUTPUT_IS_LIST = (True, True, True, True, True)
+
+    FUNCTION = "resize_list_with_pixel_limit"
+    CATEGORY = "keitNodes"
+
+    def resize_list_with_pixel_limit(
+        self,
+        image,
+        upscale_method=("lanczos",),
+        max_pixels=(DEFAULT_MAX_PIXELS,),
+        chunk_size=(0,),
+        alignment=(16,),
+    ):
+        """
+        Resize every image in the list within the pixel limit
+        Widget values arrive as lists too; the first value applies to the whole list
+        """
+        upscale_method = upscale_method[0]
+        max_pixels = max_pixels[0]
+        chunk_size = chunk_size[0]
+        alignment = alignment[0]
+
+        # Solve each distinct input size once
+        solutions: dict[tuple[int, int], tuple[int, int, int]] = {}
+        with timed("PixelLimitResizerList", "solve"):
+            for frames in image:
+                _, H, W, _ = frames.shape
+                if (W, H) not in solutions:
+                    solutions[(W, H)] = self.find_optimal_resolution(
+                        W, H, max_pixels, alignment
+                    )
+
+        targets = [
+            solutions[(frames.shape[2], frames.shape[1])][:2] for frames in image
+        ]
+        with timed("PixelLimitResizerList", "resample"):
+            out_images, group_count = resize_image_list(
+                image, targets, upscale_method, chunk_size
+            )
+        count(
+            "frames_total",
+            sum(frames.shape[0] for frames in image),
+            node="PixelLimitResizerList",
+        )
+
+        widths, heights, aspects, infos = [], [], [], []
+        for frames, (target_width, target_height) in zip(image, targets):
+            original_width, original_height = frames.shape[2], frames.shape[1]
+            target_pixels = target_width * target_height
+            original_aspect = self.calculate_aspect_ratio(original_width, original_height)
+            target_aspect = self.calculate_aspect_ratio(target_width, target_height)
+
+            widths.append(target_width)
+            heights.append(target_height)
+            aspects.append(target_aspect)
+            infos.append(
+                f"Original: {original_width}x{original_height} "
+                f"({original_width * original_height:,} pixels, aspect: {original_aspect:.4f}) → "
+                f"Target: {target_width}x{target_height} "
+                f"({target_pixels:,} pixels, aspect: {target_aspect:.4f}) [{alignment}×]"
+            )
+
+        logger.info(
+            f"Pixel limit list resize ({alignment}×): {len(image)} images, "
+            f"{len(solutions)} input sizes, {group_count} resize groups"
+        )
+
+        return (out_images, widths, heights, aspects, infos)
@@ -0,0 +1,332 @@
+from functools import lru_cache
+import math
+import torch
+from comfy.utils import common_upscale
+
+# Lanczos window size (a = 3), same as PIL's Image.Resampling.LANCZOS
+LANCZOS_SUPPORT = 3.0
+
+
+def _lanczos_kernel(x: torch.Tensor) -> torch.Tensor:
+    """Windowed sinc, sinc(x) * sinc(x / 3) on [-3, 3)"""
+    inside = (x >= -LANCZOS_SUPPORT) & (x < LANCZOS_SUPPORT)
+    return torch.where(
+        inside, torch.sinc(x) * torch.sinc(x / LANCZOS_SUPPORT), torch.zeros_like(x)
+    )
+
+
+# Output pixels per block of a banded pass; each block reads one contiguous input window
+LANCZOS_BLOCK_SIZE = 32
+
+
+@lru_cache(maxsize=32)
+def lanczos_weights(in_size: int, out_size: int) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    Banded Lanczos coefficients for one axis: ([out_size, taps] input indices, weights)
+    Follows PIL's coefficient precomputation: the kernel is stretched by the scale factor
+    when downsampling (antialiasing), clipped at the borders and normalized per output pixel.
+    taps = 2 * ceil(support) + 1 like PIL's kernel size; taps past the window get weight 0.
+    """
+    scale = in_size / out_size
+    filter_scale = max(scale, 1.0)
+    support = LANCZOS_SUPPORT * filter_scale
+    taps = min(2 * math.ceil(support) + 1, in_size)
+
+    centers = (torch.arange(out_size, dtype=torch.float64) + 0.5) * scale
+
+    # PIL truncates toward zero when rounding the window bounds
+    x_min = torch.clamp(torch.trunc(centers - support + 0.5), min=0)
+    x_max = torch.clamp(torch.trunc(centers + support + 0.5), max=in_size)
+    positions = x_min[:, None] + torch.arange(taps, dtype=torch.float64)[None, :]
+    window = positions < x_max[:, None]
+
+    weights = _lanczos_kernel((positions - centers[:, None] + 0.5) / filter_scale)
+    weights = torch.where(window, weights, torch.zeros_like(weights))
+    totals = weights.sum(dim=1, keepdim=True)
+    weights = torch.where(totals != 0, weights / totals, weights)
+    indices = positions.clamp(max=in_size - 1).to(torch.long)
+    return indices, weights.to(torch.float32)
+
+
+@lru_cache(maxsize=32)
+def lanczos_blocks(in_size: int, out_size: int) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    The banded weights regrouped per LANCZOS_BLOCK_SIZE output pixels
+    Returns (first input pixel of each block's window, [blocks, block size, span] weights
+    over that window). span covers the taps of a whole block, about block size * scale + taps,
+    so a block costs a small matrix product instead of one over the whole input row.
+    """
+    indices, weights = lanczos_weights(in_size, out_size)
+    block_count = -(-out_size // LANCZOS_BLOCK_SIZE)
+    starts = indices[::LANCZOS_BLOCK_SIZE, 0]
+    last = indices[:, -1].new_zeros(block_count * LANCZOS_BLOCK_SIZE)
+    last[:out_size] = indices[:, -1]
+    span = int((last.view(block_count, -1).max(dim=1).values - starts).max()) + 1
+
+    # Shift the last windows back inside the input, so every window has the same span
+    starts = starts.clamp(max=in_size - span)
+    offsets = indices - starts.repeat_interleave(LANCZOS_BLOCK_SIZE)[:out_size, None]
+    block_weights = torch.zeros(block_count * LANCZOS_BLOCK_SIZE, span)
+    block_weights[:out_size].scatter_add_(1, offsets, weights)
+    return starts, block_weights.view(block_count, LANCZOS_BLOCK_SIZE, span)
+
+
+@lru_cache(maxsize=32)
+def _interleaved_blocks(in_size: int, out_size: int, channels: int) -> torch.Tensor:
+    """Block weights expanded over interleaved channels: [blocks, span * C, block size * C]"""
+    _, block_weights = lanczos_blocks(in_size, out_size)
+    identity = torch.eye(channels)
+    return torch.stack(
+        [torch.kron(weights.T.contiguous(), identity) for weights in block_weights]
+    )
+
+
+def _resample_rows(samples: torch.Tensor, out_size: int) -> torch.Tensor:
+    """
+    Lanczos pass along H of [B, H, R]: gather every block's input rows, one batched product
+    """
+    batch_size, in_size, row_size = samples.shape
+    starts, block_weights = lanczos_blocks(in_size, out_size)
+    block_count, block_size, span = block_weights.shape
+
+    rows = (starts[:, None] + torch.arange(span)[None, :]).view(-1).to(samples.device)
+    windows = samples.index_select(1, rows).view(batch_size, block_count, span, row_size)
+    out = torch.matmul(block_weights.to(samples.device), windows)
+    return out.view(batch_size, block_count * block_size, row_size)[:, :out_size]
+
+
+def _resample_columns(samples: torch.Tensor, out_size: int) -> torch.Tensor:
+    """
+    Lanczos pass along W of [N, W, C]: each block's window is a contiguous slice of the
+    interleaved [N, W * C] rows, so it is multiplied in place without gathering
+    """
+    count, in_size, channels = samples.shape
+    starts, _ = lanczos_blocks(in_size, out_size)
+    kernels = _interleaved_blocks(in_size, out_size, channels).to(samples.device)
+    span = kernels.shape[1] // channels
+    block_size = kernels.shape[2] // channels
+
+    flat = samples.reshape(count, in_size * channels)
+    out = samples.new_empty((count, out_size, channels))
+    for block, start in enumerate(starts.tolist()):
+        first = block * block_size
+        size = min(block_size, out_size - first)
+        window = flat[:, start * channels : (start + span) * channels]
+        out[:, first : first + size] = torch.matmul(
+            window, kernels[block, :, : size * channels]
+        ).view(count, size, channels)
+    return out
+
+
+def lanczos_resize(
+    samples: torch.Tensor, width: int, height: int, out: torch.Tensor | None = None
+) -> torch.Tensor:
+    """
+    Batched Lanczos resize of [B, C, H, W] samples with two separable banded passes
+    Each output pixel only reads its 2 * ceil(support) + 1 taps, like PIL, and the passes
+    work on the channels-last memory of IMAGE tensors without transposing the frames.
+    Matches comfy's per-frame PIL path up to PIL's 8-bit rounding of the input and between
+    the passes (within 2.3/255 on bench_lanczos); each pass is clamped to [0, 1] like PIL's.
+    With out (a [B, C, height, width] tensor or view), the result is written there directly.
+    """
+    batch_size, channels, in_height, in_width = samples.shape
+    result = samples.movedim(1, -1).to(torch.float32).contiguous()
+
+    # Horizontal pass first, then vertical, in the same order as PIL. PIL also clips the
+    # intermediate image, which removes the ringing the vertical pass would otherwise spread
+    if in_width != width:
+        result = _resample_columns(
+            result.view(batch_size * in_height, in_width, channels), width
+        )
+        result = result.clamp_(0.0, 1.0)
+    if in_height != height:
+        result = _resample_rows(result.view(batch_size, in_height, -1), height)
+
+    result = result.reshape(batch_size, height, width, channels).movedim(-1, 1)
+    if out is None:
+        return result.clamp(0.0, 1.0).to(samples.dtype)
+    # The final clamp writes into out in the same pass (clamp's out= needs the same dtype)
+    if out.dtype == torch.float32:
+        return torch.clamp(result, 0.0, 1.0, out=out)
+    return out.copy_(result.clamp(0.0, 1.0))
+
+
+def upscale(
+    samples: torch.Tensor,
+    width: int,
+    height: int,
+    upscale_method: str,
+    crop: str = "disabled",
+    out: torch.Tensor | None = None,
+) -> torch.Tensor:
+    """
+    common_upscale with a vectorized path for uncropped Lanczos resizing
+    With out, the result is stored there; Lanczos writes it directly, the other methods
+    are copied from common_upscale's result.
+    """
+    if upscale_method == "lanczos" and crop == "disabled":
+        return lanczos_resize(samples, width, height, out)
+    resized = common_upscale(samples, width, height, upscale_method, crop)
+    if out is None:
+        return resized
+    return out.copy_(resized)
+
+
+# stretch: scale to the target ignoring the aspect ratio
+# cover: center-crop the source to the target aspect ratio, then scale (fills the frame)
+# contain: scale inside the target and center it on padding (keeps the whole frame)
+FIT_MODES = ["stretch", "cover", "contain"]
+
+
+def compute_fit_boxes(
+    in_width: int, in_height: int, width: int, height: int, fit_mode: str = "stretch"
+) -> tuple[tuple[int, int, int, int], tuple[int, int, int, int]]:
+    """
+    Source crop window and destination region for a fit mode, both as (x, y, width, height)
+    Only the source window is resampled, and only into the destination region, so cropping
+    and padding cost no extra pass over the frames.
+    """
+    source = (0, 0, in_width, in_height)
+    destination = (0, 0, width, height)
+
+    if fit_mode == "cover":
+        scale = max(width / in_width, height / in_height)
+        crop_width = min(in_width, max(1, round(width / scale)))
+        crop_height = min(in_height, max(1, round(height / scale)))
+        source = (
+            (in_width - crop_width) // 2,
+            (in_height - crop_height) // 2,
+            crop_width,
+            crop_height,
+        )
+    elif fit_mode == "contain":
+        scale = min(width / in_width, height / in_height)
+        content_width = min(width, max(1, round(in_width * scale)))
+        content_height = min(height, max(1, round(in_height * scale)))
+        destination = (
+            (width - content_width) // 2,
+            (height - content_height) // 2,
+            content_width,
+            content_height,
+        )
+    elif fit_mode != "stretch":
+        raise ValueError(f"Unknown fit mode: {fit_mode}")
+
+    return source, destination
+
+
+def resize_image_batch(
+    image: torch.Tensor,
+    width: int,
+    height: int,
+    upscale_method: str,
+    chunk_size: int = 0,
+    fit_mode: str = "stretch",
+    pad_value: float = 0.0,
+) -> torch.Tensor:
+    """
+    Resize an IMAGE batch [B, H, W, C] to width x height
+    With chunk_size > 0 the frames are resized chunk by chunk into a preallocated output,
+    so only one chunk's intermediates are alive at a time (0 = whole batch in one call).
+    fit_mode "cover" resamples a center-crop view of the input and "contain" resamples into
+    the middle of a padded output (filled with pad_value), in the same single pass.
+    """
+    batch_size, in_height, in_width, channels = image.shape
+    (src_x, src_y, src_width, src_height), (dst_x, dst_y, dst_width, dst_height) = (
+        compute_fit_boxes(in_width, in_height, width, height, fit_mode)
+    )
+    # The crop is a view, so the source is never copied
+    source = image[:, src_y : src_y + src_height, src_x : src_x + src_width]
+
+    # Without padding or chunking the resampled frames are the output as they are
+    whole_batch = chunk_size <= 0 or chunk_size >= batch_size
+    if whole_batch and fit_mode != "contain":
+        return upscale(source.movedim(-1, 1), width, height, upscale_method).movedim(1, -1)
+
+    out_image = torch.empty(
+        (batch_size, height, width, channels), dtype=image.dtype, device=image.device
+    )
+    # Only the padding strips are filled; the content region is written by the resample
+    out_image[:, :dst_y].fill_(pad_value)
+    out_image[:, dst_y + dst_height :].fill_(pad_value)
+    out_image[:, dst_y : dst_y + dst_height, :dst_x].fill_(pad_value)
+    out_image[:, dst_y : dst_y + dst_height, dst_x + dst_width :].fill_(pad_value)
+
+    step = batch_size if whole_batch else chunk_size
+    for start in range(0, batch_size, step):
+        destination = out_image[
+            start : start + step, dst_y : dst_y + dst_height, dst_x : dst_x + dst_width
+        ]
+        upscale(
+            source[start : start + step].movedim(-1, 1),
+            dst_width,
+            dst_height,
+            upscale_method,
+            out=destination.movedim(-1, 1),
+        )
+    return out_image
+
+
+def estimate_resize_peak_bytes(
+    image_shape: tuple[int, int, int, int],
+    width: int,
+    height: int,
+    element_size: int,
+    chunk_size: int = 0,
+) -> int:
+    """
+    Rough peak memory of resize_image_batch: input + output + the float32 working
+    tensors (converted input, horizontal pass, gathered vertical windows, vertical pass)
+    of the frames resized at once
+    """
+    batch_size, in_height, in_width, channels = image_shape
+    frames_per_call = batch_size if chunk_size <= 0 else min(chunk_size, batch_size)
+
+    input_bytes = batch_size * in_height * in_width * channels * element_size
+    output_bytes = batch_size * height * width * channels * element_size
+    working_pixels = in_height * in_width + 2 * in_height * width + height * width
+    working_bytes = frames_per_call * channels * working_pixels * 4
+    return input_bytes + output_bytes + working_bytes
+
+
+def resize_image_list(
+    images: list[torch.Tensor],
+    targets: list[tuple[int, int]],
+    upscale_method: str,
+    chunk_size: int = 0,
+    fit_mode: str = "stretch",
+) -> tuple[list[torch.Tensor], int]:
+    """
+    Resize a list of IMAGE batches, each to its own (width, height) target
+    Inputs that share size, dtype, device and target are concatenated and resized in one
+    call, then split back, so the results keep the original order.
+
+    Returns:
+        tuple: (resized_images, group_count)
+    """
+    groups: dict[tuple, list[int]] = {}
+    for index, (frames, (width, height)) in enumerate(zip(images, targets)):
+        key = (tuple(frames.shape[1:]), frames.dtype, frames.device, width, height)
+        groups.setdefault(key, []).append(index)
+
+    results: list[torch.Tensor | None] = [None] * len(images)
+    for (shape, _, _, width, height), indices in groups.items():
+        # Already at the target size
+        if shape[0] == height and shape[1] == width:
+            for index in indices:
+                results[index] = images[index]
+            continue
+
+        batch = (
+            images[indices[0]]
+            if len(indices) == 1
+            else torch.cat([images[index] for index in indices])
+        )
+        resized = resize_image_batch(
+            batch, width, height, upscale_method, chunk_size, fit_mode
+        )
+        sizes = [images[index].shape[0] for index in indices]
+        for index, frames in zip(indices, torch.split(resized, sizes)):
+            results[index] = frames
+
+    return results, len(groups)
@@ -0,0 +1,302 @@
+import json
+import math
+import os
+from bisect import bisect_left
+from typing import Any, Tuple
+from .telemetry import logger
+
+# Resolution presets for WanVideo
+RESOLUTION_PRESETS = {
+    "480p": [
+        (480, 832),  # 16:9 vertical
+        (832, 480),  # 16:9 horizontal
+        (624, 624),  # 1:1 square
+        (704, 544),  # 1.29:1 landscape
+        (544, 704),  # 1:1.29 portrait
+    ],
+    "720p": [
+        (720, 1280),  # 16:9 vertical
+        (1280, 720),  # 16:9 horizontal
+        (960, 960),  # 1:1 square
+        (1088, 832),  # 1.31:1 landscape
+        (832, 1088),  # 1:1.31 portrait
+    ],
+}
+
+# Width/height multiples offered by the pixel limit resizers
+ALIGNMENTS = [8, 16, 32, 64]
+
+# JSON/YAML file with additional preset tables, e.g. {"multi_aspect": [[512, 512], [640, 384]]}
+PRESET_FILE_ENV_VAR = "KEIT_RESOLUTION_PRESETS"
+
+
+def find_pixel_limit_resolution(
+    original_width: int, original_height: int, max_pixels: int, alignment: int = 16
+) -> Tuple[int, int, int]:
+    """
+    Largest alignment-multiple resolution within max_pixels that follows the aspect ratio
+    Scans heights downward from the theoretical maximum, trying the floor and ceil widths
+    at each step. Because the best width can only shrink with the height, the scan stops as
+    soon as no lower height can beat the current best, which is usually after a few steps.
+
+    Returns:
+        tuple: (optimal_width, optimal_height, actual_pixels)
+    """
+    original_aspect = original_width / original_height
+
+    # aspect_ratio * height * height <= max_pixels
+    max_height_theoretical = math.sqrt(max_pixels / original_aspect)
+    max_height_aligned = int(max_height_theoretical // alignment) * alignment
+
+    best_width = 0
+    best_height = 0
+    best_pixels = 0
+
+    for height in range(max_height_aligned, alignment - 1, -alignment):
+        width_down = int(original_aspect * height // alignment) * alignment
+        width_up = width_down + alignment
+
+        # width_up is non-increasing as the height decreases, so nothing below can win
+        if height * width_up <= best_pixels:
+            break
+
+        for width in [width_down, width_up]:
+            if width > 0 and (width * height) <= max_pixels:
+                pixels = width * height
+                if pixels > best_pixels:
+                    best_pixels = pixels
+                    best_width = width
+                    best_height = height
+
+    # Safety fallback to the minimum size if no solution was found
+    if best_width == 0 or best_height == 0:
+        best_width = alignment
+        best_height = alignment
+        best_pixels = best_width * best_height
+
+    return best_width, best_height, best_pixels
+
+
+def find_pixel_limit_resolutions(
+    sizes: Any, max_pixels: int, alignment: int = 16, max_steps: int = 8
+) -> Any:
+    """
+    Vectorized find_pixel_limit_resolution for many (width, height) pairs
+    Accepts a NumPy array or torch tensor of shape [N, 2] and returns [N, 3] int64
+    (width, height, pixels) of the same kind, identical to the scalar solver.
+    Every row runs at most max_steps search steps together; the rare rows still searching
+    after that (extreme aspect ratios) are finished by the scalar solver, so one such row
+    does not hold up the whole batch.
+    """
+    import torch
+
+    is_numpy = type(sizes).__module__ == "numpy"
+    sizes = torch.as_tensor(sizes).to(torch.float64).reshape(-1, 2)
+
+    # Same float64 operations as the scalar solver: tensor/tensor division only, because a
+    # Python scalar divided by a tensor is computed as a reciprocal times the scalar, which
+    # can round differently (floor division mirrors Python's //)
+    aspect = sizes[:, 0] / sizes[:, 1]
+    height = (
+        torch.div(
+            torch.sqrt(torch.full_like(aspect, max_pixels) / aspect),
+            alignment,
+            rounding_mode="floor",
+        )
+        * alignment
+    )
+
+    best_width = torch.zeros_like(aspect)
+    best_height = torch.zeros_like(aspect)
+    best_pixels = torch.zeros_like(aspect)
+    active = height >= alignment
+
+    for _ in range(max_steps):
+        if not bool(active.any()):
+            break
+        width_down = (
+            torch.div(aspect * height, alignment, rounding_mode="floor") * alignment
+        )
+        width_up = width_down + alignment
+        active &= height * width_up > best_pixels
+
+        for width in [width_down, width_up]:
+            pixels = width * height
+            better = active & (width > 0) & (pixels <= max_pixels) & (pixels > best_pixels)
+            best_width = torch.where(better, width, best_width)
+            best_height = torch.where(better, height, best_height)
+            best_pixels = torch.where(better, pixels, best_pixels)
+
+        height = height - alignment
+        active &= height >= alignment
+
+    missing = (best_width == 0) | (best_height == 0)
+    best_width = torch.where(missing, torch.full_like(best_width, alignment), best_width)
+    best_height = torch.where(missing, torch.full_like(best_height, alignment), best_height)
+    best_pixels = best_width * best_height
+
+    result = torch.stack([best_width, best_height, best_pixels], dim=1).to(torch.int64)
+    leftover = active.nonzero().flatten()
+    if leftover.numel() > 0:
+        result[leftover] = torch.tensor(
+            [
+                find_pixel_limit_resolution(width, height, max_pixels, alignment)
+                for width, height in sizes[leftover].tolist()
+            ],
+            dtype=torch.int64,
+        )
+    return result.numpy() if is_numpy else result
+
+
+class PresetIndex:
+    """
+    Preset table compiled into a sorted aspect-ratio index
+    Candidates sharing an aspect ratio form one bucket. A lookup binary-searches the bucket
+    closest in aspect ratio, then picks the candidate with the closest pixel count; ties keep
+    the first candidate in table order, exactly like a linear scan over the table.
+    """
+
+    def __init__(self, candidates: list[tuple[int, int]]):
+        self.candidates: list[tuple[int, int]] = [(int(w), int(h)) for w, h in candidates]
+        if not self.candidates:
+            raise ValueError("A preset table needs at least one resolution")
+
+        buckets: dict[float, list[int]] = {}
+        for index, (width, height) in enumerate(self.candidates):
+            buckets.setdefault(width / height, []).append(index)
+        self.aspects: list[float] = sorted(buckets)
+        self.buckets: list[list[int]] = [buckets[aspect] for aspect in self.aspects]
+
+    def lookup(self, original_width: int, original_height: int) -> Tuple[int, int]:
+        """
+        Closest preset resolution
+        1. Binary-search the buckets whose aspect ratio is closest to the original
+        2. Among them, choose the candidate whose pixel count is closest to the original
+        """
+        original_aspect = original_width / original_height
+        original_pixels = original_width * original_height
+
+        # 1. The closest aspect is next to the insertion point; widen over exact ties
+        position = bisect_left(self.aspects, original_aspect)
+        neighbours = [i for i in (position - 1, position) if 0 <= i < len(self.aspects)]
+        min_aspect_diff = min(abs(original_aspect - self.aspects[i]) for i in neighbours)
+
+        left = neighbours[0]
+        while left > 0 and abs(original_aspect - self.aspects[left - 1]) == min_aspect_diff:
+            left -= 1
+        right = neighbours[-1]
+        while (
+            right < len(self.aspects) - 1
+            and abs(original_aspect - self.aspects[right + 1]) == min_aspect_diff
+        ):
+            right += 1
+
+        closest_aspect_candidates = sorted(
+            index
+            for bucket in range(left, right + 1)
+            if abs(original_aspect - self.aspects[bucket]) == min_aspect_diff
+            for index in self.buckets[bucket]
+        )
+
+        # 2. Closest pixel count, first in table order on ties
+        best_resolution = None
+        min_pixel_diff = float("inf")
+
+        for index in closest_aspect_candidates:
+            width, height = self.candidates[index]
+            pixel_diff = abs(original_pixels - width * height)
+
+            if pixel_diff < min_pixel_diff:
+                min_pixel_diff = pixel_diff
+                best_resolution = (width, height)
+
+        return best_resolution
+
+    def lookup_batch(self, sizes: Any, chunk_size: int = 65536) -> Any:
+        """
+        Vectorized lookup for many (width, height) pairs
+        Accepts a NumPy array or torch tensor of shape [N, 2] and returns [N, 2] int64
+        (width, height) of the same kind, with the same tie-breaking as lookup().
+        """
+        import torch
+
+        is_numpy = type(sizes).__module__ == "numpy"
+        sizes = torch.as_tensor(sizes).to(torch.int64).reshape(-1, 2)
+
+        candidates = torch.tensor(self.candidates, dtype=torch.int64)
+        candidate_aspects = candidates[:, 0].double() / candidates[:, 1].double()
+        candidate_pixels = candidates[:, 0] * candidates[:, 1]
+        candidate_order = torch.arange(len(self.candidates), dtype=torch.int64)
+
+        results: list[torch.Tensor] = []
+        for start in range(0, sizes.shape[0], chunk_size):
+            chunk = sizes[start : start + chunk_size]
+            aspect = chunk[:, 0].double() / chunk[:, 1].double()
+            pixels = chunk[:, 0] * chunk[:, 1]
+
+            # [N, K] differences to every candidate (the table has at most a few dozen rows)
+            aspect_diff = (aspect[:, None] - candidate_aspects[None, :]).abs()
+            closest = aspect_diff == aspect_diff.min(dim=1, keepdim=True).values
+
+            # Rank by pixel difference, then by table order, among the closest aspects
+            pixel_diff = (pixels[:, None] - candidate_pixels[None, :]).abs()
+            rank = pixel_diff * len(self.candidates) + candidate_order[None, :]
+            rank = torch.where(closest, rank, torch.full_like(rank, torch.iinfo(torch.int64).max))
+            results.append(candidates[rank.argmin(dim=1)])
+
+        result = torch.cat(results) if results else torch.empty((0, 2), dtype=torch.int64)
+        return result.numpy() if is_numpy else result
+
+
+def load_preset_tables(path: str) -> dict[str, list[tuple[int, int]]]:
+    """
+    Read preset tables from a JSON or YAML file
+    Each table is a list of [width, height] pairs or {"width": ..., "height": ...} objects.
+    """
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a mapping of preset name to resolutions")
+
+    tables: dict[str, list[tuple[int, int]]] = {}
+    for name, entries in data.items():
+        table: list[tuple[int, int]] = []
+        for entry in entries:
+            if isinstance(entry, dict):
+                table.append((int(entry["width"]), int(entry["height"])))
+            else:
+                width, height = entry
+                table.append((int(width), int(height)))
+        tables[str(name)] = table
+    return tables
+
+
+def register_preset_tables(tables: dict[str, list[tuple[int, int]]]) -> None:
+    """Compile preset tables and make them available by name (replacing same-named ones)"""
+    for name, table in tables.items():
+        PRESET_INDEXES[name] = PresetIndex(table)
+        RESOLUTION_PRESETS[name] = list(table)
+
+
+PRESET_INDEXES: dict[str, PresetIndex] = {}
+register_preset_tables(RESOLUTION_PRESETS)
+
+# User tables from KEIT_RESOLUTION_PRESETS are compiled once at import time
+if os.environ.get(PRESET_FILE_ENV_VAR):
+    try:
+        register_preset_tables(load_preset_tables(os.environ[PRESET_FILE_ENV_VAR]))
+    except (OSError, ValueError, KeyError, TypeError, ImportError) as e:
+        logger.warning(f"Could not load resolution presets ({e})")
+
+
+def find_best_preset_resolution(
+    original_width: int, original_height: int, preset: str
+) -> Tuple[int, int]:
+    """Pick the preset resolution closest to the input (see PresetIndex.lookup)"""
+    return PRESET_INDEXES[preset].lookup(original_width, original_height)
@@ -0,0 +1,199 @@
+import re
+from typing import Callable
+
+# Languages written without spaces between sentences (and mostly between words)
+NO_SPACE_LANGUAGES = {"ja", "zh", "th", "lo", "km", "my"}
+
+DEFAULT_TERMINATORS = ".!?…"
+
+# Sentence-final punctuation per language, on top of the Latin ones where they are also used
+TERMINATORS = {
+    "ja": "。！？!?…",
+    "zh": "。！？!?…",
+    "hi": "।॥" + DEFAULT_TERMINATORS,
+    "mr": "।॥" + DEFAULT_TERMINATORS,
+    "ne": "।॥" + DEFAULT_TERMINATORS,
+    "bn": "।॥" + DEFAULT_TERMINATORS,
+    "pa": "।॥" + DEFAULT_TERMINATORS,
+    "ar": "؟" + DEFAULT_TERMINATORS,
+    "fa": "؟" + DEFAULT_TERMINATORS,
+    "ur": "؟۔" + DEFAULT_TERMINATORS,
+    "hy": "։" + DEFAULT_TERMINATORS,
+    "my": "။!?",
+    "km": "។!?",
+    "am": "።!?",
+}
+
+# Characters that stay with the sentence they close
+CLOSING_CHARACTERS = "\"'”’)]}」』）】》"
+
+# Words whose trailing period does not end a sentence (compared lowercase, without the period)
+ABBREVIATIONS = {
+    "mr",
+    "mrs",
+    "ms",
+    "dr",
+    "prof",
+    "st",
+    "vs",
+    "etc",
+    "e.g",
+    "i.e",
+    "fig",
+    "no",
+    "jr",
+    "sr",
+    "inc",
+    "ltd",
+    "co",
+}
+
+# (chunk_text, separator) where separator is the original whitespace that followed the chunk
+Chunk = tuple[str, str]
+
+
+def split_sentences(text: str, language: str) -> list[tuple[str, str]]:
+    """
+    Split text into (sentence, separator) pairs that concatenate back to the original text
+    Text before the first sentence (leading whitespace) comes back as a pair with an empty
+    sentence. Thai and Lao have no sentence punctuation and are split at whitespace.
+    """
+    if language in ("th", "lo"):
+        boundary = re.compile(r"\s+")
+    else:
+        terminators = re.escape(TERMINATORS.get(language, DEFAULT_TERMINATORS))
+        closing = re.escape(CLOSING_CHARACTERS)
+        if language in NO_SPACE_LANGUAGES:
+            boundary = re.compile(f"[{terminators}]+[{closing}]*\\s*|\\n\\s*")
+        else:
+            boundary = re.compile(f"[{terminators}]+[{closing}]*(?=\\s|$)\\s*|\\n\\s*")
+
+    pairs: list[tuple[str, str]] = []
+    leading = len(text) - len(text.lstrip())
+    if leading:
+        pairs.append(("", text[:leading]))
+
+    start = leading
+    for match in boundary.finditer(text, leading):
+        end = match.end()
+        separator_start = end - (len(match.group()) - len(match.group().rstrip()))
+        sentence = text[start:separator_start]
+        if sentence == "":
+            # A bare separator (e.g. a blank line) extends the previous pair
+            if pairs:
+                pairs[-1] = (pairs[-1][0], pairs[-1][1] + text[start:end])
+            else:
+                pairs.append(("", text[start:end]))
+            start = end
+            continue
+
+        if match.group()[:1] == "." and _is_abbreviation(sentence):
+            continue
+        pairs.append((sentence, text[separator_start:end]))
+        start = end
+
+    if start < len(text):
+        pairs.append((text[start:], ""))
+    return pairs
+
+
+def _is_abbreviation(sentence: str) -> bool:
+    """Whether the period at the end of the sentence belongs to an abbreviation or an initial"""
+    words = sentence.rstrip(CLOSING_CHARACTERS).split()
+    if not words:
+        return False
+    word = words[-1].rstrip(".").lstrip("(\"'“‘").lower()
+    # Dotted abbreviations such as "U.S." and single-letter initials
+    return word in ABBREVIATIONS or "." in word or (len(word) == 1 and word.isalpha())
+
+
+def _split_oversized(
+    sentence: str,
+    language: str,
+    count_tokens: Callable[[str], int],
+    max_tokens: int,
+) -> list[Chunk]:
+    """Split a sentence longer than the budget at word (or character) boundaries"""
+    if language in NO_SPACE_LANGUAGES:
+        pieces = [(character, "") for character in sentence]
+    else:
+        pieces = [
+            (match.group(1), match.group(2))
+            for match in re.finditer(r"(\S+)(\s*)", sentence)
+        ]
+
+    chunks: list[Chunk] = []
+    current = ""
+    current_separator = ""
+    for piece, separator in pieces:
+        candidate = current + current_separator + piece if current else piece
+        if current and count_tokens(candidate) > max_tokens:
+            chunks.append((current, current_separator))
+            candidate = piece
+        current = candidate
+        current_separator = separator
+    if current:
+        chunks.append((current, current_separator))
+    return chunks
+
+
+def plan_chunks(
+    text: str,
+    language: str,
+    count_tokens: Callable[[str], int],
+    max_tokens: int,
+) -> tuple[str, list[Chunk]]:
+    """
+    Pack consecutive sentences into chunks of at most max_tokens tokens
+    Chunks never cross a line break, so lines and paragraphs survive reassembly.
+
+    Returns:
+        tuple: (leading_whitespace, chunks)
+    """
+    leading = ""
+    chunks: list[Chunk] = []
+    current = ""
+    current_separator = ""
+    current_tokens = 0
+
+    for sentence, separator in split_sentences(text, language):
+        if sentence == "":
+            leading += separator
+            continue
+
+        tokens = count_tokens(sentence)
+        if current and (current_tokens + tokens > max_tokens):
+            chunks.append((current, current_separator))
+            current, current_tokens = "", 0
+
+        if tokens > max_tokens:
+            pieces = _split_oversized(sentence, language, count_tokens, max_tokens)
+            chunks.extend(pieces[:-1])
+            sentence, tokens = pieces[-1][0], count_tokens(pieces[-1][0])
+
+        current = current + current_separator + sentence if current else sentence
+        current_tokens += tokens
+        current_separator = separator
+        if "\n" in separator:
+            chunks.append((current, current_separator))
+            current, current_tokens = "", 0
+
+    if current:
+        chunks.append((current, current_separator))
+    return leading, chunks
+
+
+def reassemble(
+    leading: str, chunks: list[Chunk], translations: list[str], target_language: str
+) -> str:
+    """Join translated chunks with the original whitespace and line breaks"""
+    parts: list[str] = [leading]
+    for index, ((_, separator), translated) in enumerate(zip(chunks, translations)):
+        if "\n" not in separator and index < len(chunks) - 1:
+            # Sentences of space-less scripts need a space in other languages and vice versa
+            if target_language in NO_SPACE_LANGUAGES:
+                separator = ""
+            elif separator == "":
+                separator = " "
+        parts.append(translated + separator)
+    return "".join(parts)
@@ -0,0 +1,234 @@
+import atexit
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+# Log level of the "keitNodes" logger (DEBUG shows the per-node details, WARNING hides summaries)
+LOG_LEVEL_ENV_VAR = "KEIT_NODES_LOG_LEVEL"
+
+# File the metrics are exported to (Prometheus text format for *.prom, JSON otherwise)
+METRICS_FILE_ENV_VAR = "KEIT_NODES_METRICS_FILE"
+
+# Minimum seconds between two exports to METRICS_FILE_ENV_VAR
+METRICS_FLUSH_INTERVAL = 10.0
+
+# Upper bounds of the duration histogram buckets in seconds
+DURATION_BUCKETS: list[float] = [
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+]
+
+METRIC_PREFIX = "keit_nodes_"
+
+logger = logging.getLogger("keitNodes")
+_log_level = os.environ.get(LOG_LEVEL_ENV_VAR, "INFO").upper()
+# Unknown names fall back to INFO instead of failing the import
+logger.setLevel(_log_level if isinstance(logging.getLevelName(_log_level), int) else "INFO")
+
+# (metric name, sorted label pairs)
+MetricKey = tuple[str, tuple[tuple[str, str], ...]]
+
+
+def _metric_key(name: str, labels: dict[str, Any]) -> MetricKey:
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus sense
+    """
+
+    def __init__(self, buckets: list[float]):
+        self.buckets: list[float] = buckets
+        self.counts: list[int] = [0] * len(buckets)
+        self.count: int = 0
+        self.sum: float = 0.0
+        self.min: float = float("inf")
+        self.max: float = 0.0
+
+    def observe(self, value: float) -> None:
+        position = bisect.bisect_left(self.buckets, value)
+        if position < len(self.counts):
+            self.counts[position] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def cumulative_counts(self) -> list[int]:
+        counts: list[int] = []
+        total = 0
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return counts
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "buckets": dict(zip(map(str, self.buckets), self.cumulative_counts())),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe counters and histograms shared by all keitNodes
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[MetricKey, float] = {}
+        self._histograms: dict[MetricKey, Histogram] = {}
+        self._last_flush: float = 0.0
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = _metric_key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(DURATION_BUCKETS)
+            histogram.observe(value)
+        self._maybe_flush()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Counters and histograms as plain data, labels folded into "name{key=value}" """
+        with self._lock:
+            return {
+                "counters": {
+                    _format_key(key): value for key, value in self._counters.items()
+                },
+                "histograms": {
+                    _format_key(key): histogram.to_dict()
+                    for key, histogram in self._histograms.items()
+                },
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines: list[str] = []
+        with self._lock:
+            typed: set[str] = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                metric = METRIC_PREFIX + name
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} counter")
+                    typed.add(metric)
+                lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                metric = METRIC_PREFIX + name
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} histogram")
+                    typed.add(metric)
+                for bound, count in zip(histogram.buckets, histogram.cumulative_counts()):
+                    bucket_labels = labels + (("le", str(bound)),)
+                    lines.append(f"{metric}_bucket{_format_labels(bucket_labels)} {count}")
+                inf_labels = labels + (("le", "+Inf"),)
+                lines.append(f"{metric}_bucket{_format_labels(inf_labels)} {histogram.count}")
+                lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.sum}")
+                lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Export to a file atomically (Prometheus text for *.prom, JSON otherwise)"""
+        content = self.to_prometheus() if path.endswith(".prom") else self.to_json()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(temporary_path, path)
+
+    def _maybe_flush(self) -> None:
+        path = os.environ.get(METRICS_FILE_ENV_VAR)
+        if not path:
+            return
+        now = time.monotonic()
+        if now - self._last_flush < METRICS_FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        try:
+            self.write(path)
+        except OSError as e:
+            logger.warning("Could not write metrics to %s (%s)", path, e)
+
+
+def _format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"')) for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _format_key(key: MetricKey) -> str:
+    name, labels = key
+    return name + _format_labels(labels)
+
+
+metrics = MetricsRegistry()
+
+
+@contextmanager
+def timed(node: str, stage: str) -> Iterator[None]:
+    """Record the duration of one node stage in the stage_duration_seconds histogram"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        metrics.observe("stage_duration_seconds", seconds, node=node, stage=stage)
+        logger.debug("%s %s took %.4fs", node, stage, seconds)
+
+
+def count(name: str, value: float = 1, **labels: Any) -> None:
+    """Increment a counter"""
+    metrics.increment(name, value, **labels)
+
+
+def _flush_at_exit() -> None:
+    path = os.environ.get(METRICS_FILE_ENV_VAR)
+    if path:
+        try:
+            metrics.write(path)
+        except OSError:
+            pass
+
+
+atexit.register(_flush_at_exit)
@@ -0,0 +1,204 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from .telemetry import logger
+
+# Default size bounds for each cache tier (number of entries)
+DEFAULT_MAX_MEMORY_ENTRIES = 2048
+DEFAULT_MAX_DISK_ENTRIES = 200000
+
+
+class TranslationCache:
+    """
+    Two-tier translation result cache
+    An in-process LRU bounded by entry count, backed by an SQLite store that survives restarts.
+    The least recently used entries are evicted from each tier once it exceeds its bound.
+    """
+
+    def __init__(
+        self,
+        db_path: str | None,
+        max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES,
+        max_disk_entries: int = DEFAULT_MAX_DISK_ENTRIES,
+    ):
+        self.db_path: str | None = db_path
+        self.max_memory_entries: int = max_memory_entries
+        self.max_disk_entries: int = max_disk_entries
+        self.memory_hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._disk_entries: int = 0
+        self._disk_disabled: bool = db_path is None
+
+    @staticmethod
+    def make_key(
+        model_size: str,
+        precision: str,
+        source_language: str,
+        target_language: str,
+        num_beams: int | str,
+        text: str,
+    ) -> str:
+        """Build a cache key from everything that affects the translation result"""
+        payload = "\x1f".join(
+            [model_size, precision, source_language, target_language, str(num_beams), text]
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection | None:
+        """Open the on-disk store on first use (disabled after any error)"""
+        if self._disk_disabled:
+            return None
+        if self._connection is not None:
+            return self._connection
+
+        try:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_access REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS translations_last_access "
+                "ON translations (last_access)"
+            )
+            connection.commit()
+            self._disk_entries = connection.execute(
+                "SELECT COUNT(*) FROM translations"
+            ).fetchone()[0]
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Translation disk cache disabled ({e})")
+            self._disk_disabled = True
+            return None
+
+        self._connection = connection
+        return connection
+
+    def _remember(self, key: str, value: str) -> None:
+        """Insert into the in-process LRU, evicting the least recently used entries"""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: list[str]) -> dict[str, str]:
+        """Look up several keys, returning only the ones that were found"""
+        found: dict[str, str] = {}
+        disk_keys: list[str] = []
+
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                    self.memory_hits += 1
+                    continue
+                disk_keys.append(key)
+
+            if not disk_keys:
+                return found
+
+            connection = self._connect()
+            if connection is None:
+                self.misses += len(disk_keys)
+                return found
+
+            try:
+                now = time.time()
+                for key in disk_keys:
+                    row = connection.execute(
+                        "SELECT value FROM translations WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is None:
+                        self.misses += 1
+                        continue
+                    connection.execute(
+                        "UPDATE translations SET last_access = ? WHERE key = ?",
+                        (now, key),
+                    )
+                    found[key] = row[0]
+                    self.disk_hits += 1
+                    self._remember(key, row[0])
+                connection.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Translation disk cache read failed ({e})")
+
+        return found
+
+    def put_many(self, items: dict[str, str]) -> None:
+        """Store several results in both tiers within a single transaction"""
+        if not items:
+            return
+
+        with self._lock:
+            for key, value in items.items():
+                self._remember(key, value)
+
+            connection = self._connect()
+            if connection is None:
+                return
+
+            try:
+                now = time.time()
+                for key, value in items.items():
+                    exists = connection.execute(
+                        "SELECT 1 FROM translations WHERE key = ?", (key,)
+                    ).fetchone()
+                    connection.execute(
+                        "INSERT OR REPLACE INTO translations (key, value, last_access) "
+                        "VALUES (?, ?, ?)",
+                        (key, value, now),
+                    )
+                    if exists is None:
+                        self._disk_entries += 1
+                self._evict_disk(connection)
+                connection.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Translation disk cache write failed ({e})")
+
+    def _evict_disk(self, connection: sqlite3.Connection) -> None:
+        """Delete the least recently used rows once the store exceeds its bound"""
+        overflow = self._disk_entries - self.max_disk_entries
+        if overflow <= 0:
+            return
+
+        connection.execute(
+            "DELETE FROM translations WHERE key IN ("
+            "SELECT key FROM translations ORDER BY last_access ASC LIMIT ?)",
+            (overflow,),
+        )
+        self._disk_entries -= overflow
+        self.evictions += overflow
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            connection = self._connect()
+            if connection is None:
+                return
+            connection.execute("DELETE FROM translations")
+            connection.commit()
+            self._disk_entries = 0
+
+    def stats(self) -> dict[str, int]:
+        """Hit/miss counters and current tier sizes"""
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "disk_entries": self._disk_entries,
+            }
@@ -1,23 +1,7 @@
 from typing import Tuple
-from comfy.utils import common_upscale
-
-# WanVideo向けの解像度プリセット定義
-RESOLUTION_PRESETS = {
-    "480p": [
-        (480, 832),  # 16:9 vertical
-        (832, 480),  # 16:9 horizontal
-        (624, 624),  # 1:1 square
-        (704, 544),  # 1.29:1 landscape
-        (544, 704),  # 1:1.29 portrait
-    ],
-    "720p": [
-        (720, 1280),  # 16:9 vertical
-        (1280, 720),  # 16:9 horizontal
-        (960, 960),  # 1:1 square
-        (1088, 832),  # 1.31:1 landscape
-        (832, 1088),  # 1:1.31 portrait
-    ],
-}
+from .resolution import RESOLUTION_PRESETS, find_best_preset_resolution
+from .resample import FIT_MODES, estimate_resize_peak_bytes, resize_image_batch
+from .telemetry import count, logger, timed
 
 
 class WanVideoOptimalResizer:
@@ -37,7 +21,7 @@ class WanVideoOptimalResizer:
             "required": {
                 "image": ("IMAGE",),
                 "resolution_preset": (
-                    ["480p", "720p"],
+                    list(RESOLUTION_PRESETS),
                     {"default": "480p"},
                 ),
                 "upscale_method": (
@@ -45,6 +29,25 @@ class WanVideoOptimalResizer:
                     {"default": "lanczos"},
                 ),
             },
+            "optional": {
+                "chunk_size": (
+                    "INT",
+                    {
+                        "default": 0,
+                        "min": 0,
+                        "max": 4096,
+                        "step": 1,
+                        "tooltip": "Number of frames resized at once into a preallocated output to bound peak memory on long videos. 0: whole batch at once",
+                    },
+                ),
+                "fit_mode": (
+                    FIT_MODES,
+                    {
+                        "default": "stretch",
+                        "tooltip": "stretch: ignore the aspect ratio, cover: center-crop to the preset aspect ratio, contain: fit inside and pad with black. Cropping and padding happen in the same resize pass",
+                    },
+                ),
+            },
         }
 
     RETURN_TYPES = ("IMAGE", "INT", "INT")
@@ -65,40 +68,15 @@ class WanVideoOptimalResizer:
         1. 最もアスペクト比が近い候補を特定
         2. その中で最も解像度（ピクセル数）が近いものを選択
         """
-        original_aspect = self.calculate_aspect_ratio(original_width, original_height)
-        original_pixels = original_width * original_height
-        candidates = RESOLUTION_PRESETS[preset]
-
-        # 1. 最もアスペクト比が近い候補を見つける
-        min_aspect_diff = float("inf")
-        closest_aspect_candidates = []
-
-        for width, height in candidates:
-            candidate_aspect = self.calculate_aspect_ratio(width, height)
-            aspect_diff = abs(original_aspect - candidate_aspect)
-
-            if aspect_diff < min_aspect_diff:
-                min_aspect_diff = aspect_diff
-                closest_aspect_candidates = [(width, height)]
-            elif aspect_diff == min_aspect_diff:
-                closest_aspect_candidates.append((width, height))
-
-        # 2. アスペクト比が最も近い候補の中で、最も解像度が近いものを選択
-        best_resolution = None
-        min_pixel_diff = float("inf")
-
-        for width, height in closest_aspect_candidates:
-            candidate_pixels = width * height
-            pixel_diff = abs(original_pixels - candidate_pixels)
-
-            if pixel_diff < min_pixel_diff:
-                min_pixel_diff = pixel_diff
-                best_resolution = (width, height)
-
-        return best_resolution
+        return find_best_preset_resolution(original_width, original_height, preset)
 
     def resize_to_optimal(
-        self, image, resolution_preset="480p", upscale_method="lanczos"
+        self,
+        image,
+        resolution_preset="480p",
+        upscale_method="lanczos",
+        chunk_size=0,
+        fit_mode="stretch",
     ):
         """
         WanVideo用の最適な解像度にリサイズ
@@ -111,39 +89,49 @@ class WanVideoOptimalResizer:
         original_pixels = original_width * original_height
 
         # 最適な解像度を見つける
-        target_width, target_height = self.find_best_resolution(
-            original_width, original_height, resolution_preset
-        )
+        with timed("WanVideoOptimalResizer", "solve"):
+            target_width, target_height = self.find_best_resolution(
+                original_width, original_height, resolution_preset
+            )
 
         # リサイズが必要かチェック
         if original_width == target_width and original_height == target_height:
             out_image = image
         else:
-            # common_upscaleを使用してリサイズ
-            # テンソルの次元を調整: [B, H, W, C] -> [B, C, H, W]
-            out_image = common_upscale(
-                image.movedim(-1, 1),
-                target_width,
-                target_height,
-                upscale_method,
-                crop="disabled",
-            ).movedim(1, -1)
+            # Resize using upscale (vectorized Lanczos, otherwise common_upscale)
+            with timed("WanVideoOptimalResizer", "resample"):
+                out_image = resize_image_batch(
+                    image, target_width, target_height, upscale_method, chunk_size, fit_mode
+                )
+            peak_bytes = estimate_resize_peak_bytes(
+                image.shape, target_width, target_height, image.element_size(), chunk_size
+            )
+            whole_batch_peak_bytes = estimate_resize_peak_bytes(
+                image.shape, target_width, target_height, image.element_size()
+            )
+            logger.debug(
+                f"WanVideo estimated peak memory: {peak_bytes / 2**20:,.0f} MB "
+                f"(whole batch: {whole_batch_peak_bytes / 2**20:,.0f} MB, "
+                f"-{(1 - peak_bytes / whole_batch_peak_bytes) * 100:.0f}%)"
+            )
 
         # アスペクト比の計算
         original_aspect = self.calculate_aspect_ratio(original_width, original_height)
         target_aspect = self.calculate_aspect_ratio(target_width, target_height)
         target_pixels = target_width * target_height
 
-        # 詳細情報の出力
-        print(f"WanVideo Optimal Resize:")
-        print(
-            f"  Original: {original_width}x{original_height} ({original_pixels:,} pixels, aspect: {original_aspect:.4f})"
+        count("frames_total", B, node="WanVideoOptimalResizer")
+
+        # 詳細情報の出力（詳細はDEBUGレベル）
+        logger.info(
+            f"WanVideo Optimal Resize: {original_width}x{original_height} → "
+            f"{target_width}x{target_height} (preset: {resolution_preset}, fit: {fit_mode})"
         )
-        print(
-            f"  Target: {target_width}x{target_height} ({target_pixels:,} pixels, aspect: {target_aspect:.4f})"
+        logger.debug(
+            f"  Original: {original_width}x{original_height} ({original_pixels:,} pixels, aspect: {original_aspect:.4f}), "
+            f"Target: {target_width}x{target_height} ({target_pixels:,} pixels, aspect: {target_aspect:.4f}), "
+            f"Aspect ratio change: {abs(original_aspect - target_aspect):.6f}, "
+            f"Upscale method: {upscale_method}"
         )
-        print(f"  Preset: {resolution_preset}")
-        print(f"  Aspect ratio change: {abs(original_aspect - target_aspect):.6f}")
-        print(f"  Upscale method: {upscale_method}")
 
         return (out_image, target_width, target_height)
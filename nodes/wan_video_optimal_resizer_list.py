@@ -0,0 +1,69 @@
+from .resample import resize_image_list
+from .telemetry import count, logger, timed
+from .wan_video_optimal_resizer import WanVideoOptimalResizer
+
+
+class WanVideoOptimalResizerList(WanVideoOptimalResizer):
+    """
+    List-aware WanVideoOptimalResizer for image lists with mixed sizes
+    The whole list arrives in one call: each distinct input size is solved once, inputs that
+    share a target resolution are resized as one batch, and outputs keep the list order.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+    INPUT_IS_LIST = True
+
+    RETURN_TYPES = ("IMAGE", "INT", "INT")
+    RETURN_NAMES = ("image", "width", "height")
+    OUTPUT_IS_LIST = (True, True, True)
+
+    FUNCTION = "resize_list_to_optimal"
+    CATEGORY = "keitNodes"
+
+    def resize_list_to_optimal(
+        self,
+        image,
+        resolution_preset=("480p",),
+        upscale_method=("lanczos",),
+        chunk_size=(0,),
+        fit_mode=("stretch",),
+    ):
+        """
+        Resize every image in the list to its optimal WanVideo resolution
+        Widget values arrive as lists too; the first value applies to the whole list
+        """
+        resolution_preset = resolution_preset[0]
+        upscale_method = upscale_method[0]
+        chunk_size = chunk_size[0]
+        fit_mode = fit_mode[0]
+
+        # Solve each distinct input size once
+        solutions: dict[tuple[int, int], tuple[int, int]] = {}
+        with timed("WanVideoOptimalResizerList", "solve"):
+            for frames in image:
+                _, H, W, _ = frames.shape
+                if (W, H) not in solutions:
+                    solutions[(W, H)] = self.find_best_resolution(W, H, resolution_preset)
+
+        targets = [solutions[(frames.shape[2], frames.shape[1])] for frames in image]
+        with timed("WanVideoOptimalResizerList", "resample"):
+            out_images, group_count = resize_image_list(
+                image, targets, upscale_method, chunk_size, fit_mode
+            )
+        count(
+            "frames_total",
+            sum(frames.shape[0] for frames in image),
+            node="WanVideoOptimalResizerList",
+        )
+
+        logger.info(
+            f"WanVideo Optimal Resize (list): {len(image)} images, "
+            f"{len(solutions)} input sizes, {group_count} resize groups "
+            f"(preset: {resolution_preset}, fit: {fit_mode}, method: {upscale_method})"
+        )
+
+        widths = [target_width for target_width, _ in targets]
+        heights = [target_height for _, target_height in targets]
+        return (out_images, widths, heights)
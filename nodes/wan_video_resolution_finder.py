@@ -1,3 +1,5 @@
+from .resolution import RESOLUTION_PRESETS
+from .telemetry import logger, timed
 from .wan_video_optimal_resizer import WanVideoOptimalResizer
 
 
@@ -16,7 +18,7 @@ class WanVideoResolutionFinder(WanVideoOptimalResizer):
             "required": {
                 "image": ("IMAGE",),
                 "resolution_preset": (
-                    ["480p", "720p"],
+                    list(RESOLUTION_PRESETS),
                     {"default": "480p"},
                 ),
             },
@@ -39,14 +41,15 @@ class WanVideoResolutionFinder(WanVideoOptimalResizer):
         original_height = H
 
         # 最適な解像度を見つける
-        target_width, target_height = self.find_best_resolution(
-            original_width, original_height, resolution_preset
-        )
+        with timed("WanVideoResolutionFinder", "solve"):
+            target_width, target_height = self.find_best_resolution(
+                original_width, original_height, resolution_preset
+            )
 
         # デバッグ情報の出力
-        print(f"WanVideo Resolution Finder:")
-        print(f"  Original: {original_width}x{original_height}")
-        print(f"  Optimal: {target_width}x{target_height}")
-        print(f"  Preset: {resolution_preset}")
+        logger.info(
+            f"WanVideo Resolution Finder: {original_width}x{original_height} → "
+            f"{target_width}x{target_height} (preset: {resolution_preset})"
+        )
 
         return (target_width, target_height)
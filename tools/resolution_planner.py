@@ -0,0 +1,343 @@
+"""
+Plan target resolutions for folders of images and videos without decoding pixels
+
+Run from the repository root (ComfyUI is not required):
+    python -m tools.resolution_planner /data/images --mode pixel-limit --output manifest.csv
+    python -m tools.resolution_planner /data/clips --mode wan --preset 480p --output manifest.parquet
+
+Only file headers are read (PIL's lazy open for images, PyAV or ffprobe for videos) in a
+process pool, and the same resolution logic as the nodes is applied to each file. Sizes are
+reported as displayed: EXIF orientation (applied by ComfyUI's LoadImage) and video rotation
+metadata swap width and height for quarter turns. The manifest lists original and target
+sizes; a second file (<output>.buckets.csv) counts files per target resolution (aspect bucket).
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from nodes.aspect_ratio_resolution_finder import (
+    HEIGHT_PRESETS,
+    AspectRatioResolutionFinder,
+)
+from nodes.resolution import (
+    ALIGNMENTS,
+    PRESET_FILE_ENV_VAR,
+    RESOLUTION_PRESETS,
+    find_best_preset_resolution,
+    find_pixel_limit_resolution,
+    load_preset_tables,
+    register_preset_tables,
+)
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff", ".gif"}
+VIDEO_EXTENSIONS = {".mp4", ".mov", ".mkv", ".webm", ".avi", ".m4v"}
+
+MANIFEST_COLUMNS = [
+    "path",
+    "kind",
+    "width",
+    "height",
+    "target_width",
+    "target_height",
+    "aspect_ratio",
+    "target_aspect_ratio",
+    "error",
+]
+
+
+# EXIF Orientation tag; values 5-8 store the image transposed (rotated by a quarter turn)
+EXIF_ORIENTATION_TAG = 0x0112
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def is_quarter_turn(rotation: Any) -> bool:
+    """Whether a rotation in degrees (either direction) swaps width and height"""
+    try:
+        return round(float(rotation)) % 180 == 90
+    except (TypeError, ValueError):
+        return False
+
+
+def read_image_size(path: str) -> tuple[int, int]:
+    """Displayed image size from the header only (PIL decodes lazily)"""
+    from PIL import Image
+
+    with Image.open(path) as image:
+        width, height = image.size
+        # LoadImage applies exif_transpose, so the nodes see phone photos upright
+        if image.getexif().get(EXIF_ORIENTATION_TAG) in TRANSPOSED_ORIENTATIONS:
+            return height, width
+        return width, height
+
+
+def read_video_size(path: str) -> tuple[int, int]:
+    """
+    Displayed size of the first video stream from the container header
+    A rotate tag or a display matrix of ±90° swaps width and height. PyAV only exposes the
+    display matrix on decoded frames, so without a rotate tag the first frame is decoded.
+    """
+    try:
+        import av
+    except ImportError:
+        av = None
+
+    if av is not None:
+        with av.open(path) as container:
+            stream = container.streams.video[0]
+            width, height = stream.codec_context.width, stream.codec_context.height
+            rotation = stream.metadata.get("rotate")
+            if rotation is None:
+                frame = next(container.decode(stream), None)
+                rotation = getattr(frame, "rotation", None)
+        return (height, width) if is_quarter_turn(rotation) else (width, height)
+
+    if shutil.which("ffprobe") is None:
+        raise RuntimeError("reading video headers requires PyAV or ffprobe")
+
+    completed = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "stream=width,height:stream_tags=rotate:stream_side_data=rotation",
+            "-of",
+            "json",
+            path,
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    stream = json.loads(completed.stdout)["streams"][0]
+    width, height = int(stream["width"]), int(stream["height"])
+    rotations = [stream.get("tags", {}).get("rotate")]
+    rotations += [side_data.get("rotation") for side_data in stream.get("side_data_list", [])]
+    if any(is_quarter_turn(rotation) for rotation in rotations):
+        return height, width
+    return width, height
+
+
+def find_target_resolution(
+    width: int, height: int, options: dict[str, Any]
+) -> tuple[int, int]:
+    """Target size with the same logic as the corresponding node"""
+    if options["mode"] == "wan":
+        return find_best_preset_resolution(width, height, options["preset"])
+
+    if options["mode"] == "height":
+        return AspectRatioResolutionFinder().calculate_resolution_for_height(
+            width, height, HEIGHT_PRESETS[options["height_preset"]]
+        )
+
+    target_width, target_height, _ = find_pixel_limit_resolution(
+        width, height, options["max_pixels"], options["alignment"]
+    )
+    return target_width, target_height
+
+
+def plan_file(path: str, options: dict[str, Any]) -> dict[str, Any]:
+    """Read one header and compute its target resolution"""
+    extension = os.path.splitext(path)[1].lower()
+    kind = "video" if extension in VIDEO_EXTENSIONS else "image"
+    row: dict[str, Any] = {column: "" for column in MANIFEST_COLUMNS}
+    row["path"] = path
+    row["kind"] = kind
+
+    try:
+        width, height = (
+            read_video_size(path) if kind == "video" else read_image_size(path)
+        )
+    except Exception as e:
+        # Corrupt or unsupported files are reported in the manifest instead of aborting the scan
+        row["error"] = f"{type(e).__name__}: {e}"
+        return row
+
+    target_width, target_height = find_target_resolution(width, height, options)
+    row.update(
+        {
+            "width": width,
+            "height": height,
+            "target_width": target_width,
+            "target_height": target_height,
+            "aspect_ratio": round(width / height, 6),
+            "target_aspect_ratio": round(target_width / target_height, 6),
+        }
+    )
+    return row
+
+
+def _plan_file_star(arguments: tuple[str, dict[str, Any]]) -> dict[str, Any]:
+    return plan_file(*arguments)
+
+
+def collect_files(roots: list[str], recursive: bool = True) -> list[str]:
+    """Image and video files under the given files or directories, sorted"""
+    extensions = IMAGE_EXTENSIONS | VIDEO_EXTENSIONS
+    paths: list[str] = []
+    for root in roots:
+        if os.path.isfile(root):
+            paths.append(root)
+            continue
+        for directory, subdirectories, filenames in os.walk(root):
+            if not recursive:
+                subdirectories.clear()
+            for filename in filenames:
+                if os.path.splitext(filename)[1].lower() in extensions:
+                    paths.append(os.path.join(directory, filename))
+    return sorted(paths)
+
+
+def write_manifest(rows: list[dict[str, Any]], output: str) -> None:
+    """Write CSV, or Parquet when the output ends with .parquet (requires pyarrow)"""
+    if output.endswith(".parquet"):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Writing Parquet requires pyarrow (pip install pyarrow)")
+
+        # Files that failed have empty sizes, stored as nulls
+        columns = {
+            column: [None if row[column] == "" else row[column] for row in rows]
+            for column in MANIFEST_COLUMNS
+        }
+        pq.write_table(pa.table(columns), output)
+        return
+
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=MANIFEST_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_bucket_statistics(
+    rows: list[dict[str, Any]], output: str
+) -> list[list[Any]]:
+    """Count files per target resolution and write them next to the manifest"""
+    planned = [row for row in rows if row["error"] == ""]
+    if not planned:
+        return []
+    buckets = Counter((row["target_width"], row["target_height"]) for row in planned)
+    aspect_errors: dict[tuple[int, int], float] = {}
+    for row in planned:
+        key = (row["target_width"], row["target_height"])
+        error = abs(row["aspect_ratio"] - row["target_aspect_ratio"])
+        aspect_errors[key] = aspect_errors.get(key, 0.0) + error
+
+    statistics: list[list[Any]] = []
+    for (width, height), count in buckets.most_common():
+        statistics.append(
+            [
+                width,
+                height,
+                round(width / height, 6),
+                count,
+                round(count / len(planned), 6),
+                round(aspect_errors[(width, height)] / count, 6),
+            ]
+        )
+
+    bucket_path = os.path.splitext(output)[0] + ".buckets.csv"
+    with open(bucket_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            [
+                "target_width",
+                "target_height",
+                "aspect_ratio",
+                "count",
+                "share",
+                "mean_aspect_error",
+            ]
+        )
+        writer.writerows(statistics)
+    return statistics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="Files or directories to scan")
+    parser.add_argument("--output", default="resolution_manifest.csv")
+    parser.add_argument(
+        "--mode",
+        choices=["pixel-limit", "wan", "height"],
+        default="pixel-limit",
+        help="pixel-limit: PixelLimitResizer, wan: WanVideoResolutionFinder, height: AspectRatioResolutionFinder",
+    )
+    parser.add_argument("--max-pixels", type=int, default=589824)
+    parser.add_argument("--alignment", type=int, choices=ALIGNMENTS, default=16)
+    parser.add_argument("--preset", default="480p", help="WanVideo preset table name")
+    parser.add_argument(
+        "--presets",
+        help="JSON/YAML file with additional preset tables (same format as KEIT_RESOLUTION_PRESETS)",
+    )
+    parser.add_argument(
+        "--height-preset", choices=list(HEIGHT_PRESETS), default="720p"
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--no-recursive", action="store_true")
+    args = parser.parse_args()
+
+    if args.presets:
+        register_preset_tables(load_preset_tables(args.presets))
+        # Worker processes compile the same tables when they import nodes.resolution
+        os.environ[PRESET_FILE_ENV_VAR] = os.path.abspath(args.presets)
+    if args.mode == "wan" and args.preset not in RESOLUTION_PRESETS:
+        parser.error(
+            f"unknown preset '{args.preset}' (available: {', '.join(RESOLUTION_PRESETS)})"
+        )
+
+    options = {
+        "mode": args.mode,
+        "max_pixels": args.max_pixels,
+        "alignment": args.alignment,
+        "preset": args.preset,
+        "height_preset": args.height_preset,
+    }
+
+    start = time.perf_counter()
+    paths = collect_files(args.inputs, recursive=not args.no_recursive)
+    print(f"Found {len(paths):,} files in {time.perf_counter() - start:.1f}s")
+    if not paths:
+        sys.exit(1)
+
+    # Large chunks keep the inter-process overhead small compared to the header reads
+    chunk_size = max(1, min(256, len(paths) // (args.workers * 4) or 1))
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        rows = list(
+            executor.map(
+                _plan_file_star,
+                ((path, options) for path in paths),
+                chunksize=chunk_size,
+            )
+        )
+    elapsed = time.perf_counter() - start
+
+    write_manifest(rows, args.output)
+    statistics = write_bucket_statistics(rows, args.output)
+
+    failed = sum(1 for row in rows if row["error"] != "")
+    print(
+        f"Planned {len(rows) - failed:,} files ({failed:,} failed) in {elapsed:.1f}s "
+        f"({len(rows) / elapsed:,.0f} files/s) -> {args.output}"
+    )
+    print(f"{'bucket':>12}{'aspect':>9}{'count':>10}{'share':>8}")
+    for width, height, aspect, count, share, _ in statistics[:20]:
+        print(f"{f'{width}x{height}':>12}{aspect:>9.4f}{count:>10,}{share:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()